@@ -4,13 +4,23 @@ Exposes endpoints for the React frontend to consume
 """
 
 import os
-from flask import Flask, request, jsonify
+import gzip
+import hashlib
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
 import json
-from pathlib import Path
 
-from backend import RiotAPIClient, AWSBedrockClient, MatchDataProcessor, InsightGenerator
+try:
+    import brotli
+except ImportError:  # Optional; falls back to gzip
+    brotli = None
+
+from backend import RiotClientPool, AWSBedrockClient, MatchDataProcessor, InsightGenerator, PlayerStatsAggregate
+from storage import MatchStore, ResponseStore, TimelineCache
+from jobs import JobManager, JobFailed
+from cache import SingleFlight, TTLCache
+from item_catalog import ItemCatalog
 
 # Load environment variables
 load_dotenv()
@@ -19,6 +29,48 @@ load_dotenv()
 app = Flask(__name__)
 CORS(app)  # Enable CORS for React frontend
 
+# Compress JSON bodies at least this large (small ones gain little and cost CPU)
+COMPRESSION_MIN_BYTES = int(os.getenv('COMPRESSION_MIN_BYTES', '1024'))
+COMPRESSIBLE_MIMETYPES = {'application/json'}
+
+
+@app.after_request
+def compress_response(response):
+    """Brotli (if installed) or gzip-encode large JSON responses the client accepts compressed"""
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES or 'Content-Encoding' in response.headers):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < COMPRESSION_MIN_BYTES:
+        return response
+
+    encoding = _negotiate_encoding(('br', 'gzip') if brotli is not None else ('gzip',))
+    if encoding == 'br':
+        response.set_data(brotli.compress(data, quality=5))
+    elif encoding == 'gzip':
+        response.set_data(gzip.compress(data, compresslevel=6))
+    else:
+        return response
+    response.headers['Content-Encoding'] = encoding
+
+    # The encoded body is a different representation, so its validator can only be weak
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def _negotiate_encoding(available):
+    """First of the available Content-Encodings the client accepts, or None"""
+    accepted = request.accept_encodings
+    for encoding in available:
+        if accepted[encoding]:
+            return encoding
+    return None
+
+
 # Initialize clients globally
 riot_api_key = os.getenv('RIOT_API_KEY')
 aws_region = os.getenv('AWS_REGION', 'us-east-1')
@@ -26,8 +78,38 @@ aws_region = os.getenv('AWS_REGION', 'us-east-1')
 if not riot_api_key:
     print("Warning: RIOT_API_KEY not found")
 
-riot_client = RiotAPIClient(api_key=riot_api_key, region='na1')
-bedrock_client = AWSBedrockClient(region=aws_region)
+# One client per platform, each routing host with its own rate-limit budget
+riot_pool = RiotClientPool(
+    api_key=riot_api_key,
+    match_store=MatchStore(),
+    timeline_cache=TimelineCache()
+)
+DEFAULT_REGION = os.getenv('RIOT_DEFAULT_REGION', 'na1')
+bedrock_client = AWSBedrockClient(
+    region=aws_region,
+    response_store=ResponseStore() if os.getenv('LLM_CACHE_PATH') else None  # Opt-in on-disk response cache
+)
+
+# Item names for the frontend, preloaded and refreshed when items.json changes
+item_catalog = ItemCatalog()
+
+# Worker pool for long-running analyses (keeps Flask workers free)
+job_manager = JobManager()
+SSE_HEARTBEAT_SECONDS = 15
+
+# Concurrent requests for the same player share one match crawl
+stats_flight = SingleFlight()
+
+# Per-match arrays of /api/stats that can be paged with ?limit=&cursor=
+PAGINATED_STATS = ('items_per_match', 'inventory_snapshots')
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Stats aggregates per PUUID, shared by /api/stats and /api/analyze
+stats_cache = TTLCache(
+    max_entries=int(os.getenv('STATS_CACHE_MAX_ENTRIES', '512')),
+    ttl_seconds=float(os.getenv('STATS_CACHE_TTL_SECONDS', '1800'))
+)
 
 
 @app.route('/api/health', methods=['GET'])
@@ -41,43 +123,36 @@ def health_check():
 
 @app.route('/api/items', methods=['GET'])
 def get_items_mapping():
-    """Return item ID -> name mapping from items.json (now ID->Name)."""
+    """Return item ID -> name mapping from items.json (now ID->Name).
+
+    Served pre-serialized (and pre-compressed for clients that accept it) with a
+    strong ETag per encoding; browsers revalidate and get a 304 until items.json changes.
+    """
     try:
-        items_path = Path('items.json')
-        if not items_path.exists():
-            return jsonify({'success': True, 'data': {}})
-        with items_path.open('r', encoding='utf-8') as f:
-            raw = json.load(f)
-
-        # items.json currently stores name -> id. We need id (string) -> name.
-        if isinstance(raw, dict) and raw:
-            # Detect schema: if keys look numeric, assume it's already id->name
-            sample_key = next(iter(raw.keys()))
-            if isinstance(sample_key, str) and sample_key.isdigit():
-                # Normalize keys to strings just in case
-                normalized = {str(k): v for k, v in raw.items()}
-                return jsonify({'success': True, 'data': normalized})
-            else:
-                # Reverse mapping name->id to id->name
-                reversed_map = {}
-                for name, item_id in raw.items():
-                    try:
-                        key = str(int(item_id))  # normalize numeric ids
-                    except Exception:
-                        key = str(item_id)
-                    # Last write wins if duplicates
-                    reversed_map[key] = name
-                return jsonify({'success': True, 'data': reversed_map})
-
-        return jsonify({'success': True, 'data': {}})
+        encoding = _negotiate_encoding(item_catalog.ENCODINGS)
+        body, etag = item_catalog.current(encoding)
+        response = Response(body, mimetype='application/json')
+        response.vary.add('Accept-Encoding')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding  # Also keeps compress_response off it
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'public, no-cache'  # Cache, but revalidate on each use
+        return response.make_conditional(request)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
 @app.route('/api/player/<path:riot_id>', methods=['GET'])
 def get_player_info(riot_id):
-    """Get player information by Riot ID"""
+    """Get player information by Riot ID (optional ?region=, default na1)"""
     try:
+        riot_client = _riot_client(request.args.get('region'))
+
+        if riot_client is None:
+            return jsonify({
+                'success': False,
+                'error': f"Unknown region. Supported: {', '.join(riot_pool.platforms())}"
+            }), 400
         summoner = riot_client.get_summoner_by_riot_id(riot_id)
 
         if not summoner:
@@ -107,12 +182,15 @@ def get_player_info(riot_id):
 @app.route('/api/analyze', methods=['POST'])
 def analyze_player():
     """
-    Analyze a player and generate year-in-review
+    Start a year-in-review analysis in the background
 
     Request body:
     {
-        "riotId": "GameName#TAG"
+        "riotId": "GameName#TAG",
+        "region": "euw1"  (optional, default na1)
     }
+
+    Returns 202 with a job ID right away; poll GET /api/jobs/<jobId> for progress and the result.
     """
     try:
         data = request.get_json()
@@ -124,86 +202,316 @@ def analyze_player():
                 'error': 'riotId is required'
             }), 400
 
-        # Step 1: Get player info
-        summoner = riot_client.get_summoner_by_riot_id(riot_id)
+        riot_client = _riot_client(data.get('region'))
 
-        if not summoner:
+        if riot_client is None:
             return jsonify({
                 'success': False,
-                'error': 'Player not found'
-            }), 404
-
-        puuid = summoner['puuid']
-        display_name = f"{summoner['gameName']}#{summoner['tagLine']}"
-
-        # Step 2: Fetch ranked information using PUUID
-        solo_rank = None
-        try:
-            ranked_info = riot_client.get_ranked_info_by_puuid(puuid)
-            if ranked_info:
-                for queue in ranked_info:
-                    if queue.get('queueType') == 'RANKED_SOLO_5x5':
-                        solo_rank = queue
-                        break
-        except Exception as e:
-            print(f"Could not fetch ranked info: {e}")
-            # Continue without rank info
-
-        # Step 3: Fetch match history with timelines for inventory snapshots
-        matches = riot_client.get_full_year_matches(puuid, include_timeline=True)
-
-        if not matches:
-            return jsonify({
-                'success': False,
-                'error': 'No matches found for this player in the past year'
-            }), 404
-
-        # Step 4: Process statistics
-        stats = MatchDataProcessor.extract_player_stats(matches, puuid)
-
-        # Step 5: Generate AI coaching insights with rank-aware analysis
-        prompt = InsightGenerator.create_year_in_review_prompt(stats, display_name, solo_rank)
-        insights = bedrock_client.generate_insights(prompt, max_tokens=8000)  # Increased to ensure all 8 sections are complete
+                'error': f"Unknown region. Supported: {', '.join(riot_pool.platforms())}"
+            }), 400
+        job = job_manager.submit('analyze', _run_analysis, riot_client, riot_id)
 
-        # Return everything including rank info
-        player_data = {
-            'gameName': summoner['gameName'],
-            'tagLine': summoner['tagLine'],
-            'summonerLevel': summoner['summonerLevel'],
-            'profileIconId': summoner.get('profileIconId', 0)
-        }
-        
-        # Add rank info if available
-        if solo_rank:
-            player_data['rank'] = {
-                'tier': solo_rank.get('tier'),
-                'division': solo_rank.get('rank'),
-                'lp': solo_rank.get('leaguePoints'),
-                'wins': solo_rank.get('wins'),
-                'losses': solo_rank.get('losses')
-            }
-        
         return jsonify({
             'success': True,
             'data': {
-                'player': player_data,
-                'stats': stats,
-                'insights': insights
+                'jobId': job.id,
+                'status': job.status,
+                'statusUrl': f"/api/jobs/{job.id}"
             }
-        })
+        }), 202
 
     except Exception as e:
-        print(f"Error analyzing player: {e}")
+        print(f"Error starting analysis: {e}")
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
 
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """Report a background job's stage, match progress and (once finished) its result or error"""
+    job = job_manager.get(job_id)
+
+    if not job:
+        return jsonify({
+            'success': False,
+            'error': 'Job not found'
+        }), 404
+
+    if job.status == 'succeeded' and job.etag:
+        return _conditional_json(job.etag, lambda: {
+            'success': True,
+            'data': job.to_dict()
+        })
+
+    return jsonify({
+        'success': True,
+        'data': job.to_dict()
+    })
+
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def stream_job_events(job_id):
+    """
+    Follow a background job as Server-Sent Events
+
+    Events: 'stage' and 'progress' while new matches are downloaded ('matches') and then
+    folded into the statistics ('aggregate'), 'insight'
+    with each chunk of coaching text as the model writes it, then a final 'result'
+    (same shape as the polled job result) or 'error'. Event IDs are positions in the
+    job's log, so a reconnecting EventSource resumes via Last-Event-ID.
+    """
+    job = job_manager.get(job_id)
+
+    if not job:
+        return jsonify({
+            'success': False,
+            'error': 'Job not found'
+        }), 404
+
+    try:
+        cursor = int(request.headers.get('Last-Event-ID', -1)) + 1
+    except ValueError:
+        cursor = 0
+
+    def generate():
+        nonlocal cursor
+        while True:
+            events = job.wait_for_events(cursor, timeout=SSE_HEARTBEAT_SECONDS)
+            if not events:
+                if job.finished:
+                    return
+                yield ': keep-alive\n\n'  # Comment line stops proxies from closing an idle stream
+                continue
+
+            for index, event, data in events:
+                yield _sse(event, data, event_id=index)
+            cursor = events[-1][0] + 1
+
+    return _sse_response(generate())
+
+
+def _riot_client(region):
+    """Client for the requested platform (default region if none given), or None for an unknown platform"""
+    try:
+        return riot_pool.get(region or DEFAULT_REGION)
+    except ValueError:
+        return None
+
+
+def _etag(*parts):
+    """Strong validator for a response built from the given JSON-serializable parts"""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode('utf-8')).hexdigest()[:32]
+
+
+def _conditional_json(etag, build_payload):
+    """JSON response tagged with etag, or an empty 304 if the client already has it
+
+    build_payload is only called (and serialized) when the body is actually sent.
+    """
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify(build_payload())
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def _sse(event, data, event_id=None):
+    """Format one Server-Sent Events message"""
+    message = f"id: {event_id}\n" if event_id is not None else ''
+    return message + f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _sse_response(events):
+    """Stream an iterable of formatted SSE messages without proxy buffering"""
+    return Response(stream_with_context(events), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # Disable nginx response buffering
+    })
+
+
+def _player_stats(riot_client, puuid, progress=None, sections=None, stage=None):
+    """Crawl a player's past year and aggregate it, sharing one crawl among concurrent callers
+
+    Returns (stats, fingerprint of the data they were built from). sections is
+    passed to PlayerStatsAggregate.to_stats. Only the aggregate is cached: the stats
+    dict (with its per-match lists) is rebuilt per call, which is cheap next to its
+    memory cost when held for every cached player. Only the caller that starts the
+    crawl receives progress and stage callbacks; the others wait for its result.
+    """
+    entry = stats_flight.do(puuid, _refresh_player_aggregate, riot_client, puuid, progress, stage)
+    return entry['aggregate'].to_stats(sections), entry['fingerprint']
+
+
+def _refresh_player_aggregate(riot_client, puuid, progress=None, stage=None):
+    """Cache entry for a player's current match set, reusing the cached aggregate where possible
+
+    The cached entry is keyed by PUUID and records the fingerprint of the match set it
+    covers. An unchanged match set is served as-is; otherwise matches that aged out
+    are removed and only new ones are fetched and folded in.
+
+    Which matches carry timeline snapshots depends on their position in the full list,
+    so rows that moved into the timeline budget are refetched and rows that moved out
+    lose their snapshots; the result matches a cold rebuild of the same match set.
+
+    progress(fetched, total) first follows the download of new match details, then,
+    after stage('aggregate'), the matches being folded in (timelines are fetched there).
+    """
+    match_ids = riot_client.refresh_match_history(puuid, progress=progress)
+    fingerprint = MatchDataProcessor.match_set_fingerprint(match_ids)
+
+    cached = stats_cache.get(puuid)
+    if cached and cached['match_set'] == fingerprint:
+        if progress:
+            progress(len(match_ids), len(match_ids))
+        return cached
+
+    timeline_ids = MatchDataProcessor.timeline_match_ids(match_ids)
+
+    # Work on a copy so the cached entry stays consistent if the refresh fails part-way
+    aggregate = PlayerStatsAggregate(puuid)
+    if cached:
+        aggregate.merge(cached['aggregate'])
+        current = set(match_ids)
+        for match_id in aggregate.match_ids:
+            if match_id not in current:
+                aggregate.remove_match(match_id)
+            elif match_id in timeline_ids:
+                if match_id in aggregate.rows and not aggregate.has_timeline(match_id):
+                    aggregate.remove_match(match_id)  # Refetched below with its timeline
+            else:
+                aggregate.drop_timeline(match_id)
+
+    new_ids = [match_id for match_id in match_ids if match_id not in aggregate]
+    if cached:
+        print(f"Stats cache: {len(new_ids)} matches to fetch for {puuid}")
+
+    if stage:
+        stage('aggregate')
+    matches = riot_client.iter_matches(new_ids, include_timeline=True, progress=progress,
+                                       timeline_ids=timeline_ids)
+    MatchDataProcessor.aggregate_matches(matches, puuid, aggregate)
+    if cached:
+        aggregate.order_by(match_ids)
+
+    entry = {
+        # Fingerprint what was actually aggregated, so matches that failed to load are retried next time
+        'match_set': MatchDataProcessor.match_set_fingerprint(aggregate.match_ids),
+        # Also covers which rows carry timeline snapshots, so it identifies the stats body (ETags)
+        'fingerprint': aggregate.fingerprint(),
+        'aggregate': aggregate
+    }
+    stats_cache.set(puuid, entry)
+    return entry
+
+
+def _run_analysis(job, riot_client, riot_id):
+    """Full analysis pipeline, run on the job worker pool"""
+
+    # Step 1: Get player info
+    job.set_stage('lookup')
+    summoner = riot_client.get_summoner_by_riot_id(riot_id)
+
+    if not summoner:
+        raise JobFailed('Player not found', 404)
+
+    puuid = summoner['puuid']
+    display_name = f"{summoner['gameName']}#{summoner['tagLine']}"
+
+    # Step 2: Fetch ranked information using PUUID
+    job.set_stage('ranked')
+    solo_rank = None
+    try:
+        ranked_info = riot_client.get_ranked_info_by_puuid(puuid)
+        if ranked_info:
+            for queue in ranked_info:
+                if queue.get('queueType') == 'RANKED_SOLO_5x5':
+                    solo_rank = queue
+                    break
+    except Exception as e:
+        print(f"Could not fetch ranked info: {e}")
+        # Continue without rank info
+
+    # Steps 3-4: Stream match history (with timelines for inventory snapshots) into the statistics
+    job.set_stage('matches')
+    stats, fingerprint = _player_stats(riot_client, puuid, progress=job.set_progress, stage=job.set_stage)
+
+    if not stats['total_matches']:
+        raise JobFailed('No matches found for this player in the past year', 404)
+
+    # Step 5: Generate AI coaching insights with rank-aware analysis
+    job.set_stage('insights')
+    prompt = InsightGenerator.create_year_in_review_prompt(stats, display_name, solo_rank)
+    # Streamed so /api/jobs/<id>/events can forward the text while it is generated
+    chunks = []
+    for chunk in bedrock_client.stream_insights(prompt, max_tokens=8000):  # Increased to ensure all 8 sections are complete
+        chunks.append(chunk)
+        job.emit('insight', {'text': chunk})
+    insights = ''.join(chunks)
+
+    # Return everything including rank info
+    player_data = {
+        'gameName': summoner['gameName'],
+        'tagLine': summoner['tagLine'],
+        'summonerLevel': summoner['summonerLevel'],
+        'profileIconId': summoner.get('profileIconId', 0)
+    }
+
+    # Add rank info if available
+    if solo_rank:
+        player_data['rank'] = {
+            'tier': solo_rank.get('tier'),
+            'division': solo_rank.get('rank'),
+            'lp': solo_rank.get('leaguePoints'),
+            'wins': solo_rank.get('wins'),
+            'losses': solo_rank.get('losses')
+        }
+
+    # A finished job never changes; its ETag follows the match set it was built from
+    job.etag = _etag(fingerprint, player_data, insights)
+
+    return {
+        'player': player_data,
+        'stats': stats,
+        'insights': insights
+    }
+
+
 @app.route('/api/stats/<path:riot_id>', methods=['GET'])
 def get_player_stats(riot_id):
-    """Get player statistics without AI insights (faster)"""
+    """
+    Get player statistics without AI insights (faster)
+
+    Query parameters (all optional):
+        fields: comma-separated stats keys to return, e.g. fields=total_matches,wins,win_rate;
+                item sections that are not requested are not computed; unknown names are a 400
+        limit:  page size for the per-match arrays (items_per_match, inventory_snapshots)
+        cursor: nextCursor from the previous page (the last matchId it contained)
+        region: platform such as euw1 or kr (default na1)
+    """
     try:
+        riot_client = _riot_client(request.args.get('region'))
+
+        if riot_client is None:
+            return jsonify({
+                'success': False,
+                'error': f"Unknown region. Supported: {', '.join(riot_pool.platforms())}"
+            }), 400
+        fields = [field.strip() for field in request.args.get('fields', '').split(',') if field.strip()] or None
+        cursor = request.args.get('cursor')
+        try:
+            limit = int(request.args['limit']) if 'limit' in request.args else None
+        except ValueError:
+            limit = 0  # Rejected below like any other out-of-range limit
+        if limit is not None and not 0 < limit <= MAX_PAGE_SIZE:
+            return jsonify({
+                'success': False,
+                'error': f'limit must be between 1 and {MAX_PAGE_SIZE}'
+            }), 400
+
         # Get player info
         summoner = riot_client.get_summoner_by_riot_id(riot_id)
 
@@ -215,28 +523,53 @@ def get_player_stats(riot_id):
 
         puuid = summoner['puuid']
 
-        # Fetch match history with timelines
-        matches = riot_client.get_full_year_matches(puuid, include_timeline=True)
+        # Stream match history (with timelines) into the statistics
+        sections = None if fields is None else [section for section in PlayerStatsAggregate.ITEM_SECTIONS if section in fields]
+        stats, fingerprint = _player_stats(riot_client, puuid, sections=sections)
 
-        if not matches:
+        if not stats['total_matches']:
             return jsonify({
                 'success': False,
                 'error': 'No matches found'
             }), 404
 
-        # Process statistics
-        stats = MatchDataProcessor.extract_player_stats(matches, puuid)
+        if fields is not None:
+            unknown = [field for field in fields
+                       if field not in stats and field not in PlayerStatsAggregate.OPTIONAL_STATS]
+            if unknown:
+                return jsonify({
+                    'success': False,
+                    'error': f"Unknown fields: {', '.join(unknown)}"
+                }), 400
+            stats = {field: stats[field] for field in fields if field in stats}
+
+        page = None
+        if limit is not None or cursor is not None:
+            try:
+                stats, page = _paginate_stats(stats, cursor, limit or DEFAULT_PAGE_SIZE)
+            except ValueError as e:
+                return jsonify({
+                    'success': False,
+                    'error': str(e)
+                }), 400
+
+        player = {
+            'gameName': summoner['gameName'],
+            'tagLine': summoner['tagLine'],
+            'summonerLevel': summoner['summonerLevel']
+        }
 
-        return jsonify({
+        data = {
+            'player': player,
+            'stats': stats
+        }
+        if page is not None:
+            data['page'] = page
+
+        # Unchanged stats data (and player) revalidates with a 304 instead of resending the stats
+        return _conditional_json(_etag(fingerprint, player, fields, cursor, limit), lambda: {
             'success': True,
-            'data': {
-                'player': {
-                    'gameName': summoner['gameName'],
-                    'tagLine': summoner['tagLine'],
-                    'summonerLevel': summoner['summonerLevel']
-                },
-                'stats': stats
-            }
+            'data': data
         })
 
     except Exception as e:
@@ -246,6 +579,39 @@ def get_player_stats(riot_id):
         }), 500
 
 
+def _paginate_stats(stats, cursor, limit):
+    """Slice the per-match arrays in stats to one page after cursor
+
+    The arrays share row order (newest first), so one matchId cursor pages them all
+    and stays valid when new matches are added in front. Returns (stats copy, page
+    info); raises ValueError for a cursor that is no longer in the match set.
+    """
+    arrays = [key for key in PAGINATED_STATS if key in stats]
+    if not arrays:
+        return stats, None
+
+    match_ids = [entry['matchId'] for entry in stats[arrays[0]]]
+    start = 0
+    if cursor is not None:
+        try:
+            start = match_ids.index(cursor) + 1
+        except ValueError:
+            raise ValueError('Invalid or expired cursor')
+    end = start + limit
+
+    paged = dict(stats)
+    for key in arrays:
+        paged[key] = stats[key][start:end]
+
+    page = {
+        'limit': limit,
+        'cursor': cursor,
+        'nextCursor': match_ids[end - 1] if end < len(match_ids) else None,
+        'total': len(match_ids)
+    }
+    return paged, page
+
+
 @app.route('/api/chat', methods=['POST'])
 def chat_with_coach():
     """
@@ -298,6 +664,47 @@ def chat_with_coach():
         }), 500
 
 
+@app.route('/api/chat/stream', methods=['POST'])
+def chat_with_coach_stream():
+    """
+    Streaming variant of /api/chat (same request body)
+
+    Responds with Server-Sent Events: 'token' events carrying each chunk of the
+    coach's reply as it is generated, then 'done' with the full response in the
+    same shape as /api/chat's data.
+    """
+    try:
+        data = request.get_json()
+        user_message = data.get('message')
+        player_data = data.get('playerData', {})
+        conversation_history = data.get('conversationHistory', [])
+
+        if not user_message:
+            return jsonify({
+                'success': False,
+                'error': 'Message is required'
+            }), 400
+
+        # Build context-aware prompt
+        prompt = _build_chat_prompt(user_message, player_data, conversation_history)
+
+    except Exception as e:
+        print(f"Error in chat stream endpoint: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+    def generate():
+        chunks = []
+        for chunk in bedrock_client.stream_insights(prompt, max_tokens=2000):
+            chunks.append(chunk)
+            yield _sse('token', {'text': chunk})
+        yield _sse('done', {'response': ''.join(chunks)})
+
+    return _sse_response(generate())
+
+
 def _build_chat_prompt(user_message, player_data, conversation_history):
     """Build a context-aware prompt for the chatbot"""
 
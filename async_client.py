@@ -0,0 +1,334 @@
+"""
+Asyncio Riot API client
+Fetches match details and timelines concurrently so a full-year crawl is bounded by
+the rate limit rather than by round-trip latency
+"""
+
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import aiohttp
+
+from backend import MatchDataProcessor, RiotClientBase
+from rate_limiter import RateLimiter
+from storage import MatchStore, TimelineCache
+
+
+class AsyncRiotAPIClient(RiotClientBase):
+    """Asyncio counterpart of RiotAPIClient
+
+    Shares routing, rate limiters, lookup caches and the incremental match-history
+    sync (match store index and sync point) with RiotAPIClient, but every request
+    method is a coroutine. Match store and timeline cache calls run in worker threads
+    so SQLite never blocks the event loop. Use as an async context manager so the
+    HTTP session is closed:
+
+        async with AsyncRiotAPIClient(api_key) as client:
+            matches = await client.get_full_year_matches(puuid, include_timeline=True)
+    """
+
+    # Requests in flight at once; the rate limiter still decides when each one may start
+    DEFAULT_CONCURRENCY = 20
+
+    # Matches fetched per concurrent step; also bounds how many full matches are held at once
+    PAGE_SIZE = 100
+
+    def __init__(self, api_key: str, region: str = 'na1', match_store: Optional[MatchStore] = None,
+                 timeline_cache: Optional[TimelineCache] = None, rate_limiter: Optional[RateLimiter] = None,
+                 pool_size: int = RiotClientBase.DEFAULT_POOL_SIZE, concurrency: int = DEFAULT_CONCURRENCY,
+                 regional_rate_limiter: Optional[RateLimiter] = None, base_url_override: Optional[str] = None,
+                 account_rate_limiter: Optional[RateLimiter] = None):
+        super().__init__(api_key, region=region, match_store=match_store, timeline_cache=timeline_cache,
+                         rate_limiter=rate_limiter, pool_size=pool_size, regional_rate_limiter=regional_rate_limiter,
+                         base_url_override=base_url_override, account_rate_limiter=account_rate_limiter)
+        self.concurrency = concurrency
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> 'AsyncRiotAPIClient':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Created lazily so it binds to the running event loop
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers={'X-Riot-Token': self.api_key, 'Accept-Encoding': 'gzip, deflate'},
+                timeout=aiohttp.ClientTimeout(total=15),
+                connector=aiohttp.TCPConnector(limit_per_host=self.pool_size, keepalive_timeout=60)
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def _make_request(self, url: str, method: str = 'default') -> Optional[Dict]:
+        """Make API request with header-driven rate limiting and error handling"""
+        return (await self._request(url, method))[1]
+
+    async def _request(self, url: str, method: str = 'default') -> Tuple[Optional[int], Optional[Dict]]:
+        """Like _make_request, but returns (status_code, data); status is None if no response arrived"""
+        session = self._get_session()
+        rate_limiter = self._limiter_for(url)
+        status = None
+
+        for attempt in range(self.MAX_RETRIES + 1):
+            await rate_limiter.acquire_async(method)
+
+            try:
+                async with session.get(url) as response:
+                    rate_limiter.update_from_headers(method, response.headers)
+                    status = response.status
+
+                    if response.status == 200:
+                        return status, await response.json()
+                    elif response.status == 429:
+                        retry_after = rate_limiter.handle_429(method, response.headers)
+                        print(f"Rate limited ({response.headers.get('X-Rate-Limit-Type', 'unknown')}). "
+                              f"Backing off {retry_after} seconds (attempt {attempt + 1}/{self.MAX_RETRIES + 1})...")
+                    else:
+                        print(f"Error {response.status}: {await response.text()}")
+                        return status, None
+            except Exception as e:
+                print(f"Request failed: {e}")
+                return None, None
+
+        print(f"Giving up after {self.MAX_RETRIES + 1} rate-limited attempts: {url}")
+        return status, None
+
+    @staticmethod
+    async def _limited(semaphore: asyncio.Semaphore, fetch: Callable[[str], Awaitable], match_id: str):
+        async with semaphore:
+            return await fetch(match_id)
+
+    async def get_account_by_riot_id(self, game_name: str, tag_line: str) -> Optional[Dict]:
+        """Get account information by Riot ID (gameName#tagLine)"""
+        key = self._riot_id_key(game_name, tag_line)
+        hit, account = self._cached_lookup(self.account_cache, key)
+        if hit:
+            return account
+
+        url = f"{self.account_url}/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
+        status, account = await self._request(url, method='account')
+        self._store_lookup(self.account_cache, key, status, account)
+        return account
+
+    async def get_summoner_by_puuid(self, puuid: str) -> Optional[Dict]:
+        """Get summoner information by PUUID"""
+        hit, summoner = self._cached_lookup(self.summoner_cache, puuid)
+        if hit:
+            return summoner
+
+        url = f"{self.base_url}/lol/summoner/v4/summoners/by-puuid/{puuid}"
+        status, summoner = await self._request(url, method='summoner')
+        self._store_lookup(self.summoner_cache, puuid, status, summoner)
+        return summoner
+
+    async def get_summoner_by_riot_id(self, riot_id: str) -> Optional[Dict]:
+        """Get summoner information by Riot ID (gameName#tagLine)"""
+        if '#' not in riot_id:
+            print(f"Invalid Riot ID format. Please use format: GameName#TAG (e.g., Doublelift#NA1)")
+            return None
+
+        game_name, tag_line = riot_id.split('#', 1)
+
+        account = await self.get_account_by_riot_id(game_name, tag_line)
+        if not account:
+            return None
+
+        summoner = await self.get_summoner_by_puuid(account['puuid'])
+        if summoner:
+            summoner['gameName'] = account['gameName']
+            summoner['tagLine'] = account['tagLine']
+
+        return summoner
+
+    async def get_match_history(self, puuid: str, count: int = 100, start_time: Optional[int] = None, start: int = 0) -> Optional[List[str]]:
+        """Get match IDs for a player (see RiotAPIClient.get_match_history)"""
+        url = f"{self.regional_url}/lol/match/v5/matches/by-puuid/{puuid}/ids?count={count}&start={start}"
+
+        if start_time:
+            url += f"&startTime={start_time}"
+
+        return await self._make_request(url, method='match-ids')
+
+    async def get_match_details(self, match_id: str) -> Optional[Dict]:
+        """Get detailed match information, checking the match store first"""
+        if self.match_store is not None:
+            cached = await asyncio.to_thread(self.match_store.get, match_id)
+            if cached is not None:
+                return cached
+
+        url = f"{self.regional_url}/lol/match/v5/matches/{match_id}"
+        match_data = await self._make_request(url, method='match')
+
+        if match_data and self.match_store is not None and 'info' in match_data:
+            await asyncio.to_thread(self.match_store.put, match_id, match_data)
+
+        return match_data
+
+    async def get_match_timeline(self, match_id: str) -> Optional[Dict]:
+        """Get pruned item events from a match timeline, served from the timeline cache when possible"""
+        if self.timeline_cache is not None:
+            cached = await asyncio.to_thread(self.timeline_cache.get, match_id)
+            if cached is not None:
+                return MatchDataProcessor.prune_timeline(cached)
+
+        url = f"{self.regional_url}/lol/match/v5/matches/{match_id}/timeline"
+        timeline = await self._make_request(url, method='timeline')
+        if not timeline or 'info' not in timeline:
+            return None
+
+        timeline = MatchDataProcessor.prune_timeline(timeline)
+        if self.timeline_cache is not None:
+            await asyncio.to_thread(self.timeline_cache.put, match_id, timeline)
+
+        return timeline
+
+    async def get_ranked_info(self, summoner_id: str) -> Optional[List[Dict]]:
+        """Get ranked information for a summoner"""
+        url = f"{self.base_url}/lol/league/v4/entries/by-summoner/{summoner_id}"
+        return await self._make_request(url, method='league')
+
+    async def get_ranked_info_by_puuid(self, puuid: str) -> Optional[List[Dict]]:
+        """Get ranked information using PUUID directly"""
+        url = f"{self.base_url}/lol/league/v4/entries/by-puuid/{puuid}"
+        return await self._make_request(url, method='league')
+
+    async def _list_match_ids(self, puuid: str, start_time: int) -> List[str]:
+        """Page through match IDs played since start_time (epoch seconds), newest first"""
+        all_ids = []
+        start_index = 0
+
+        while True:
+            match_ids = await self.get_match_history(
+                puuid=puuid,
+                count=self.PAGE_SIZE,
+                start_time=start_time,
+                start=start_index
+            )
+
+            if not match_ids:
+                break
+
+            all_ids.extend(match_ids)
+
+            if len(match_ids) < self.PAGE_SIZE:
+                break
+
+            start_index += self.PAGE_SIZE
+
+        return all_ids
+
+    async def refresh_match_history(self, puuid: str, days: int = 365,
+                                    progress: Optional[Callable[[int, int], None]] = None) -> List[str]:
+        """Get the IDs of all matches in the window (newest first), fetching only what is new
+
+        Same incremental sync (and progress reporting) as RiotAPIClient.refresh_match_history,
+        with the new matches' details fetched concurrently, one page at a time.
+        """
+        window_start = self._window_start(days)
+
+        if self.match_store is None:
+            return await self._list_match_ids(puuid, window_start)
+
+        sync_point = await asyncio.to_thread(self.match_store.get_sync_point, puuid)
+        start_time = self._sync_start_time(window_start, sync_point)
+
+        known_ids = set(await asyncio.to_thread(self.match_store.get_player_match_ids, puuid))
+        new_ids = [match_id for match_id in await self._list_match_ids(puuid, start_time) if match_id not in known_ids]
+
+        if sync_point:
+            print(f"Incremental refresh: {len(new_ids)} new matches since last sync")
+
+        if progress:
+            progress(0, len(new_ids))
+
+        entries = []
+        complete = True
+        semaphore = asyncio.Semaphore(self.concurrency)
+        for page_start in range(0, len(new_ids), self.PAGE_SIZE):
+            page = new_ids[page_start:page_start + self.PAGE_SIZE]
+            details = await asyncio.gather(*(self._limited(semaphore, self.get_match_details, match_id)
+                                             for match_id in page))
+            for match_id, match_data in zip(page, details):
+                if match_data and 'info' in match_data:
+                    entries.append((match_id, match_data['info'].get('gameCreation', 0)))
+                else:
+                    complete = False
+            if progress:
+                progress(page_start + len(page), len(new_ids))
+
+        return await asyncio.to_thread(self._record_refresh, puuid, sync_point, entries, complete, window_start)
+
+    async def _fetch_page(self, match_ids: List[str], timeline_ids: Set[str],
+                          semaphore: asyncio.Semaphore) -> List[Dict]:
+        """Fetch details (and timelines for timeline_ids) for one page of match IDs concurrently, keeping page order"""
+
+        async def fetch_timeline(match_id: str) -> Optional[Dict]:
+            try:
+                return await self._limited(semaphore, self.get_match_timeline, match_id)
+            except Exception as e:
+                print(f"Timeline fetch failed for {match_id}: {e}")
+                return None
+
+        details = await asyncio.gather(*(self._limited(semaphore, self.get_match_details, match_id)
+                                         for match_id in match_ids))
+        page_matches = [(match_id, match_data) for match_id, match_data in zip(match_ids, details) if match_data]
+
+        wanted = [(match_id, match_data) for match_id, match_data in page_matches if match_id in timeline_ids]
+        timelines = await asyncio.gather(*(fetch_timeline(match_id) for match_id, _ in wanted))
+        for (_, match_data), timeline in zip(wanted, timelines):
+            if timeline:
+                match_data['timeline'] = timeline
+
+        return [match_data for _, match_data in page_matches]
+
+    async def iter_matches(self, match_ids: List[str], include_timeline: bool = False,
+                           progress: Optional[Callable[[int, int], None]] = None,
+                           timeline_ids: Optional[Set[str]] = None) -> AsyncIterator[Dict]:
+        """Yield details for the given match IDs in order as each page finishes (see RiotAPIClient.iter_matches)
+
+        At most one page of full matches is held in memory at a time.
+        """
+        if not include_timeline:
+            timeline_ids = set()
+        elif timeline_ids is None:
+            timeline_ids = MatchDataProcessor.timeline_match_ids(match_ids)
+
+        if progress:
+            progress(0, len(match_ids))
+
+        retrieved = 0
+        semaphore = asyncio.Semaphore(self.concurrency)
+        for page_start in range(0, len(match_ids), self.PAGE_SIZE):
+            page = match_ids[page_start:page_start + self.PAGE_SIZE]
+            for match_data in await self._fetch_page(page, timeline_ids, semaphore):
+                retrieved += 1
+                if progress:
+                    progress(retrieved, len(match_ids))
+                yield match_data
+
+        print(f"Total matches retrieved: {retrieved}")
+
+    async def iter_full_year_matches(self, puuid: str, include_timeline: bool = False,
+                                     progress: Optional[Callable[[int, int], None]] = None) -> AsyncIterator[Dict]:
+        """Yield matches from the past year, syncing the match history incrementally first.
+
+        If include_timeline is True, attaches timeline under key 'timeline' for each match.
+        """
+        print(f"Fetching matches from the past year...")
+
+        match_ids = await self.refresh_match_history(puuid, progress=progress)
+        print(f"Found {len(match_ids)} match IDs. Retrieving details...")
+
+        async for match_data in self.iter_matches(match_ids, include_timeline=include_timeline, progress=progress):
+            yield match_data
+
+    async def get_full_year_matches(self, puuid: str, include_timeline: bool = False) -> List[Dict]:
+        """Get all matches from the past year for a player, fetching each page concurrently.
+        If include_timeline is True, attaches timeline under key 'timeline' for each match.
+        """
+        return [match_data async for match_data in self.iter_full_year_matches(puuid, include_timeline)]
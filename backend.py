@@ -5,85 +5,327 @@ Uses AWS Bedrock and Riot API to generate personalized player insights
 
 import os
 import json
-import time
-from typing import Dict, List, Optional
+import hashlib
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from datetime import datetime, timedelta
 import requests
+from requests.adapters import HTTPAdapter
 import boto3
 from dotenv import load_dotenv
 from pathlib import Path
+from urllib.parse import urlparse
+
+from storage import MatchStore, ResponseStore, TimelineCache
+from cache import LeaderAbandoned, SingleFlight, TTLCache
+from rate_limiter import RateLimiter
+from match_table import MatchTable
 
 # Load environment variables
 load_dotenv()
 
 
-class RiotAPIClient:
-    """Client for interacting with Riot Games API"""
+class RiotClientBase:
+    """Routing, rate limiters, lookup caches and stores shared by the Riot API clients
+
+    Makes no requests itself: RiotAPIClient (requests) and AsyncRiotAPIClient (aiohttp)
+    add the HTTP session and the endpoint methods on top.
+    """
 
     # Riot API endpoints by region
     REGIONS = {
         'na1': 'https://na1.api.riotgames.com',
+        'br1': 'https://br1.api.riotgames.com',
+        'la1': 'https://la1.api.riotgames.com',
+        'la2': 'https://la2.api.riotgames.com',
         'euw1': 'https://euw1.api.riotgames.com',
+        'eun1': 'https://eun1.api.riotgames.com',
+        'tr1': 'https://tr1.api.riotgames.com',
+        'ru': 'https://ru.api.riotgames.com',
+        'me1': 'https://me1.api.riotgames.com',
         'kr': 'https://kr.api.riotgames.com',
-        'br1': 'https://br1.api.riotgames.com',
+        'jp1': 'https://jp1.api.riotgames.com',
+        'oc1': 'https://oc1.api.riotgames.com',
+        'ph2': 'https://ph2.api.riotgames.com',
+        'sg2': 'https://sg2.api.riotgames.com',
+        'th2': 'https://th2.api.riotgames.com',
+        'tw2': 'https://tw2.api.riotgames.com',
+        'vn2': 'https://vn2.api.riotgames.com',
     }
 
     REGIONAL_ENDPOINTS = {
         'americas': 'https://americas.api.riotgames.com',
         'europe': 'https://europe.api.riotgames.com',
         'asia': 'https://asia.api.riotgames.com',
+        'sea': 'https://sea.api.riotgames.com',
     }
 
-    def __init__(self, api_key: str, region: str = 'na1'):
+    # Retries for a single call that keeps coming back 429
+    MAX_RETRIES = 3
+
+    # Keep-alive connections kept open per host (platform and regional hosts each get a pool)
+    DEFAULT_POOL_SIZE = int(os.getenv('RIOT_POOL_SIZE', '10'))
+
+    # Lookup cache lifetimes: Riot ID -> account rarely changes, summoner level/icon more often,
+    # and unknown Riot IDs (typos) are only remembered briefly in case the account appears
+    ACCOUNT_CACHE_TTL = float(os.getenv('RIOT_ACCOUNT_CACHE_TTL_SECONDS', '86400'))
+    SUMMONER_CACHE_TTL = float(os.getenv('RIOT_SUMMONER_CACHE_TTL_SECONDS', '600'))
+    NEGATIVE_LOOKUP_TTL = float(os.getenv('RIOT_NEGATIVE_LOOKUP_TTL_SECONDS', '60'))
+    LOOKUP_CACHE_SIZE = int(os.getenv('RIOT_LOOKUP_CACHE_SIZE', '10000'))
+
+    # Cached marker for lookups that came back 404
+    _NOT_FOUND = object()
+
+
+    def __init__(self, api_key: str, region: str = 'na1', match_store: Optional[MatchStore] = None,
+                 timeline_cache: Optional[TimelineCache] = None, rate_limiter: Optional[RateLimiter] = None,
+                 pool_size: int = DEFAULT_POOL_SIZE, regional_rate_limiter: Optional[RateLimiter] = None,
+                 base_url_override: Optional[str] = None, account_rate_limiter: Optional[RateLimiter] = None):
         self.api_key = api_key
         self.region = region
-        self.base_url = self.REGIONS.get(region, self.REGIONS['na1'])
+        base_url = self.REGIONS.get(region, self.REGIONS['na1'])
 
         # Map platform to regional routing
-        self.regional_url = self._get_regional_endpoint(region)
+        regional_url = self._get_regional_endpoint(region)
+        account_url = self._get_account_endpoint(region)
+
+        # Optionally send everything to a stand-in server (e.g. benchmarks/fake_riot_server.py)
+        override = base_url_override or os.getenv('RIOT_API_BASE_URL')
+        self.base_url, self.regional_url, self.account_url = (
+            self._override_url(url, override) if override else url
+            for url in (base_url, regional_url, account_url)
+        )
+
+        # Optional persistent store for finished matches (checked before calling Riot)
+        self.match_store = match_store
+        # Optional bounded, compressed cache for timelines
+        self.timeline_cache = timeline_cache
+
+        # App- and method-level rate limits, learned from response headers. Riot budgets each
+        # routing host separately, so platform (summoner, league), regional (match) and
+        # account calls are scheduled against their own limiters.
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.regional_rate_limiter = regional_rate_limiter or RateLimiter()
+        if account_rate_limiter is None and account_url == regional_url:
+            account_rate_limiter = self.regional_rate_limiter
+        self.account_rate_limiter = account_rate_limiter or RateLimiter()
+        self._host_limiters = {
+            self.base_url: self.rate_limiter,
+            self.account_url: self.account_rate_limiter,
+            self.regional_url: self.regional_rate_limiter
+        }
+
+        # Riot ID -> account and PUUID -> summoner, so repeat lookups skip both round trips
+        self.account_cache = TTLCache(max_entries=self.LOOKUP_CACHE_SIZE, ttl_seconds=self.ACCOUNT_CACHE_TTL)
+        self.summoner_cache = TTLCache(max_entries=self.LOOKUP_CACHE_SIZE, ttl_seconds=self.SUMMONER_CACHE_TTL)
+
+        # Connections kept open per host by the subclass's HTTP session
+        self.pool_size = pool_size
 
-    def _get_regional_endpoint(self, platform: str) -> str:
+    @classmethod
+    def _get_regional_endpoint(cls, platform: str) -> str:
         """Map platform to regional routing endpoint"""
         if platform in ['na1', 'br1', 'la1', 'la2']:
-            return self.REGIONAL_ENDPOINTS['americas']
-        elif platform in ['euw1', 'eun1', 'tr1', 'ru']:
-            return self.REGIONAL_ENDPOINTS['europe']
+            return cls.REGIONAL_ENDPOINTS['americas']
+        elif platform in ['euw1', 'eun1', 'tr1', 'ru', 'me1']:
+            return cls.REGIONAL_ENDPOINTS['europe']
+        elif platform in ['oc1', 'ph2', 'sg2', 'th2', 'tw2', 'vn2']:
+            return cls.REGIONAL_ENDPOINTS['sea']
         else:
-            return self.REGIONAL_ENDPOINTS['asia']
+            return cls.REGIONAL_ENDPOINTS['asia']
 
-    def _make_request(self, url: str) -> Optional[Dict]:
-        """Make API request with rate limiting and error handling"""
-        headers = {'X-Riot-Token': self.api_key}
+    @classmethod
+    def _get_account_endpoint(cls, platform: str) -> str:
+        """Regional host for account-v1, which is not served from the sea cluster (those players resolve through asia)"""
+        regional_url = cls._get_regional_endpoint(platform)
+        return cls.REGIONAL_ENDPOINTS['asia'] if regional_url == cls.REGIONAL_ENDPOINTS['sea'] else regional_url
 
-        try:
-            response = requests.get(url, headers=headers, timeout=15)
+    @staticmethod
+    def _override_url(url: str, override: str) -> str:
+        """Rewrite https://<routing>.api.riotgames.com to <override>/<routing>
+
+        Keeping the routing value as the first path segment keeps platform and regional
+        hosts distinct, so per-host rate limiting still applies.
+        """
+        routing = urlparse(url).hostname.split('.')[0]
+        return f"{override.rstrip('/')}/{routing}"
+
+    def _limiter_for(self, url: str) -> RateLimiter:
+        """Rate limiter of the routing host a URL is sent to (platform, regional or account host)"""
+        for host, limiter in self._host_limiters.items():
+            if url.startswith(host + '/'):
+                return limiter
+        raise ValueError(f"Not a routing host of this client: {url}")
+
+
+    @staticmethod
+    def _riot_id_key(game_name: str, tag_line: str) -> str:
+        """Riot IDs are case-insensitive, so 'Faker#KR1' and 'faker#kr1' share a cache entry"""
+        return f"{game_name.strip()}#{tag_line.strip()}".lower()
+
+    def _cached_lookup(self, cache: TTLCache, key: str) -> Tuple[bool, Optional[Dict]]:
+        """(hit, value) for a lookup cache; a cached 404 is a hit with value None"""
+        cached = cache.get(key)
+        if cached is None:
+            return False, None
+        if cached is self._NOT_FOUND:
+            return True, None
+        return True, dict(cached)  # Callers may annotate the result
+
+    def _store_lookup(self, cache: TTLCache, key: str, status: Optional[int], data: Optional[Dict]) -> None:
+        """Cache a successful lookup, or a 404 for a short while; other failures are not cached"""
+        if data is not None:
+            cache.set(key, dict(data))
+        elif status == 404:
+            cache.set(key, self._NOT_FOUND, ttl_seconds=self.NEGATIVE_LOOKUP_TTL)
+
+    @staticmethod
+    def _window_start(days: int) -> int:
+        """Epoch seconds of the start of a refresh window ending now"""
+        return int((datetime.now() - timedelta(days=days)).timestamp())
+
+    @staticmethod
+    def _sync_start_time(window_start: int, sync_point: Optional[Dict]) -> int:
+        """startTime for listing match IDs: the newest known match, or the window start on a first crawl"""
+        if sync_point and sync_point['game_creation']:
+            # Riot's startTime is inclusive, so the newest known match comes back too and is deduplicated
+            return max(window_start, sync_point['game_creation'] // 1000)
+        return window_start
+
+    def _record_refresh(self, puuid: str, sync_point: Optional[Dict], entries: List[Tuple[str, int]],
+                        complete: bool, window_start: int) -> List[str]:
+        """Store the (match ID, gameCreation) pairs of a refresh and return the window's match IDs, newest first
+
+        Only moves the sync point forward when nothing was skipped, so failed matches are retried next time.
+        """
+        self.match_store.add_player_matches(puuid, entries)
+        self.match_store.prune_player_matches(puuid, window_start * 1000)
+
+        if complete:
+            newest_id, newest_creation = (sync_point['match_id'], sync_point['game_creation']) if sync_point else (None, None)
+            for match_id, game_creation in entries:
+                if newest_creation is None or game_creation > newest_creation:
+                    newest_id, newest_creation = match_id, game_creation
+            self.match_store.set_sync_point(puuid, newest_id, newest_creation)
+
+        return self.match_store.get_player_match_ids(puuid, since_ms=window_start * 1000)
+
+
+class RiotAPIClient(RiotClientBase):
+    """Client for interacting with Riot Games API"""
+
+    def __init__(self, api_key: str, region: str = 'na1', match_store: Optional[MatchStore] = None,
+                 timeline_cache: Optional[TimelineCache] = None, rate_limiter: Optional[RateLimiter] = None,
+                 pool_size: int = RiotClientBase.DEFAULT_POOL_SIZE, regional_rate_limiter: Optional[RateLimiter] = None,
+                 session: Optional[requests.Session] = None, base_url_override: Optional[str] = None,
+                 account_rate_limiter: Optional[RateLimiter] = None):
+        super().__init__(api_key, region=region, match_store=match_store, timeline_cache=timeline_cache,
+                         rate_limiter=rate_limiter, pool_size=pool_size, regional_rate_limiter=regional_rate_limiter,
+                         base_url_override=base_url_override, account_rate_limiter=account_rate_limiter)
+
+        # Pooled keep-alive session so the TLS handshake is paid once per connection, not per call
+        # (may be shared between clients, e.g. by RiotClientPool, which then owns it)
+        self._owns_session = session is None
+        self.session = session or self._create_session(api_key, pool_size)
+
+    @staticmethod
+    def _create_session(api_key: str, pool_size: int, hosts: int = 4) -> requests.Session:
+        """Build a keep-alive session with a connection pool of pool_size for each of up to `hosts` hosts"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=hosts, pool_maxsize=pool_size, pool_block=True)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({
+            'X-Riot-Token': api_key,
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive'
+        })
+        return session
+
+    def get_connection_stats(self) -> Dict[str, Dict]:
+        """Connection reuse per host: requests sent vs. connections opened"""
+        stats = {}
+        for adapter in set(self.session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                host = f"{key.key_scheme}://{key.key_host}"
+                stats[host] = {
+                    'requests': pool.num_requests,
+                    'connections_opened': pool.num_connections,
+                    'reused': max(pool.num_requests - pool.num_connections, 0)
+                }
+        return stats
+
+    def close(self) -> None:
+        """Close pooled connections (unless the session is shared)"""
+        if self._owns_session:
+            self.session.close()
+
+    def _make_request(self, url: str, method: str = 'default') -> Optional[Dict]:
+        """Make API request with header-driven rate limiting and error handling
+
+        Args:
+            url: Full request URL
+            method: Rate-limit bucket for the endpoint (e.g. 'match', 'timeline')
+        """
+        return self._request(url, method)[1]
+
+    def _request(self, url: str, method: str = 'default') -> Tuple[Optional[int], Optional[Dict]]:
+        """Like _make_request, but returns (status_code, data); status is None if no response arrived"""
+        rate_limiter = self._limiter_for(url)
+        status = None
+        for attempt in range(self.MAX_RETRIES + 1):
+            rate_limiter.acquire(method)
+
+            try:
+                response = self.session.get(url, timeout=15)
+            except Exception as e:
+                print(f"Request failed: {e}")
+                return None, None
+
+            rate_limiter.update_from_headers(method, response.headers)
+            status = response.status_code
 
             if response.status_code == 200:
-                return response.json()
+                return status, response.json()
             elif response.status_code == 429:
-                # Rate limited - wait and retry
-                retry_after = int(response.headers.get('Retry-After', 1))
-                print(f"Rate limited. Waiting {retry_after} seconds...")
-                time.sleep(retry_after)
-                return self._make_request(url)
+                # Rate limited - the limiter holds back further calls until Retry-After passes
+                retry_after = rate_limiter.handle_429(method, response.headers)
+                print(f"Rate limited ({response.headers.get('X-Rate-Limit-Type', 'unknown')}). "
+                      f"Backing off {retry_after} seconds (attempt {attempt + 1}/{self.MAX_RETRIES + 1})...")
             else:
                 print(f"Error {response.status_code}: {response.text}")
-                return None
+                return status, None
 
-        except Exception as e:
-            print(f"Request failed: {e}")
-            return None
+        print(f"Giving up after {self.MAX_RETRIES + 1} rate-limited attempts: {url}")
+        return status, None
 
     def get_account_by_riot_id(self, game_name: str, tag_line: str) -> Optional[Dict]:
         """Get account information by Riot ID (gameName#tagLine)"""
+        key = self._riot_id_key(game_name, tag_line)
+        hit, account = self._cached_lookup(self.account_cache, key)
+        if hit:
+            return account
+
         # Use regional endpoint for account API
-        url = f"{self.regional_url}/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
-        return self._make_request(url)
+        url = f"{self.account_url}/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
+        status, account = self._request(url, method='account')
+        self._store_lookup(self.account_cache, key, status, account)
+        return account
 
     def get_summoner_by_puuid(self, puuid: str) -> Optional[Dict]:
         """Get summoner information by PUUID"""
+        hit, summoner = self._cached_lookup(self.summoner_cache, puuid)
+        if hit:
+            return summoner
+
         url = f"{self.base_url}/lol/summoner/v4/summoners/by-puuid/{puuid}"
-        return self._make_request(url)
+        status, summoner = self._request(url, method='summoner')
+        self._store_lookup(self.summoner_cache, puuid, status, summoner)
+        return summoner
 
     def get_summoner_by_riot_id(self, riot_id: str) -> Optional[Dict]:
         """Get summoner information by Riot ID (gameName#tagLine)
@@ -131,17 +373,47 @@ class RiotAPIClient:
         if start_time:
             url += f"&startTime={start_time}"
 
-        return self._make_request(url)
+        return self._make_request(url, method='match-ids')
 
     def get_match_details(self, match_id: str) -> Optional[Dict]:
-        """Get detailed match information"""
+        """Get detailed match information
+
+        Checks the match store first; matches fetched from Riot are written through to it.
+        """
+        if self.match_store is not None:
+            cached = self.match_store.get(match_id)
+            if cached is not None:
+                return cached
+
         url = f"{self.regional_url}/lol/match/v5/matches/{match_id}"
-        return self._make_request(url)
+        match_data = self._make_request(url, method='match')
+
+        if match_data and self.match_store is not None and 'info' in match_data:
+            self.match_store.put(match_id, match_data)
+
+        return match_data
     
     def get_match_timeline(self, match_id: str) -> Optional[Dict]:
-        """Get timeline data for a match (frames with events)"""
+        """Get item events from a match timeline
+
+        The timeline is pruned to per-participant item events (see
+        MatchDataProcessor.prune_timeline) as soon as it arrives, then cached.
+        """
+        if self.timeline_cache is not None:
+            cached = self.timeline_cache.get(match_id)
+            if cached is not None:
+                return MatchDataProcessor.prune_timeline(cached)
+
         url = f"{self.regional_url}/lol/match/v5/matches/{match_id}/timeline"
-        return self._make_request(url)
+        timeline = self._make_request(url, method='timeline')
+        if not timeline or 'info' not in timeline:
+            return None
+
+        timeline = MatchDataProcessor.prune_timeline(timeline)
+        if self.timeline_cache is not None:
+            self.timeline_cache.put(match_id, timeline)
+
+        return timeline
     
     def get_ranked_info(self, summoner_id: str) -> Optional[List[Dict]]:
         """Get ranked information for a summoner
@@ -153,7 +425,7 @@ class RiotAPIClient:
             List of ranked entries (one per queue type)
         """
         url = f"{self.base_url}/lol/league/v4/entries/by-summoner/{summoner_id}"
-        return self._make_request(url)
+        return self._make_request(url, method='league')
 
     def get_ranked_info_by_puuid(self, puuid: str) -> Optional[List[Dict]]:
         """Get ranked information using PUUID directly
@@ -168,53 +440,27 @@ class RiotAPIClient:
             List of ranked entries (one per queue type)
         """
         url = f"{self.base_url}/lol/league/v4/entries/by-puuid/{puuid}"
-        return self._make_request(url)
-
-    def get_full_year_matches(self, puuid: str, include_timeline: bool = False) -> List[Dict]:
-        """Get all matches from the past year for a player.
-        If include_timeline is True, attaches timeline under key 'timeline' for each match.
-        """
-        # Calculate timestamp for 1 year ago
-        one_year_ago = int((datetime.now() - timedelta(days=365)).timestamp())
+        return self._make_request(url, method='league')
 
-        all_matches = []
+    def _list_match_ids(self, puuid: str, start_time: int) -> List[str]:
+        """Page through match IDs played since start_time (epoch seconds), newest first"""
+        all_ids = []
         start_index = 0
         batch_size = 100
 
-        print(f"Fetching matches from the past year...")
-
         while True:
             # Get match IDs with pagination
             match_ids = self.get_match_history(
                 puuid=puuid,
                 count=batch_size,
-                start_time=one_year_ago,
+                start_time=start_time,
                 start=start_index
             )
 
             if not match_ids:
                 break
 
-            print(f"Fetched {len(match_ids)} match IDs. Retrieving details...")
-
-            # Get details for each match
-            timeline_fetched = 0
-            for match_id in match_ids:
-                match_data = self.get_match_details(match_id)
-                if match_data:
-                    if include_timeline:
-                        try:
-                            # Avoid overloading Riot API: cap timelines per page
-                            if timeline_fetched < 10:
-                                timeline = self.get_match_timeline(match_id)
-                                if timeline:
-                                    match_data['timeline'] = timeline
-                                timeline_fetched += 1
-                                time.sleep(0.05)
-                        except Exception as e:
-                            print(f"Timeline fetch failed for {match_id}: {e}")
-                    all_matches.append(match_data)
-                time.sleep(0.05)  # Small delay to avoid rate limiting
+            all_ids.extend(match_ids)
 
             # If we got fewer than batch_size, we've reached the end
             if len(match_ids) < batch_size:
@@ -222,16 +468,195 @@ class RiotAPIClient:
 
             start_index += batch_size
 
-        print(f"Total matches retrieved: {len(all_matches)}")
-        return all_matches
+        return all_ids
+
+    def refresh_match_history(self, puuid: str, days: int = 365,
+                              progress: Optional[Callable[[int, int], None]] = None) -> List[str]:
+        """Get the IDs of all matches in the window (newest first), fetching only what is new
+
+        With a match store, the newest match seen for this PUUID is remembered: a refresh
+        lists only matches since then, stores their details, merges them into the known
+        history and ages out entries older than the window. Without a store every call
+        lists the full window. If given, progress(downloaded, new matches) follows the
+        detail downloads, which are most of a first crawl's network calls.
+        """
+        window_start = self._window_start(days)
+
+        if self.match_store is None:
+            return self._list_match_ids(puuid, window_start)
+
+        sync_point = self.match_store.get_sync_point(puuid)
+        start_time = self._sync_start_time(window_start, sync_point)
+
+        known_ids = set(self.match_store.get_player_match_ids(puuid))
+        new_ids = [match_id for match_id in self._list_match_ids(puuid, start_time) if match_id not in known_ids]
+
+        if sync_point:
+            print(f"Incremental refresh: {len(new_ids)} new matches since last sync")
+
+        if progress:
+            progress(0, len(new_ids))
+
+        entries = []
+        complete = True
+        for downloaded, match_id in enumerate(new_ids, start=1):
+            match_data = self.get_match_details(match_id)
+            if match_data and 'info' in match_data:
+                entries.append((match_id, match_data['info'].get('gameCreation', 0)))
+            else:
+                complete = False
+            if progress:
+                progress(downloaded, len(new_ids))
+
+        return self._record_refresh(puuid, sync_point, entries, complete, window_start)
+
+    def iter_full_year_matches(self, puuid: str, include_timeline: bool = False,
+                               progress: Optional[Callable[[int, int], None]] = None) -> Iterator[Dict]:
+        """Yield matches from the past year one at a time as they are fetched.
+
+        Callers should fold each match into their results and drop it, so memory stays
+        flat regardless of how many games the player has.
+        If include_timeline is True, attaches timeline under key 'timeline' for each match.
+        If given, progress(fetched, total) first follows the download of new matches
+        (see refresh_match_history), then restarts at 0 and is called after each match yielded.
+        """
+        print(f"Fetching matches from the past year...")
+
+        match_ids = self.refresh_match_history(puuid, progress=progress)
+        print(f"Found {len(match_ids)} match IDs. Retrieving details...")
+
+        return self.iter_matches(match_ids, include_timeline=include_timeline, progress=progress)
+
+    def iter_matches(self, match_ids: List[str], include_timeline: bool = False,
+                     progress: Optional[Callable[[int, int], None]] = None,
+                     timeline_ids: Optional[Set[str]] = None) -> Iterator[Dict]:
+        """Yield details for the given match IDs one at a time (see iter_full_year_matches)
+
+        Timelines are fetched for timeline_ids, which defaults to the timeline budget of
+        match_ids itself; pass the budget of a longer list when match_ids is a subset of it.
+        """
+        if include_timeline and timeline_ids is None:
+            timeline_ids = MatchDataProcessor.timeline_match_ids(match_ids)
+
+        if progress:
+            progress(0, len(match_ids))
+
+        retrieved = 0
+        for match_id in match_ids:
+            match_data = self.get_match_details(match_id)
+            if match_data:
+                if include_timeline and match_id in timeline_ids:
+                    try:
+                        timeline = self.get_match_timeline(match_id)
+                        if timeline:
+                            match_data['timeline'] = timeline
+                    except Exception as e:
+                        print(f"Timeline fetch failed for {match_id}: {e}")
+                retrieved += 1
+                if progress:
+                    progress(retrieved, len(match_ids))
+                yield match_data
+
+        print(f"Total matches retrieved: {retrieved}")
+
+    def get_full_year_matches(self, puuid: str, include_timeline: bool = False) -> List[Dict]:
+        """Get all matches from the past year for a player.
+        If include_timeline is True, attaches timeline under key 'timeline' for each match.
+
+        Holds every match in memory; prefer iter_full_year_matches for aggregation.
+        """
+        return list(self.iter_full_year_matches(puuid, include_timeline=include_timeline))
+
+
+class RiotClientPool:
+    """One RiotAPIClient per platform, with a rate limiter per routing host
+
+    Platform hosts (na1, euw1, ...) and regional hosts (americas, europe, asia, sea)
+    each get their own RateLimiter, shared by every client routed through that host
+    (e.g. na1 and br1 both use americas). All clients share one session in which
+    each host has its own keep-alive pool, so a spike in one region cannot use up
+    another region's budget or connections.
+    """
+
+    def __init__(self, api_key: str, match_store: Optional[MatchStore] = None,
+                 timeline_cache: Optional[TimelineCache] = None,
+                 pool_size: int = RiotAPIClient.DEFAULT_POOL_SIZE, base_url_override: Optional[str] = None):
+        self.api_key = api_key
+        self.base_url_override = base_url_override
+        self.match_store = match_store
+        self.timeline_cache = timeline_cache
+        self.pool_size = pool_size
+
+        hosts = len(RiotAPIClient.REGIONS) + len(RiotAPIClient.REGIONAL_ENDPOINTS)
+        self.session = RiotAPIClient._create_session(api_key, pool_size, hosts=hosts)
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._clients: Dict[str, RiotAPIClient] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def platforms() -> List[str]:
+        return list(RiotAPIClient.REGIONS)
+
+    def _limiter(self, host: str) -> RateLimiter:
+        """Rate limiter for a routing host (lock held)"""
+        if host not in self._limiters:
+            self._limiters[host] = RateLimiter()
+        return self._limiters[host]
+
+    def get(self, region: str) -> RiotAPIClient:
+        """Client for a platform such as 'na1' or 'euw1'; raises ValueError for unknown platforms"""
+        region = region.lower()
+        if region not in RiotAPIClient.REGIONS:
+            raise ValueError(f"Unknown region '{region}'. Supported: {', '.join(RiotAPIClient.REGIONS)}")
+
+        with self._lock:
+            client = self._clients.get(region)
+            if client is None:
+                client = RiotAPIClient(
+                    api_key=self.api_key,
+                    region=region,
+                    match_store=self.match_store,
+                    timeline_cache=self.timeline_cache,
+                    rate_limiter=self._limiter(RiotAPIClient.REGIONS[region]),
+                    regional_rate_limiter=self._limiter(RiotAPIClient._get_regional_endpoint(region)),
+                    account_rate_limiter=self._limiter(RiotAPIClient._get_account_endpoint(region)),
+                    pool_size=self.pool_size,
+                    session=self.session,
+                    base_url_override=self.base_url_override
+                )
+                self._clients[region] = client
+            return client
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Rate-limit usage per routing host"""
+        with self._lock:
+            limiters = dict(self._limiters)
+        return {host: limiter.get_stats() for host, limiter in limiters.items()}
+
+    def close(self) -> None:
+        self.session.close()
 
 
 class AWSBedrockClient:
-    """Client for interacting with AWS Bedrock AI models"""
+    """Client for interacting with AWS Bedrock AI models
+
+    Responses are cached by a hash of (model, prompt, max_tokens, temperature): in
+    memory with an LRU bound and TTL, and optionally on disk through a ResponseStore
+    so they survive restarts. Identical prompts (e.g. reloading a player with no new
+    matches) are answered without another model call.
+    """
 
-    def __init__(self, region: str = 'us-east-1', model_id: str = None):
+    def __init__(self, region: str = 'us-east-1', model_id: str = None,
+                 response_cache: Optional[TTLCache] = None, response_store: Optional[ResponseStore] = None):
         self.region = region
         self.model_id = model_id or os.getenv('BEDROCK_MODEL_ID', 'us.anthropic.claude-3-5-sonnet-20241022-v2:0')
+        # In-memory copies; the optional on-disk ResponseStore is sized by LLM_CACHE_MAX_ENTRIES
+        self.response_cache = response_cache or TTLCache(
+            max_entries=int(os.getenv('LLM_MEMORY_CACHE_MAX_ENTRIES', '256')),
+            ttl_seconds=float(os.getenv('LLM_CACHE_TTL_SECONDS', '86400'))
+        )
+        self.response_store = response_store
+        self._in_flight = SingleFlight()
 
         # Initialize Bedrock client
         self.client = boto3.client(
@@ -241,11 +666,10 @@ class AWSBedrockClient:
             aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY')
         )
 
-    def generate_insights(self, prompt: str, max_tokens: int = 4096) -> str:
-        """Generate AI insights using Claude via Bedrock"""
-
-        # Prepare request body for Claude
-        request_body = {
+    @staticmethod
+    def _request_body(prompt: str, max_tokens: int, temperature: float) -> str:
+        """Claude messages request body for Bedrock"""
+        return json.dumps({
             "anthropic_version": "bedrock-2023-05-31",
             "max_tokens": max_tokens,
             "messages": [
@@ -254,262 +678,562 @@ class AWSBedrockClient:
                     "content": prompt
                 }
             ],
-            "temperature": 0.7
-        }
+            "temperature": temperature
+        })
+
+    def cache_key(self, prompt: str, max_tokens: int, temperature: float) -> str:
+        """Content address of a generation request"""
+        request = json.dumps([self.model_id, prompt, max_tokens, temperature], separators=(',', ':'))
+        return hashlib.sha256(request.encode('utf-8')).hexdigest()
+
+    def _cached_response(self, key: str) -> Optional[str]:
+        response = self.response_cache.get(key)
+        if response is None and self.response_store is not None:
+            response = self.response_store.get(key)
+            if response is not None:
+                self.response_cache.set(key, response)
+        return response
+
+    def _cache_response(self, key: str, response: str) -> None:
+        self.response_cache.set(key, response)
+        if self.response_store is not None:
+            self.response_store.put(key, response)
+
+    def generate_insights(self, prompt: str, max_tokens: int = 4096, temperature: float = 0.7) -> str:
+        """Generate AI insights using Claude via Bedrock
+
+        Concurrent calls with an identical request share one model invocation.
+        """
+        key = self.cache_key(prompt, max_tokens, temperature)
+        cached = self._cached_response(key)
+        if cached is not None:
+            return cached
+
+        return self._in_flight.do(key, self._invoke, key, prompt, max_tokens, temperature)
 
+    def _invoke(self, key: str, prompt: str, max_tokens: int, temperature: float) -> str:
         try:
             # Invoke the model
             response = self.client.invoke_model(
                 modelId=self.model_id,
-                body=json.dumps(request_body)
+                body=self._request_body(prompt, max_tokens, temperature)
             )
 
             # Parse response
             response_body = json.loads(response['body'].read())
-            return response_body['content'][0]['text']
+            text = response_body['content'][0]['text']
 
         except Exception as e:
             print(f"Bedrock API error: {e}")
             return f"Error generating insights: {e}"
 
+        self._cache_response(key, text)
+        return text
 
-class MatchDataProcessor:
-    """Process Riot API match data into analytics"""
+    def stream_insights(self, prompt: str, max_tokens: int = 4096, temperature: float = 0.7) -> Iterator[str]:
+        """Generate AI insights like generate_insights, yielding text chunks as the model produces them
 
-    @staticmethod
-    def extract_player_stats(matches: List[Dict], puuid: str) -> Dict:
-        """Extract comprehensive statistics from match history"""
+        A cached response is yielded as a single chunk, as is the result of an identical
+        request already in flight. On failure the error message is yielded as the final
+        chunk, matching the text generate_insights would have returned.
+        """
+        key = self.cache_key(prompt, max_tokens, temperature)
+        cached = self._cached_response(key)
+        if cached is not None:
+            yield cached
+            return
+
+        call, leader = self._in_flight.begin(key)
+        if not leader:
+            try:
+                yield call.wait()
+                return
+            except LeaderAbandoned:
+                pass  # The leader's consumer went away mid-stream; generate our own below
+
+        chunks = []
+        try:
+            response = self.client.invoke_model_with_response_stream(
+                modelId=self.model_id,
+                body=self._request_body(prompt, max_tokens, temperature)
+            )
 
-        # Note: Do not filter by items.json here; frontend will map IDs to names and ignore unknowns
+            for event in response['body']:
+                chunk = event.get('chunk')
+                if not chunk:
+                    continue
+                payload = json.loads(chunk['bytes'])
+                if payload.get('type') == 'content_block_delta' and payload['delta'].get('type') == 'text_delta':
+                    chunks.append(payload['delta']['text'])
+                    yield payload['delta']['text']
+
+        except GeneratorExit:
+            # Consumer went away mid-stream (e.g. client disconnected)
+            if leader:
+                self._in_flight.finish(key, call, error=LeaderAbandoned('Insight stream abandoned by its consumer'))
+            raise
+        except Exception as e:
+            print(f"Bedrock API error: {e}")
+            error_text = f"Error generating insights: {e}"
+            if leader:
+                self._in_flight.finish(key, call, error_text)
+            yield error_text
+            return
 
-        stats = {
-            'total_matches': len(matches),
-            'wins': 0,
-            'losses': 0,
-            'total_kills': 0,
-            'total_deaths': 0,
-            'total_assists': 0,
-            'total_gold': 0,
-            'total_damage': 0,
-            'total_cs': 0,  # Total creep score
-            'total_vision_score': 0,
-            'total_damage_taken': 0,
-            'total_healing': 0,
-            'total_game_duration': 0,  # For per-minute calculations
-            'control_wards_purchased': 0,
-            'wards_placed': 0,
-            'wards_killed': 0,
-            'total_objectives': 0,
-            'solo_kills': 0,
-            'champions_played': {},
-            'roles_played': {},
-            'best_champion': None,
-            'longest_game': 0,
-            'shortest_game': float('inf'),
-            'pentakills': 0,
-            'quadrakills': 0,
-            'first_bloods': 0,
-            'match_history_by_month': {},
-            'early_game_cs': [],  # CS at 10 minutes for each game
-            'damage_share': [],  # Percent of team's damage
-            'gold_share': [],  # Percent of team's gold
-            # Item tracking
-            'items_per_match': [],  # {matchId, gameCreation, items:[ids], trinket:id}
-            'item_counts': {},      # {itemId: count}
-            'inventory_snapshots': [],  # {matchId, start:[ids], mid:[ids], final:[ids], trinketFinal:id}
-            # Grouped by champion for frontend item-usage analytics
-            'inventory_by_champion': {},  # {champion: {matches: n, start: [ [ids]... ], mid: [ [ids]... ], final: [ [ids]... ]}}
-        }
+        text = ''.join(chunks)
+        try:
+            self._cache_response(key, text)
+        finally:
+            # Release followers (and the key) even if the cache write fails
+            if leader:
+                self._in_flight.finish(key, call, text)
 
-        for match in matches:
-            # Find player's participant data
-            participant = None
-            for p in match['info']['participants']:
-                if p['puuid'] == puuid:
-                    participant = p
+
+class InventoryTracker:
+    """Replays one participant's item events into a current inventory
+
+    Held copies are kept in purchase order with a per-item stack of positions, so
+    selling, destroying or undoing the latest copy of an item is O(1).
+    """
+
+    def __init__(self):
+        self._order: Dict[int, int] = {}  # purchase sequence -> itemId, oldest first
+        self._positions: Dict[int, List[int]] = {}  # itemId -> sequences of held copies
+        self._sequence = 0
+
+    def add(self, item_id: int) -> None:
+        self._sequence += 1
+        self._order[self._sequence] = item_id
+        self._positions.setdefault(item_id, []).append(self._sequence)
+
+    def remove_latest(self, item_id: int) -> bool:
+        """Drop the most recently acquired copy of item_id, if one is held"""
+        positions = self._positions.get(item_id)
+        if not positions:
+            return False
+        del self._order[positions.pop()]
+        if not positions:
+            del self._positions[item_id]
+        return True
+
+    def apply(self, event_type: Optional[str], item_id=None, before_id=None, after_id=None) -> None:
+        """Apply one ITEM_* timeline event"""
+        if event_type == 'ITEM_PURCHASED':
+            iid = int(item_id or 0)
+            if iid > 0:
+                self.add(iid)
+        elif event_type in ('ITEM_SOLD', 'ITEM_DESTROYED'):
+            self.remove_latest(int(item_id or 0))
+        elif event_type == 'ITEM_UNDO':
+            # Undo afterId, then restore beforeId as if purchased
+            self.remove_latest(int(after_id or 0))
+            before = int(before_id or 0)
+            if before > 0:
+                self.add(before)
+
+    def snapshot(self, limit: int = 6) -> List[int]:
+        """Up to `limit` unique held items, preferring the most recent, in purchase order"""
+        seen: set = set()
+        result_rev: List[int] = []
+        for iid in reversed(self._order.values()):
+            if iid not in seen:
+                seen.add(iid)
+                result_rev.append(iid)
+                if len(result_rev) >= limit:
                     break
+        return list(reversed(result_rev))
 
-            if not participant:
-                continue
 
-            # Win/Loss
-            if participant['win']:
-                stats['wins'] += 1
-            else:
-                stats['losses'] += 1
+class PlayerStatsAggregate:
+    """Mergeable, serializable aggregate state behind MatchDataProcessor.extract_player_stats
 
-            # KDA stats
-            stats['total_kills'] += participant['kills']
-            stats['total_deaths'] += participant['deaths']
-            stats['total_assists'] += participant['assists']
+    Each match is reduced once to a compact per-match row, so adding, removing (for
+    matches that age out of the window) and merging cost O(changed matches). Totals,
+    per-champion, per-role and per-month aggregates are derived on demand in
+    to_stats() with vectorized group-bys over a columnar MatchTable.
+    """
 
-            # Other stats
-            stats['total_gold'] += participant['goldEarned']
-            stats['total_damage'] += participant['totalDamageDealtToChampions']
-            
-            # CS and farming stats
-            total_minions = participant.get('totalMinionsKilled', 0) + participant.get('neutralMinionsKilled', 0)
-            stats['total_cs'] += total_minions
-            
-            # Vision and map control
-            stats['total_vision_score'] += participant.get('visionScore', 0)
-            stats['control_wards_purchased'] += participant.get('detectorWardsPlaced', 0)
-            stats['wards_placed'] += participant.get('wardsPlaced', 0)
-            stats['wards_killed'] += participant.get('wardsKilled', 0)
-            
-            # Combat stats
-            stats['total_damage_taken'] += participant.get('totalDamageTaken', 0)
-            stats['total_healing'] += participant.get('totalHealsOnTeammates', 0)
-            stats['solo_kills'] += participant.get('soloKills', 0)
-            
-            # Objective participation (detailed tracking for macro analysis)
-            stats['total_objectives'] += (
+    # Per-match fields summed into the stats dict (row field -> stats key)
+    SUM_FIELDS = {
+        'kills': 'total_kills',
+        'deaths': 'total_deaths',
+        'assists': 'total_assists',
+        'gold': 'total_gold',
+        'damage': 'total_damage',
+        'cs': 'total_cs',
+        'vision_score': 'total_vision_score',
+        'damage_taken': 'total_damage_taken',
+        'healing': 'total_healing',
+        'duration': 'total_game_duration',
+        'control_wards': 'control_wards_purchased',
+        'wards_placed': 'wards_placed',
+        'wards_killed': 'wards_killed',
+        'objective_damage': 'total_objectives',
+        'solo_kills': 'solo_kills',
+        'pentakills': 'pentakills',
+        'quadrakills': 'quadrakills',
+        'first_blood': 'first_bloods',
+        'dragon_takedowns': 'dragonTakedowns',
+        'baron_takedowns': 'baronTakedowns',
+        'turret_kills': 'turretKills',
+        'turret_takedowns': 'turretTakedowns',
+        'inhibitor_kills': 'inhibitorKills',
+        'inhibitor_takedowns': 'inhibitorTakedowns',
+    }
+
+    # Item sections of the stats dict that to_stats() can skip; the first three need a pass over every row
+    PER_MATCH_SECTIONS = frozenset({'items_per_match', 'inventory_snapshots', 'inventory_by_champion'})
+    ITEM_SECTIONS = ('items_per_match', 'item_counts', 'inventory_snapshots', 'inventory_by_champion')
+
+    # Derived stats that add_derived_stats() leaves out when their inputs are empty
+    OPTIONAL_STATS = frozenset({'cs_per_min', 'gold_per_min', 'damage_per_min',
+                                'avg_cs_at_10', 'avg_damage_share', 'avg_gold_share'})
+
+    # Per-champion sums (row field -> champions_played key)
+    CHAMPION_FIELDS = {'win': 'wins', 'kills': 'kills', 'deaths': 'deaths', 'assists': 'assists', 'cs': 'cs'}
+
+    # Fallback role inference when Riot leaves teamPosition empty
+    SUPPORT_CHAMPIONS = ['Janna', 'Soraka', 'Lulu', 'Thresh', 'Blitzcrank', 'Leona', 'Nautilus', 'Braum']
+    JUNGLE_CHAMPIONS = ['Lee Sin', 'Elise', 'Graves', 'Kha\'Zix', 'Rek\'Sai', 'Nidalee', 'Kindred']
+
+    def __init__(self, puuid: str):
+        self.puuid = puuid
+        self.rows: Dict[str, Dict] = {}  # matchId -> per-match row, in insertion order
+        self.skipped: Dict[str, Optional[int]] = {}  # matchId -> gameCreation for matches without the player
+        self._auto_id = 0
+        self._table: Optional[MatchTable] = None  # Column view of rows, rebuilt after changes
+
+    @property
+    def total_matches(self) -> int:
+        return len(self.rows) + len(self.skipped)
+
+    def _match_key(self, match: Dict) -> str:
+        match_id = match.get('metadata', {}).get('matchId')
+        if match_id is None:
+            # Matches without an ID can be added but not removed by ID
+            self._auto_id += 1
+            match_id = f"_unidentified_{self._auto_id}"
+        return match_id
+
+    @classmethod
+    def build_row(cls, match: Dict, puuid: str) -> Optional[Dict]:
+        """Reduce one match to the player's per-match row (None if the player isn't in it)"""
+        # One pass over participants: find the player and total damage/gold per team
+        participant = None
+        team_totals: Dict[int, List[int]] = {}
+        for p in match['info']['participants']:
+            if p['puuid'] == puuid:
+                participant = p
+            totals = team_totals.setdefault(p['teamId'], [0, 0])
+            totals[0] += p['totalDamageDealtToChampions']
+            totals[1] += p['goldEarned']
+
+        if not participant:
+            return None
+
+        # CS and farming stats
+        total_minions = participant.get('totalMinionsKilled', 0) + participant.get('neutralMinionsKilled', 0)
+        duration = match['info']['gameDuration']
+
+        # Dragon and baron takedowns are in the challenges object
+        challenges = participant.get('challenges', {})
+
+        row = {
+            'matchId': match.get('metadata', {}).get('matchId'),
+            'gameCreation': match['info'].get('gameCreation'),
+            'month': datetime.fromtimestamp(match['info']['gameCreation'] / 1000).strftime('%Y-%m'),
+            'win': bool(participant['win']),
+            'champion': participant['championName'],
+            'kills': participant['kills'],
+            'deaths': participant['deaths'],
+            'assists': participant['assists'],
+            'gold': participant['goldEarned'],
+            'damage': participant['totalDamageDealtToChampions'],
+            'cs': total_minions,
+            'vision_score': participant.get('visionScore', 0),
+            'control_wards': participant.get('detectorWardsPlaced', 0),
+            'wards_placed': participant.get('wardsPlaced', 0),
+            'wards_killed': participant.get('wardsKilled', 0),
+            'damage_taken': participant.get('totalDamageTaken', 0),
+            'healing': participant.get('totalHealsOnTeammates', 0),
+            'solo_kills': participant.get('soloKills', 0),
+            # Objective participation; summed as raw damage so removals don't drift
+            'objective_damage': (
                 participant.get('damageDealtToObjectives', 0) +
                 participant.get('damageDealtToTurrets', 0)
-            ) / 10000  # Normalize large numbers
-            
-            # Specific objective stats for macro advice
-            if 'dragonTakedowns' not in stats:
-                stats['dragonTakedowns'] = 0
-                stats['baronTakedowns'] = 0
-                stats['turretKills'] = 0
-                stats['turretTakedowns'] = 0
-                stats['inhibitorKills'] = 0
-                stats['inhibitorTakedowns'] = 0
-            
-            # Dragon and baron takedowns are in the challenges object
-            challenges = participant.get('challenges', {})
-            stats['dragonTakedowns'] += challenges.get('dragonTakedowns', 0)
-            stats['baronTakedowns'] += challenges.get('baronTakedowns', 0)
-            stats['turretKills'] += participant.get('turretKills', 0)
-            stats['turretTakedowns'] += participant.get('turretTakedowns', 0)
-            stats['inhibitorKills'] += participant.get('inhibitorKills', 0)
-            stats['inhibitorTakedowns'] += participant.get('inhibitorTakedowns', 0)
-            
-            # Game duration for per-minute calculations
-            duration = match['info']['gameDuration']
-            stats['total_game_duration'] += duration
-            
-            # Early game CS (if timeline data available)
-            # Note: Riot API doesn't provide CS at specific timestamps in match data
-            # We'll estimate: if game > 10 min, store avg CS/min * 10
-            if duration >= 600:  # 10 minutes
-                estimated_cs_10 = (total_minions / (duration / 60)) * 10
-                stats['early_game_cs'].append(estimated_cs_10)
-            
-            # Team stats for share calculation
-            team_id = participant['teamId']
-            team_damage = sum(p['totalDamageDealtToChampions'] for p in match['info']['participants'] if p['teamId'] == team_id)
-            team_gold = sum(p['goldEarned'] for p in match['info']['participants'] if p['teamId'] == team_id)
-            
-            if team_damage > 0:
-                stats['damage_share'].append((participant['totalDamageDealtToChampions'] / team_damage) * 100)
-            if team_gold > 0:
-                stats['gold_share'].append((participant['goldEarned'] / team_gold) * 100)
-
-            # Collect final inventory from participant slots
-            match_id = match.get('metadata', {}).get('matchId')
-            game_creation = match['info'].get('gameCreation')
-            item_keys = ['item0','item1','item2','item3','item4','item5']
-            trinket_key = 'item6'
-            final_items: List[int] = []
-            for key in item_keys:
-                item_id = int(participant.get(key, 0) or 0)
-                if item_id > 0:
-                    final_items.append(item_id)
-                    stats['item_counts'][str(item_id)] = stats['item_counts'].get(str(item_id), 0) + 1
-
-            trinket_id = int(participant.get(trinket_key, 0) or 0)
-            stats['items_per_match'].append({
-                'matchId': match_id,
-                'gameCreation': game_creation,
-                'items': final_items,
-                'trinket': (trinket_id if trinket_id > 0 else None)
-            })
-
-            # Inventory snapshots via timeline (start, mid, final)
-            start_items: List[int] = []
-            mid_items: List[int] = []
-            timeline = match.get('timeline')
-            if timeline and 'info' in timeline and 'frames' in timeline['info']:
-                frames = timeline['info']['frames']
-                pid = participant.get('participantId')
-                game_duration_sec = match['info'].get('gameDuration', 0)
-                game_duration_ms = int(game_duration_sec * 1000)
-                start_cutoff_ms = 120000
-                mid_cutoff_ms = max(game_duration_ms // 2, 1)
-
-                def reconstruct_inventory(cutoff_ms: int) -> List[int]:
-                    # Track order of purchases and a simple multiset count
-                    purchase_order: List[int] = []
-                    counts: Dict[int, int] = {}
-                    for frame in frames:
-                        ts = frame.get('timestamp', 0)
-                        if ts > cutoff_ms:
-                            break
-                        for ev in (frame.get('events') or []):
-                            if ev.get('participantId') != pid:
-                                continue
-                            etype = ev.get('type')
-                            if etype == 'ITEM_PURCHASED':
-                                iid = int(ev.get('itemId') or 0)
-                                if iid > 0:
-                                    purchase_order.append(iid)
-                                    counts[iid] = counts.get(iid, 0) + 1
-                            elif etype in ('ITEM_SOLD', 'ITEM_DESTROYED'):
-                                iid = int(ev.get('itemId') or 0)
-                                if counts.get(iid, 0) > 0:
-                                    counts[iid] -= 1
-                                    # remove one occurrence from the right (latest)
-                                    for i in range(len(purchase_order) - 1, -1, -1):
-                                        if purchase_order[i] == iid:
-                                            purchase_order.pop(i)
-                                            break
-                                    if counts[iid] == 0:
-                                        counts.pop(iid, None)
-                            elif etype == 'ITEM_UNDO':
-                                before_id = int(ev.get('beforeId') or 0)
-                                after_id = int(ev.get('afterId') or 0)
-                                # undo afterId (remove one from right)
-                                if counts.get(after_id, 0) > 0:
-                                    counts[after_id] -= 1
-                                    for i in range(len(purchase_order) - 1, -1, -1):
-                                        if purchase_order[i] == after_id:
-                                            purchase_order.pop(i)
-                                            break
-                                    if counts[after_id] == 0:
-                                        counts.pop(after_id, None)
-                                # restore beforeId as if purchased
-                                if before_id > 0:
-                                    purchase_order.append(before_id)
-                                    counts[before_id] = counts.get(before_id, 0) + 1
-
-                    # Build up to 6 unique items, preferring most recent purchases
-                    seen: set = set()
-                    result_rev: List[int] = []
-                    for iid in reversed(purchase_order):
-                        if iid not in seen:
-                            seen.add(iid)
-                            result_rev.append(iid)
-                        if len(result_rev) >= 6:
-                            break
-                    return list(reversed(result_rev))
-
-                start_items = reconstruct_inventory(start_cutoff_ms)
-                mid_items = reconstruct_inventory(mid_cutoff_ms)
-
-            snapshot_entry = {
-                'matchId': match_id,
-                'start': start_items,
-                'mid': mid_items,
-                'final': final_items,
-                'trinketFinal': (trinket_id if trinket_id > 0 else None)
-            }
-            stats['inventory_snapshots'].append(snapshot_entry)
-
-            # Champion tracking
-            champion = participant['championName']
-            # Track inventory by champion
+            ),
+            'dragon_takedowns': challenges.get('dragonTakedowns', 0),
+            'baron_takedowns': challenges.get('baronTakedowns', 0),
+            'turret_kills': participant.get('turretKills', 0),
+            'turret_takedowns': participant.get('turretTakedowns', 0),
+            'inhibitor_kills': participant.get('inhibitorKills', 0),
+            'inhibitor_takedowns': participant.get('inhibitorTakedowns', 0),
+            'duration': duration,
+            'pentakills': participant.get('pentaKills', 0),
+            'quadrakills': participant.get('quadraKills', 0),
+            'first_blood': 1 if participant.get('firstBloodKill', False) else 0,
+            # Team totals for damage/gold share
+            'team_damage': team_totals[participant['teamId']][0],
+            'team_gold': team_totals[participant['teamId']][1],
+        }
+
+        # Final inventory from participant slots
+        item_keys = ['item0', 'item1', 'item2', 'item3', 'item4', 'item5']
+        final_items: List[int] = []
+        for key in item_keys:
+            item_id = int(participant.get(key, 0) or 0)
+            if item_id > 0:
+                final_items.append(item_id)
+        trinket_id = int(participant.get('item6', 0) or 0)
+        row['items'] = final_items
+        row['trinket'] = trinket_id if trinket_id > 0 else None
+
+        # Inventory snapshots via timeline (start, 10/15/20 min, mid, end) in one pass
+        row['start'] = []
+        row['mid'] = []
+        row['snapshots'] = {}
+        timeline = match.get('timeline')
+        row['has_timeline'] = MatchDataProcessor.has_item_events(timeline)
+        if row['has_timeline']:
+            pid = participant.get('participantId')
+            game_duration_ms = int(match['info'].get('gameDuration', 0) * 1000)
+            cutoffs = dict(MatchDataProcessor.INVENTORY_CUTOFFS_MS)
+            cutoffs['mid'] = max(game_duration_ms // 2, 1)
+            cutoffs['end'] = float('inf')
+            snapshots = MatchDataProcessor.inventory_snapshots(timeline, pid, cutoffs)
+            row['start'] = snapshots.pop('start')
+            row['mid'] = snapshots.pop('mid')
+            row['snapshots'] = snapshots
+
+        # Role tracking (Riot uses UTILITY, we use SUPPORT)
+        role = participant.get('teamPosition', 'UNKNOWN')
+        if role == 'UTILITY':
+            role = 'SUPPORT'
+        if not (role and role.strip() and role != 'UNKNOWN'):
+            # Very basic inference from champion - otherwise the game doesn't count towards a role
+            if row['champion'] in cls.SUPPORT_CHAMPIONS:
+                role = 'SUPPORT'
+            elif row['champion'] in cls.JUNGLE_CHAMPIONS:
+                role = 'JUNGLE'
+            else:
+                role = None
+        row['role'] = role
+
+        return row
+
+    def add_match(self, match: Dict) -> bool:
+        """Fold one match into the aggregate. Returns False if it was already counted."""
+        key = self._match_key(match)
+        if key in self.rows or key in self.skipped:
+            return False
+
+        row = self.build_row(match, self.puuid)
+        if row is None:
+            # Still counts towards total_matches, like the original full rebuild
+            self.skipped[key] = match.get('info', {}).get('gameCreation')
+            return True
+
+        self.add_row(key, row)
+        return True
+
+    def add_row(self, key: str, row: Dict) -> None:
+        self.rows[key] = row
+        self._table = None
+
+    @property
+    def match_ids(self) -> List[str]:
+        """IDs of every match counted, including those the player was not found in"""
+        return list(self.rows) + list(self.skipped)
+
+    def __contains__(self, match_id: str) -> bool:
+        return match_id in self.rows or match_id in self.skipped
+
+    def remove_match(self, match_id: str) -> bool:
+        """Remove a previously added match (e.g. one that aged out of the window)"""
+        if match_id in self.skipped:
+            del self.skipped[match_id]
+            return True
+
+        row = self.rows.pop(match_id, None)
+        if row is None:
+            return False
+        self._table = None
+        return True
+
+    def has_timeline(self, match_id: str) -> bool:
+        """Whether the match's row was built with timeline item events"""
+        row = self.rows.get(match_id)
+        return bool(row and row.get('has_timeline', bool(row['snapshots'])))
+
+    def drop_timeline(self, match_id: str) -> bool:
+        """Clear a row's timeline snapshots, as if it had been built without its timeline
+
+        The row is replaced rather than edited, since merged aggregates share row dicts.
+        """
+        if not self.has_timeline(match_id):
+            return False
+        self.rows[match_id] = {**self.rows[match_id], 'start': [], 'mid': [], 'snapshots': {}, 'has_timeline': False}
+        self._table = None
+        return True
+
+    def order_by(self, match_ids: List[str]) -> None:
+        """Reorder rows to follow match_ids (e.g. newest first), as a single fresh pass would have added them
+
+        Per-match lists and first-appearance ordering in to_stats() follow row order.
+        """
+        position = {match_id: index for index, match_id in enumerate(match_ids)}
+        self.rows = dict(sorted(self.rows.items(), key=lambda item: position.get(item[0], len(position))))
+        self._table = None
+
+    def expire_before(self, cutoff_ms: int) -> int:
+        """Remove every match created before cutoff_ms; returns how many were removed"""
+        expired = [key for key, row in self.rows.items() if (row['gameCreation'] or 0) < cutoff_ms]
+        expired += [key for key, game_creation in self.skipped.items() if (game_creation or 0) < cutoff_ms]
+        for key in expired:
+            self.remove_match(key)
+        return len(expired)
+
+    def merge(self, other: 'PlayerStatsAggregate') -> 'PlayerStatsAggregate':
+        """Fold another aggregate for the same player into this one (shared matches count once)"""
+        if other.puuid != self.puuid:
+            raise ValueError("Cannot merge aggregates for different players")
+
+        for key, row in other.rows.items():
+            if key not in self.rows and key not in self.skipped:
+                self.add_row(key, row)
+        for key, game_creation in other.skipped.items():
+            if key not in self.rows and key not in self.skipped:
+                self.skipped[key] = game_creation
+        return self
+
+    def fingerprint(self) -> str:
+        """Hash of what to_stats() is built from: the match set and which rows carry timeline snapshots
+
+        Aggregates with equal fingerprints give the same stats, so it can back an ETag.
+        """
+        digest = hashlib.sha256()
+        for match_id in sorted(self.match_ids):
+            digest.update(f"{match_id}:{int(self.has_timeline(match_id))}\n".encode('utf-8'))
+        return digest.hexdigest()
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable form (the rows are the whole state)"""
+        return {
+            'puuid': self.puuid,
+            'rows': self.rows,
+            'skipped': self.skipped
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PlayerStatsAggregate':
+        aggregate = cls(data['puuid'])
+        for key, row in data.get('rows', {}).items():
+            aggregate.add_row(key, row)
+        aggregate.skipped = dict(data.get('skipped', {}))
+        return aggregate
+
+    @property
+    def table(self) -> MatchTable:
+        """Columnar view of the rows (cached until the rows change)"""
+        if self._table is None:
+            numeric = list(self.SUM_FIELDS) + ['win', 'team_damage', 'team_gold']
+            self._table = MatchTable(list(self.rows.values()), numeric, ['champion', 'role', 'month'])
+        return self._table
+
+    def to_stats(self, sections: Optional[Iterable[str]] = None) -> Dict:
+        """Build the stats dict (same shape as extract_player_stats always returned)
+
+        sections limits which of the ITEM_SECTIONS are built (None builds all); the
+        others are left out of the dict. Totals, breakdowns and averages are always
+        included.
+        """
+        wanted = set(self.ITEM_SECTIONS if sections is None else sections)
+        rows = list(self.rows.values())
+        total_matches = self.total_matches
+        table = self.table
+        totals = table.totals(self.SUM_FIELDS)
+        wins = table.total('win')
+
+        duration = table.column('duration')
+        cs = table.column('cs')
+        # Early game CS: Riot match data has no CS at 10 minutes, so estimate avg CS/min * 10 (games of 10+ min)
+        played_ten = duration >= 600
+        early_game_cs = (cs[played_ten] / (duration[played_ten] / 60)) * 10
+
+        champions_played = {}
+        for champion, sums in table.group_sums('champion', self.CHAMPION_FIELDS).items():
+            champions_played[champion] = {'games': 0}
+            for field, key in self.CHAMPION_FIELDS.items():
+                champions_played[champion][key] = sums[field]
+        for champion, games in table.group_count('champion').items():
+            champions_played[champion]['games'] = games
+
+        stats = {
+            'total_matches': total_matches,
+            'wins': wins,
+            'losses': len(rows) - wins,
+            'total_kills': totals['kills'],
+            'total_deaths': totals['deaths'],
+            'total_assists': totals['assists'],
+            'total_gold': totals['gold'],
+            'total_damage': totals['damage'],
+            'total_cs': totals['cs'],  # Total creep score
+            'total_vision_score': totals['vision_score'],
+            'total_damage_taken': totals['damage_taken'],
+            'total_healing': totals['healing'],
+            'total_game_duration': totals['duration'],  # For per-minute calculations
+            'control_wards_purchased': totals['control_wards'],
+            'wards_placed': totals['wards_placed'],
+            'wards_killed': totals['wards_killed'],
+            'total_objectives': totals['objective_damage'] / 10000,  # Normalize large numbers
+            'solo_kills': totals['solo_kills'],
+            'champions_played': champions_played,
+            'roles_played': table.group_count('role'),
+            'best_champion': None,
+            'longest_game': duration.max().item() if table.size else 0,
+            'shortest_game': duration.min().item() if table.size else float('inf'),
+            'pentakills': totals['pentakills'],
+            'quadrakills': totals['quadrakills'],
+            'first_bloods': totals['first_blood'],
+            'match_history_by_month': table.group_count('month'),
+            'early_game_cs': early_game_cs.tolist(),  # CS at 10 minutes for each game
+            'damage_share': table.ratio('damage', 'team_damage', 100).tolist(),  # Percent of team's damage
+            'gold_share': table.ratio('gold', 'team_gold', 100).tolist(),  # Percent of team's gold
+        }
+
+        # Item tracking
+        if 'items_per_match' in wanted:
+            stats['items_per_match'] = []  # {matchId, gameCreation, items:[ids], trinket:id}
+        if 'item_counts' in wanted:
+            stats['item_counts'] = MatchTable.item_counts([row['items'] for row in rows])  # {itemId: count}
+        if 'inventory_snapshots' in wanted:
+            stats['inventory_snapshots'] = []  # {matchId, start:[ids], mid:[ids], final:[ids], trinketFinal:id, min10/min15/min20/end:[ids]}
+        if 'inventory_by_champion' in wanted:
+            # Grouped by champion for frontend item-usage analytics
+            stats['inventory_by_champion'] = {}  # {champion: {matches: n, start: [ [ids]... ], mid: [ [ids]... ], final: [ [ids]... ]}}
+
+        for row in (rows if wanted & self.PER_MATCH_SECTIONS else ()):
+            if 'items_per_match' in wanted:
+                stats['items_per_match'].append({
+                    'matchId': row['matchId'],
+                    'gameCreation': row['gameCreation'],
+                    'items': row['items'],
+                    'trinket': row['trinket']
+                })
+            if 'inventory_snapshots' in wanted:
+                stats['inventory_snapshots'].append({
+                    'matchId': row['matchId'],
+                    'start': row['start'],
+                    'mid': row['mid'],
+                    'final': row['items'],
+                    'trinketFinal': row['trinket'],
+                    # Timeline-based build path at 10/15/20 minutes and game end (when a timeline was fetched)
+                    **row.get('snapshots', {})
+                })
+            if 'inventory_by_champion' not in wanted:
+                continue
+
+            champion = row['champion']
             if champion not in stats['inventory_by_champion']:
                 stats['inventory_by_champion'][champion] = {
                     'matches': 0,
@@ -517,142 +1241,261 @@ class MatchDataProcessor:
                     'mid': [],
                     'final': []
                 }
-            stats['inventory_by_champion'][champion]['matches'] += 1
-            if start_items:
-                stats['inventory_by_champion'][champion]['start'].append(start_items)
-            if mid_items:
-                stats['inventory_by_champion'][champion]['mid'].append(mid_items)
-            if final_items:
-                stats['inventory_by_champion'][champion]['final'].append(final_items)
-            if champion not in stats['champions_played']:
-                stats['champions_played'][champion] = {
-                    'games': 0,
-                    'wins': 0,
-                    'kills': 0,
-                    'deaths': 0,
-                    'assists': 0
-                }
+            by_champion = stats['inventory_by_champion'][champion]
+            by_champion['matches'] += 1
+            if row['start']:
+                by_champion['start'].append(row['start'])
+            if row['mid']:
+                by_champion['mid'].append(row['mid'])
+            if row['items']:
+                by_champion['final'].append(row['items'])
+
+        # Specific objective stats for macro advice (only present once a game was counted)
+        if rows:
+            for field in ('dragon_takedowns', 'baron_takedowns', 'turret_kills', 'turret_takedowns',
+                          'inhibitor_kills', 'inhibitor_takedowns'):
+                stats[self.SUM_FIELDS[field]] = totals[field]
 
-            stats['champions_played'][champion]['games'] += 1
-            if participant['win']:
-                stats['champions_played'][champion]['wins'] += 1
-            stats['champions_played'][champion]['kills'] += participant['kills']
-            stats['champions_played'][champion]['deaths'] += participant['deaths']
-            stats['champions_played'][champion]['assists'] += participant['assists']
-            stats['champions_played'][champion]['cs'] = stats['champions_played'][champion].get('cs', 0) + total_minions
-
-            # Role tracking
-            role = participant.get('teamPosition', 'UNKNOWN')
-            # Normalize UTILITY to SUPPORT (Riot API uses UTILITY, we use SUPPORT)
-            if role == 'UTILITY':
-                role = 'SUPPORT'
-            # Normalize role: ignore empty/invalid roles
-            if role and role.strip() and role != 'UNKNOWN':
-                stats['roles_played'][role] = stats['roles_played'].get(role, 0) + 1
-            else:
-                # Fallback: try to infer role from champion (common patterns)
-                champion = participant['championName']
-                # Very basic inference - could be expanded
-                if champion in ['Janna', 'Soraka', 'Lulu', 'Thresh', 'Blitzcrank', 'Leona', 'Nautilus', 'Braum']:
-                    stats['roles_played']['SUPPORT'] = stats['roles_played'].get('SUPPORT', 0) + 1
-                elif champion in ['Lee Sin', 'Elise', 'Graves', 'Kha\'Zix', 'Rek\'Sai', 'Nidalee', 'Kindred']:
-                    stats['roles_played']['JUNGLE'] = stats['roles_played'].get('JUNGLE', 0) + 1
-                # Otherwise don't count it
-
-            # Game duration
-            duration = match['info']['gameDuration']
-            stats['longest_game'] = max(stats['longest_game'], duration)
-            stats['shortest_game'] = min(stats['shortest_game'], duration)
-
-            # Special achievements
-            stats['pentakills'] += participant.get('pentaKills', 0)
-            stats['quadrakills'] += participant.get('quadraKills', 0)
-            if participant.get('firstBloodKill', False):
-                stats['first_bloods'] += 1
-
-            # Monthly breakdown
-            timestamp = match['info']['gameCreation']
-            month = datetime.fromtimestamp(timestamp / 1000).strftime('%Y-%m')
-            stats['match_history_by_month'][month] = stats['match_history_by_month'].get(month, 0) + 1
-
-        # Calculate averages and best champion
         if stats['total_matches'] > 0:
-            stats['avg_kills'] = stats['total_kills'] / stats['total_matches']
-            stats['avg_deaths'] = stats['total_deaths'] / stats['total_matches']
-            stats['avg_assists'] = stats['total_assists'] / stats['total_matches']
-            stats['win_rate'] = (stats['wins'] / stats['total_matches']) * 100
-            
-            # CS and farming averages
-            stats['avg_cs'] = stats['total_cs'] / stats['total_matches']
-            total_hours = stats['total_game_duration'] / 3600
-            if total_hours > 0:
-                stats['cs_per_min'] = stats['total_cs'] / (stats['total_game_duration'] / 60)
-                stats['gold_per_min'] = stats['total_gold'] / (stats['total_game_duration'] / 60)
-                stats['damage_per_min'] = stats['total_damage'] / (stats['total_game_duration'] / 60)
-            
-            # Vision and map control averages
-            stats['avg_vision_score'] = stats['total_vision_score'] / stats['total_matches']
-            stats['avg_control_wards'] = stats['control_wards_purchased'] / stats['total_matches']
-            stats['avg_wards_placed'] = stats['wards_placed'] / stats['total_matches']
-            stats['avg_wards_killed'] = stats['wards_killed'] / stats['total_matches']
-            
-            # Combat averages
-            stats['avg_damage_taken'] = stats['total_damage_taken'] / stats['total_matches']
-            
-            # Calculate KDA ratio
-            if stats['avg_deaths'] > 0:
-                stats['kda_ratio'] = (stats['avg_kills'] + stats['avg_assists']) / stats['avg_deaths']
-            else:
-                stats['kda_ratio'] = stats['avg_kills'] + stats['avg_assists']
-            
-            # Kill participation (approximation based on average)
-            stats['avg_kill_participation'] = ((stats['total_kills'] + stats['total_assists']) / stats['total_matches']) / 25 * 100  # Assuming ~25 kills per team per game
-            
-            # Early game performance
-            if stats['early_game_cs']:
-                stats['avg_cs_at_10'] = sum(stats['early_game_cs']) / len(stats['early_game_cs'])
-            
-            # Team contribution
-            if stats['damage_share']:
-                stats['avg_damage_share'] = sum(stats['damage_share']) / len(stats['damage_share'])
-            if stats['gold_share']:
-                stats['avg_gold_share'] = sum(stats['gold_share']) / len(stats['gold_share'])
-            
-            # Calculate objective averages for macro analysis
-            if stats['total_matches'] > 0:
-                stats['avg_dragons'] = stats.get('dragonTakedowns', 0) / stats['total_matches']
-                stats['avg_barons'] = stats.get('baronTakedowns', 0) / stats['total_matches']
-                stats['avg_turrets'] = stats.get('turretTakedowns', 0) / stats['total_matches']
-                stats['avg_inhibitors'] = stats.get('inhibitorTakedowns', 0) / stats['total_matches']
-            
-            # Determine primary role
-            if stats['roles_played']:
-                # Filter out invalid roles
-                valid_roles = {k: v for k, v in stats['roles_played'].items() if k and k.strip() and k != 'UNKNOWN'}
-                if valid_roles:
-                    stats['primary_role'] = max(valid_roles, key=valid_roles.get)
-                else:
-                    # Fallback: infer from champion pool
-                    stats['primary_role'] = 'MIDDLE'  # Safe default
-            else:
-                stats['primary_role'] = 'MIDDLE'  # Safe default
-
-            # Find best champion by win rate (min 5 games)
-            best_wr = 0
-            for champ, data in stats['champions_played'].items():
-                if data['games'] >= 5:
-                    wr = (data['wins'] / data['games']) * 100
-                    if wr > best_wr:
-                        best_wr = wr
-                        stats['best_champion'] = {
-                            'name': champ,
-                            'win_rate': wr,
-                            'games': data['games']
-                        }
+            MatchDataProcessor.add_derived_stats(stats)
 
         return stats
 
 
+class MatchDataProcessor:
+    """Process Riot API match data into analytics"""
+
+    @staticmethod
+    def extract_player_stats(matches: Iterable[Dict], puuid: str) -> Dict:
+        """Extract comprehensive statistics from match history
+
+        Accepts any iterable, including the iter_full_year_matches generator.
+        """
+
+        # Note: Do not filter by items.json here; frontend will map IDs to names and ignore unknowns
+        return MatchDataProcessor.aggregate_matches(matches, puuid).to_stats()
+
+    @staticmethod
+    def match_set_fingerprint(match_ids: Iterable[str]) -> str:
+        """Order-independent hash of a set of match IDs, identifying the data a stats dict was built from"""
+        digest = hashlib.sha256()
+        for match_id in sorted(set(match_ids)):
+            digest.update(match_id.encode('utf-8'))
+            digest.update(b'\n')
+        return digest.hexdigest()
+
+    # Avoid overloading Riot API: timelines only for the first few matches of each page
+    TIMELINE_PAGE_SIZE = 100
+    TIMELINES_PER_PAGE = 10
+
+    @staticmethod
+    def timeline_match_ids(match_ids: List[str]) -> Set[str]:
+        """IDs that get a timeline, decided by position in the full newest-first match list
+
+        Depends only on the list, not on which fetches succeed, so an incremental refresh
+        can tell which cached rows should carry snapshots after new matches shift the list.
+        """
+        return {match_id for index, match_id in enumerate(match_ids)
+                if index % MatchDataProcessor.TIMELINE_PAGE_SIZE < MatchDataProcessor.TIMELINES_PER_PAGE}
+
+    @staticmethod
+    def aggregate_matches(matches: Iterable[Dict], puuid: str,
+                          aggregate: Optional[PlayerStatsAggregate] = None) -> PlayerStatsAggregate:
+        """Fold matches into an aggregate one at a time
+
+        Each match is reduced to its compact row as soon as it arrives, so with a generator
+        as input only one full match (and timeline) is alive at any moment.
+        """
+        aggregate = aggregate or PlayerStatsAggregate(puuid)
+        for match in matches:
+            aggregate.add_match(match)
+        return aggregate
+
+    # Inventory snapshot cutoffs in ms; 'mid' depends on game length and 'end' covers the whole timeline
+    INVENTORY_CUTOFFS_MS = {
+        'start': 120000,
+        'min10': 600000,
+        'min15': 900000,
+        'min20': 1200000,
+    }
+
+    # The only timeline events we read; pruned timelines store the index into this tuple
+    ITEM_EVENT_TYPES = ('ITEM_PURCHASED', 'ITEM_SOLD', 'ITEM_DESTROYED', 'ITEM_UNDO')
+    PRUNED_TIMELINE_FORMAT = 'item-events-v1'
+
+    @staticmethod
+    def prune_timeline(timeline: Dict) -> Dict:
+        """Reduce a match-v5 timeline to compact per-participant item events
+
+        Result shape:
+            {'format': 'item-events-v1',
+             'metadata': {'matchId': ..., 'participants': [puuid, ...]},
+             'itemEvents': {'<participantId>': [[frameTimestamp, typeIndex, itemId, beforeId, afterId], ...]}}
+
+        Events carry their frame's timestamp because snapshot cutoffs are applied per frame.
+        Already-pruned timelines are returned unchanged.
+        """
+        if timeline.get('format') == MatchDataProcessor.PRUNED_TIMELINE_FORMAT:
+            return timeline
+
+        type_index = {etype: i for i, etype in enumerate(MatchDataProcessor.ITEM_EVENT_TYPES)}
+        item_events: Dict[str, List[List[int]]] = {}
+        for frame in timeline.get('info', {}).get('frames', []):
+            ts = frame.get('timestamp', 0)
+            for ev in (frame.get('events') or []):
+                code = type_index.get(ev.get('type'))
+                if code is None:
+                    continue
+                item_events.setdefault(str(ev.get('participantId')), []).append([
+                    ts,
+                    code,
+                    int(ev.get('itemId') or 0),
+                    int(ev.get('beforeId') or 0),
+                    int(ev.get('afterId') or 0)
+                ])
+
+        metadata = timeline.get('metadata', {})
+        return {
+            'format': MatchDataProcessor.PRUNED_TIMELINE_FORMAT,
+            'metadata': {
+                'matchId': metadata.get('matchId'),
+                'participants': metadata.get('participants', [])
+            },
+            'itemEvents': item_events
+        }
+
+    @staticmethod
+    def has_item_events(timeline: Optional[Dict]) -> bool:
+        """True for a pruned timeline or a full one with frames"""
+        if not timeline:
+            return False
+        if timeline.get('format') == MatchDataProcessor.PRUNED_TIMELINE_FORMAT:
+            return True
+        return 'info' in timeline and 'frames' in timeline['info']
+
+    @staticmethod
+    def timeline_item_events(timeline: Dict, pid: int) -> Iterator[tuple]:
+        """Yield (frameTimestamp, type, itemId, beforeId, afterId) for one participant, pruned or full timeline"""
+        if timeline.get('format') == MatchDataProcessor.PRUNED_TIMELINE_FORMAT:
+            for ts, code, item_id, before_id, after_id in timeline['itemEvents'].get(str(pid), []):
+                yield ts, MatchDataProcessor.ITEM_EVENT_TYPES[code], item_id, before_id, after_id
+            return
+
+        for frame in timeline.get('info', {}).get('frames', []):
+            ts = frame.get('timestamp', 0)
+            for ev in (frame.get('events') or []):
+                if ev.get('participantId') == pid and ev.get('type') in MatchDataProcessor.ITEM_EVENT_TYPES:
+                    yield ts, ev.get('type'), ev.get('itemId'), ev.get('beforeId'), ev.get('afterId')
+
+    @staticmethod
+    def inventory_snapshots(timeline: Dict, pid: int, cutoffs: Dict[str, float]) -> Dict[str, List[int]]:
+        """Rebuild a participant's inventory at several cutoffs in a single pass over their item events
+
+        A cutoff covers every event from frames whose timestamp is at or before it, so each
+        snapshot matches replaying the timeline from the start up to that cutoff.
+        """
+        pending = sorted(cutoffs.items(), key=lambda item: item[1])
+        snapshots: Dict[str, List[int]] = {}
+        tracker = InventoryTracker()
+
+        next_cutoff = 0
+        for ts, etype, item_id, before_id, after_id in MatchDataProcessor.timeline_item_events(timeline, pid):
+            # Emit every cutoff this event's frame crosses before applying it
+            while next_cutoff < len(pending) and ts > pending[next_cutoff][1]:
+                snapshots[pending[next_cutoff][0]] = tracker.snapshot()
+                next_cutoff += 1
+            if next_cutoff == len(pending):
+                break
+            tracker.apply(etype, item_id, before_id, after_id)
+
+        final = tracker.snapshot()
+        for name, _ in pending[next_cutoff:]:
+            snapshots[name] = list(final)
+        return snapshots
+
+    @staticmethod
+    def reconstruct_inventory(frames: List[Dict], pid: int, cutoff_ms: int) -> List[int]:
+        """Rebuild a participant's inventory (up to 6 unique items) from timeline frames up to cutoff_ms"""
+        timeline = {'info': {'frames': frames}}
+        return MatchDataProcessor.inventory_snapshots(timeline, pid, {'cutoff': cutoff_ms})['cutoff']
+
+    @staticmethod
+    def add_derived_stats(stats: Dict) -> None:
+        """Calculate averages, primary role and best champion from the totals in stats"""
+        stats['avg_kills'] = stats['total_kills'] / stats['total_matches']
+        stats['avg_deaths'] = stats['total_deaths'] / stats['total_matches']
+        stats['avg_assists'] = stats['total_assists'] / stats['total_matches']
+        stats['win_rate'] = (stats['wins'] / stats['total_matches']) * 100
+        
+        # CS and farming averages
+        stats['avg_cs'] = stats['total_cs'] / stats['total_matches']
+        total_hours = stats['total_game_duration'] / 3600
+        if total_hours > 0:
+            stats['cs_per_min'] = stats['total_cs'] / (stats['total_game_duration'] / 60)
+            stats['gold_per_min'] = stats['total_gold'] / (stats['total_game_duration'] / 60)
+            stats['damage_per_min'] = stats['total_damage'] / (stats['total_game_duration'] / 60)
+        
+        # Vision and map control averages
+        stats['avg_vision_score'] = stats['total_vision_score'] / stats['total_matches']
+        stats['avg_control_wards'] = stats['control_wards_purchased'] / stats['total_matches']
+        stats['avg_wards_placed'] = stats['wards_placed'] / stats['total_matches']
+        stats['avg_wards_killed'] = stats['wards_killed'] / stats['total_matches']
+        
+        # Combat averages
+        stats['avg_damage_taken'] = stats['total_damage_taken'] / stats['total_matches']
+        
+        # Calculate KDA ratio
+        if stats['avg_deaths'] > 0:
+            stats['kda_ratio'] = (stats['avg_kills'] + stats['avg_assists']) / stats['avg_deaths']
+        else:
+            stats['kda_ratio'] = stats['avg_kills'] + stats['avg_assists']
+        
+        # Kill participation (approximation based on average)
+        stats['avg_kill_participation'] = ((stats['total_kills'] + stats['total_assists']) / stats['total_matches']) / 25 * 100  # Assuming ~25 kills per team per game
+        
+        # Early game performance
+        if stats['early_game_cs']:
+            stats['avg_cs_at_10'] = sum(stats['early_game_cs']) / len(stats['early_game_cs'])
+        
+        # Team contribution
+        if stats['damage_share']:
+            stats['avg_damage_share'] = sum(stats['damage_share']) / len(stats['damage_share'])
+        if stats['gold_share']:
+            stats['avg_gold_share'] = sum(stats['gold_share']) / len(stats['gold_share'])
+        
+        # Calculate objective averages for macro analysis
+        if stats['total_matches'] > 0:
+            stats['avg_dragons'] = stats.get('dragonTakedowns', 0) / stats['total_matches']
+            stats['avg_barons'] = stats.get('baronTakedowns', 0) / stats['total_matches']
+            stats['avg_turrets'] = stats.get('turretTakedowns', 0) / stats['total_matches']
+            stats['avg_inhibitors'] = stats.get('inhibitorTakedowns', 0) / stats['total_matches']
+        
+        # Determine primary role
+        if stats['roles_played']:
+            # Filter out invalid roles
+            valid_roles = {k: v for k, v in stats['roles_played'].items() if k and k.strip() and k != 'UNKNOWN'}
+            if valid_roles:
+                stats['primary_role'] = max(valid_roles, key=valid_roles.get)
+            else:
+                # Fallback: infer from champion pool
+                stats['primary_role'] = 'MIDDLE'  # Safe default
+        else:
+            stats['primary_role'] = 'MIDDLE'  # Safe default
+
+        # Find best champion by win rate (min 5 games)
+        best_wr = 0
+        for champ, data in stats['champions_played'].items():
+            if data['games'] >= 5:
+                wr = (data['wins'] / data['games']) * 100
+                if wr > best_wr:
+                    best_wr = wr
+                    stats['best_champion'] = {
+                        'name': champ,
+                        'win_rate': wr,
+                        'games': data['games']
+                    }
+
+
 class PerformanceBenchmarks:
     """
     Role and elo-specific performance benchmarks
@@ -921,7 +1764,7 @@ WIN CONDITIONS & CONSISTENCY:
    - Win Rate: {stats.get('win_rate', 0):.1f}% ({stats['wins']}W-{stats['losses']}L)
    - Kill Participation: {stats.get('avg_kill_participation', 0):.1f}% | Target: {60 if primary_role in ['JUNGLE', 'SUPPORT'] else 55 if primary_role == 'MIDDLE' else 50}%+
    - First Blood: {(stats.get('first_bloods', 0) / max(stats['total_matches'], 1) * 100):.1f}% of games
-   - Best Champion: {stats.get('best_champion', {}).get('name', 'None')} ({stats.get('best_champion', {}).get('win_rate', 0):.1f}% WR, {stats.get('best_champion', {}).get('games', 0)} games)
+   - Best Champion: {(stats.get('best_champion') or {}).get('name', 'None')} ({(stats.get('best_champion') or {}).get('win_rate', 0):.1f}% WR, {(stats.get('best_champion') or {}).get('games', 0)} games)
 
 CHAMPION POOL OVERVIEW:
 {json.dumps({k: {**v, 'win_rate': f"{(v['wins']/v['games']*100):.1f}%" if v['games'] > 0 else '0%'} for k, v in list(stats['champions_played'].items())[:10]}, indent=2)}
@@ -1207,7 +2050,12 @@ def main():
 
     # Initialize clients
     print("Initializing clients...")
-    riot_client = RiotAPIClient(api_key=riot_api_key, region='na1')
+    riot_client = RiotAPIClient(
+        api_key=riot_api_key,
+        region='na1',
+        match_store=MatchStore(),
+        timeline_cache=TimelineCache()
+    )
     bedrock_client = AWSBedrockClient(region=aws_region)
 
     # Get summoner information using Riot ID
@@ -1248,18 +2096,14 @@ def main():
     if not solo_rank:
         print("No ranked data found - will analyze based on match history only")
 
-    # Get match history
-    print("\nFetching match history (this may take a few minutes)...")
-    matches = riot_client.get_full_year_matches(puuid)
+    # Get match history and process it as it streams in
+    print("\nFetching and processing match history (this may take a few minutes)...")
+    stats = MatchDataProcessor.extract_player_stats(riot_client.iter_full_year_matches(puuid), puuid)
 
-    if not matches:
+    if not stats['total_matches']:
         print("No matches found for this player in the past year!")
         return
 
-    # Process match data
-    print("\nProcessing match data...")
-    stats = MatchDataProcessor.extract_player_stats(matches, puuid)
-
     # Generate AI insights with rank-aware coaching
     print("\nGenerating AI-powered coaching insights...")
     prompt = InsightGenerator.create_year_in_review_prompt(stats, display_name, solo_rank)
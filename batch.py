@@ -0,0 +1,310 @@
+"""
+Offline batch analysis for Rift Rewind
+Precomputes year-in-review stats for a list of players (e.g. a whole ladder) and streams them to JSONL
+
+Usage:
+    python batch.py players.txt -o results.jsonl [--region euw1] [--workers 4] [--fetch-threads 4]
+
+players.txt holds one Riot ID per line, optionally followed by a platform
+("Faker#KR1 kr" or "Faker#KR1,kr"); blank lines and lines starting with # are
+skipped. Re-running with the same output file resumes: players already recorded
+there are skipped (add --retry-failed to redo the ones that errored).
+
+Riot calls run on a thread pool sharing the per-host rate limiters of a
+RiotClientPool and write through to the match store and timeline cache. Each
+player's aggregation then runs in a process pool that reads the matches back from
+those stores, so raw matches never have to be pickled between processes.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+
+from backend import MatchDataProcessor, RiotClientPool
+from storage import MatchStore, TimelineCache
+
+# Load environment variables
+load_dotenv()
+
+# Per-process stores, opened by _init_worker
+_worker_match_store: Optional[MatchStore] = None
+_worker_timeline_cache: Optional[TimelineCache] = None
+
+
+def parse_player_line(line: str, default_region: str) -> Optional[Tuple[str, str]]:
+    """(riot_id, region) from an input line, or None for blank/comment lines"""
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+
+    # The platform, if any, is the last comma/whitespace-separated token after the tag
+    for separator in (',', '\t', ' '):
+        head, found, tail = line.rpartition(separator)
+        if found and '#' in head and '#' not in tail and tail.strip():
+            return head.strip(), tail.strip().lower()
+    return line, default_region
+
+
+def player_key(riot_id: str, region: str) -> str:
+    return f"{region}:{riot_id.strip().lower()}"
+
+
+def load_finished(output_path: str, retry_failed: bool) -> Set[str]:
+    """Players already recorded in an existing output file"""
+    finished = set()
+    if not os.path.exists(output_path):
+        return finished
+
+    with open(output_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # Partial line from an interrupted run
+            if retry_failed and record.get('status') == 'error':
+                continue
+            finished.add(player_key(record['riotId'], record['region']))
+    return finished
+
+
+def fetch_player(pool: RiotClientPool, riot_id: str, region: str, include_timeline: bool) -> Dict:
+    """Resolve a player and make sure their past year of matches is in the stores (runs on a fetch thread)"""
+    client = pool.get(region)
+    summoner = client.get_summoner_by_riot_id(riot_id)
+    if not summoner:
+        return {'riotId': riot_id, 'region': region, 'status': 'not_found'}
+
+    match_ids = client.refresh_match_history(summoner['puuid'])
+
+    if include_timeline:
+        # Same timeline budget as the API, by position in the full list
+        timeline_ids = MatchDataProcessor.timeline_match_ids(match_ids)
+        for match_id in match_ids:
+            if match_id not in timeline_ids:
+                continue
+            try:
+                client.get_match_timeline(match_id)
+            except Exception as e:
+                print(f"Timeline fetch failed for {match_id}: {e}")
+
+    return {
+        'riotId': riot_id,
+        'region': region,
+        'status': 'fetched',
+        'puuid': summoner['puuid'],
+        'player': {
+            'gameName': summoner['gameName'],
+            'tagLine': summoner['tagLine'],
+            'summonerLevel': summoner['summonerLevel']
+        },
+        'matchIds': match_ids
+    }
+
+
+def _init_worker(match_store_path: str, timeline_cache_path: str) -> None:
+    global _worker_match_store, _worker_timeline_cache
+    _worker_match_store = MatchStore(match_store_path)
+    _worker_timeline_cache = TimelineCache(timeline_cache_path)
+
+
+def _stored_matches(match_ids: List[str], include_timeline: bool):
+    """Yield stored matches newest first, attaching cached timelines within the timeline budget"""
+    timeline_ids = MatchDataProcessor.timeline_match_ids(match_ids) if include_timeline else set()
+    for match_id in match_ids:
+        match_data = _worker_match_store.get(match_id)
+        if match_data is None:
+            continue
+        if match_id in timeline_ids:
+            timeline = _worker_timeline_cache.get(match_id, touch=False)  # Read-only: the fetch side owns LRU order
+            if timeline is not None:
+                match_data['timeline'] = MatchDataProcessor.prune_timeline(timeline)
+        yield match_data
+
+
+def aggregate_player(puuid: str, match_ids: List[str], include_timeline: bool) -> Tuple[Dict, str]:
+    """Build (stats, aggregate fingerprint) for one player (runs in a worker process)"""
+    aggregate = MatchDataProcessor.aggregate_matches(_stored_matches(match_ids, include_timeline), puuid)
+    return aggregate.to_stats(), aggregate.fingerprint()
+
+
+class BatchProgress:
+    """Thread-safe counters for throughput reporting"""
+
+    def __init__(self, pool: RiotClientPool, total: int):
+        self.pool = pool
+        self.total = total
+        self.done = 0
+        self.by_status: Dict[str, int] = {}
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def riot_calls(self) -> int:
+        return sum(stats['requests'] for stats in self.pool.get_stats().values())
+
+    def record(self, status: str) -> None:
+        with self._lock:
+            self.done += 1
+            self.by_status[status] = self.by_status.get(status, 0) + 1
+
+    def summary(self) -> Dict:
+        with self._lock:
+            elapsed = time.monotonic() - self.started
+            calls = self.riot_calls()
+            return {
+                'players': self.done,
+                'remaining': self.total - self.done,
+                'by_status': dict(self.by_status),
+                'elapsed_seconds': round(elapsed, 1),
+                'players_per_min': round(self.done / elapsed * 60, 2) if elapsed > 0 else 0.0,
+                'riot_calls': calls,
+                'riot_calls_per_player': round(calls / self.done, 1) if self.done else 0.0
+            }
+
+
+def run_batch(players: List[Tuple[str, str]], output_path: str, pool: RiotClientPool,
+              match_store_path: str, timeline_cache_path: str, workers: int = 4,
+              fetch_threads: int = 4, include_timeline: bool = True, report_every: int = 10,
+              max_in_flight: Optional[int] = None) -> Dict:
+    """Fetch, aggregate and write every player; returns the throughput summary
+
+    At most max_in_flight players (default: enough to keep every fetch thread and
+    worker busy) are fetched or aggregated at once, and nothing is kept for a
+    player once its record is written, so memory stays flat however long the list.
+    """
+    progress = BatchProgress(pool, len(players))
+    write_lock = threading.Lock()
+    max_in_flight = max_in_flight or fetch_threads + 2 * workers
+    slots = threading.BoundedSemaphore(max_in_flight)
+
+    # Spawned workers: forking while fetch threads hold sockets and SQLite handles can deadlock
+    with open(output_path, 'a', encoding='utf-8') as output, \
+            ThreadPoolExecutor(max_workers=fetch_threads, thread_name_prefix='batch-fetch') as fetchers, \
+            ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                initializer=_init_worker,
+                                initargs=(match_store_path, timeline_cache_path)) as processes:
+
+        def write(record: Dict) -> None:
+            """Record one player's outcome and free their slot"""
+            try:
+                with write_lock:
+                    output.write(json.dumps(record, separators=(',', ':')) + '\n')
+                    output.flush()
+                progress.record(record['status'])
+                if progress.done % report_every == 0 or progress.done == progress.total:
+                    summary = progress.summary()
+                    print(f"[{summary['players']}/{progress.total}] {summary['players_per_min']} players/min, "
+                          f"{summary['riot_calls_per_player']} Riot calls/player")
+            finally:
+                slots.release()
+
+        def finish(record: Dict, future) -> None:
+            try:
+                stats, fingerprint = future.result()
+            except Exception as e:
+                write({**record, 'status': 'error', 'error': str(e)})
+                return
+            if not stats['total_matches']:
+                write({**record, 'status': 'no_matches'})
+                return
+            write({**record, 'status': 'ok', 'fingerprint': fingerprint, 'stats': stats})
+
+        def start(riot_id: str, region: str) -> None:
+            """Fetch one player, then hand them to the process pool (runs on a fetch thread)"""
+            try:
+                fetched = fetch_player(pool, riot_id, region, include_timeline)
+            except Exception as e:
+                write({'riotId': riot_id, 'region': region, 'status': 'error', 'error': str(e)})
+                return
+
+            match_ids = fetched.pop('matchIds', None)
+            if fetched['status'] != 'fetched':
+                write(fetched)
+                return
+
+            record = {key: value for key, value in fetched.items() if key != 'status'}
+            try:
+                aggregated = processes.submit(aggregate_player, fetched['puuid'], match_ids, include_timeline)
+            except BrokenProcessPool as e:
+                # A worker died; the pool takes no more work, but the rest of the batch is still recorded
+                write({**record, 'status': 'error', 'error': f"Aggregation pool broken: {e}"})
+                return
+            aggregated.add_done_callback(lambda f: finish(record, f))
+
+        for riot_id, region in players:
+            slots.acquire()
+            fetchers.submit(start, riot_id, region)
+
+        # Every slot is back once the last record has been written
+        for _ in range(max_in_flight):
+            slots.acquire()
+
+    return progress.summary()
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description='Precompute Rift Rewind stats for many players')
+    parser.add_argument('input', help='File with one Riot ID per line (optionally followed by a platform)')
+    parser.add_argument('-o', '--output', default='batch_results.jsonl', help='JSONL output file (appended to)')
+    parser.add_argument('--region', default=os.getenv('RIOT_DEFAULT_REGION', 'na1'),
+                        help='Platform for lines without one (default: na1)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2,
+                        help='Processes aggregating stats')
+    parser.add_argument('--fetch-threads', type=int, default=4,
+                        help='Threads making Riot calls (all share the rate limiters)')
+    parser.add_argument('--no-timeline', action='store_true', help='Skip timelines (no inventory snapshots)')
+    parser.add_argument('--retry-failed', action='store_true', help='Redo players whose recorded status is error')
+    args = parser.parse_args()
+
+    riot_api_key = os.getenv('RIOT_API_KEY')
+    if not riot_api_key:
+        print("Error: RIOT_API_KEY not found in environment variables")
+        sys.exit(1)
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        players = [player for player in (parse_player_line(line, args.region) for line in f) if player]
+
+    finished = load_finished(args.output, args.retry_failed)
+    seen = set()
+    todo = []
+    for riot_id, region in players:
+        key = player_key(riot_id, region)
+        if key not in finished and key not in seen:
+            seen.add(key)
+            todo.append((riot_id, region))
+
+    print(f"{len(players)} players listed, {len(players) - len(todo)} already done or duplicated, {len(todo)} to run")
+    if not todo:
+        return
+
+    match_store = MatchStore()
+    timeline_cache = TimelineCache()
+    pool = RiotClientPool(api_key=riot_api_key, match_store=match_store, timeline_cache=timeline_cache)
+
+    try:
+        summary = run_batch(
+            todo, args.output, pool,
+            match_store_path=match_store.path,
+            timeline_cache_path=timeline_cache.path,
+            workers=args.workers,
+            fetch_threads=args.fetch_threads,
+            include_timeline=not args.no_timeline
+        )
+    finally:
+        pool.close()
+
+    print("\nBatch complete:")
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,489 @@
+"""
+Local stand-in for the Riot API
+Serves the account-v1, summoner-v4, league-v4 and match-v5 routes the app uses from
+synthetic or recorded fixtures, with configurable latency, jitter, injected 429s and
+Riot-style rate-limit headers, so fetch-path changes can be measured offline.
+
+Point the app at it with RIOT_API_BASE_URL (or base_url_override=):
+
+    python -m benchmarks.fake_riot_server --port 8089 --players 20 --matches 400 --latency-ms 40
+    RIOT_API_BASE_URL=http://127.0.0.1:8089 python batch.py players.txt
+
+Requests are routed by their first path segment, which stands in for the host
+(e.g. /na1/lol/summoner/v4/... or /americas/lol/match/v5/...). Synthetic players are
+Synthetic0#SYN .. Synthetic{n-1}#SYN. Recorded fixtures are a directory holding
+players.json (a list of {"account": {...}, "summoner": {...}, "league": [...],
+"matchIds": [...]}) plus matches/<matchId>.json and timelines/<matchId>.json.
+GET /_stats returns request counters.
+"""
+
+import os
+import gzip
+import json
+import math
+import time
+import random
+import argparse
+import threading
+import functools
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from benchmarks.synthetic import SyntheticMatchFactory, SyntheticPlayer
+
+PLATFORMS = {'na1', 'br1', 'la1', 'la2', 'euw1', 'eun1', 'tr1', 'ru', 'me1',
+             'kr', 'jp1', 'oc1', 'ph2', 'sg2', 'th2', 'tw2', 'vn2'}
+REGIONS = {'americas', 'europe', 'asia', 'sea'}
+
+# Development-key application limit, and per-method limits close to Riot's published ones
+DEFAULT_APP_LIMIT = '20:1,100:120'
+DEFAULT_METHOD_LIMITS = {
+    'account': '1000:60',
+    'summoner': '1600:60',
+    'league': '100:60',
+    'match-ids': '2000:10',
+    'match': '2000:10',
+    'timeline': '2000:10'
+}
+
+# Responses at least this large are gzipped for clients that accept it
+GZIP_MIN_BYTES = 1024
+
+
+def parse_limits(spec: str) -> List[Tuple[int, int]]:
+    """'20:1,100:120' -> [(20, 1), (100, 120)]"""
+    limits = []
+    for part in spec.split(','):
+        if part.strip():
+            limit, window = part.strip().split(':')
+            limits.append((int(limit), int(window)))
+    return limits
+
+
+class FixedWindowLimiter:
+    """Riot-style fixed windows: each starts with the first request after the previous one ended"""
+
+    def __init__(self, limits: List[Tuple[int, int]]):
+        self.limits = limits
+        self._windows = {window: [0.0, 0] for _, window in limits}  # window -> [started_at, count]
+
+    def wait(self, now: float) -> float:
+        """Seconds until a request would be allowed (0 if it is allowed now)"""
+        retry_after = 0.0
+        for limit, window in self.limits:
+            state = self._windows[window]
+            if now - state[0] >= window:
+                state[0], state[1] = now, 0
+            if state[1] >= limit:
+                retry_after = max(retry_after, state[0] + window - now)
+        return retry_after
+
+    def consume(self) -> None:
+        for state in self._windows.values():
+            state[1] += 1
+
+    def counts(self) -> str:
+        return ','.join(f"{self._windows[window][1]}:{window}" for _, window in self.limits)
+
+    def header(self) -> str:
+        return ','.join(f"{limit}:{window}" for limit, window in self.limits)
+
+
+@functools.lru_cache(maxsize=256)
+def _gzip(body: bytes) -> bytes:
+    return gzip.compress(body, compresslevel=5)
+
+
+def _encode(data) -> bytes:
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+class SyntheticFixtures:
+    """Seeded players whose matches and timelines are generated on request"""
+
+    def __init__(self, players: int = 10, matches_per_player: int = 100, seed: int = 1, platform: str = 'na1'):
+        factory = SyntheticMatchFactory(seed, platform)
+        self.players = [SyntheticPlayer(factory, index, matches_per_player) for index in range(players)]
+        self._by_riot_id = {player.riot_id.lower(): player for player in self.players}
+        self._by_puuid = {player.puuid: player for player in self.players}
+        self._owner = {match_id: player for player in self.players for match_id in player.match_ids()}
+
+    def account_by_riot_id(self, game_name: str, tag_line: str) -> Optional[Dict]:
+        player = self._by_riot_id.get(f"{game_name}#{tag_line}".lower())
+        return player.account() if player else None
+
+    def account_by_puuid(self, puuid: str) -> Optional[Dict]:
+        player = self._by_puuid.get(puuid)
+        return player.account() if player else None
+
+    def summoner_by_puuid(self, puuid: str) -> Optional[Dict]:
+        player = self._by_puuid.get(puuid)
+        return player.summoner() if player else None
+
+    def league_by_puuid(self, puuid: str) -> Optional[List[Dict]]:
+        player = self._by_puuid.get(puuid)
+        return player.league_entries if player else None
+
+    def match_ids(self, puuid: str) -> Optional[List[Tuple[str, int]]]:
+        """(match ID, gameCreation ms) newest first"""
+        player = self._by_puuid.get(puuid)
+        return player.schedule if player else None
+
+    def match(self, match_id: str) -> Optional[bytes]:
+        encoded = self._encoded(match_id)
+        return encoded[0] if encoded else None
+
+    def timeline(self, match_id: str) -> Optional[bytes]:
+        encoded = self._encoded(match_id)
+        return encoded[1] if encoded else None
+
+    @functools.lru_cache(maxsize=512)
+    def _encoded(self, match_id: str) -> Optional[Tuple[bytes, bytes]]:
+        player = self._owner.get(match_id)
+        if player is None:
+            return None
+        match, timeline = player.match_and_timeline(match_id)
+        return _encode(match), _encode(timeline)
+
+
+class RecordedFixtures:
+    """Fixtures captured from the real API (see the module docstring for the layout)"""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        with (self.directory / 'players.json').open('r', encoding='utf-8') as f:
+            players = json.load(f)
+
+        self._by_riot_id = {f"{p['account']['gameName']}#{p['account']['tagLine']}".lower(): p for p in players}
+        self._by_puuid = {p['account']['puuid']: p for p in players}
+        self._schedules = {}
+        for player in players:
+            schedule = []
+            for match_id in player.get('matchIds', []):
+                match = self._load('matches', match_id)
+                if match is not None:
+                    schedule.append((match_id, match['info'].get('gameCreation', 0)))
+            schedule.sort(key=lambda entry: entry[1], reverse=True)
+            self._schedules[player['account']['puuid']] = schedule
+
+    def _load(self, kind: str, match_id: str) -> Optional[Dict]:
+        path = self.directory / kind / f"{match_id}.json"
+        if not path.exists():
+            return None
+        with path.open('r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def account_by_riot_id(self, game_name: str, tag_line: str) -> Optional[Dict]:
+        player = self._by_riot_id.get(f"{game_name}#{tag_line}".lower())
+        return player['account'] if player else None
+
+    def account_by_puuid(self, puuid: str) -> Optional[Dict]:
+        player = self._by_puuid.get(puuid)
+        return player['account'] if player else None
+
+    def summoner_by_puuid(self, puuid: str) -> Optional[Dict]:
+        player = self._by_puuid.get(puuid)
+        return player.get('summoner') if player else None
+
+    def league_by_puuid(self, puuid: str) -> Optional[List[Dict]]:
+        player = self._by_puuid.get(puuid)
+        return player.get('league', []) if player else None
+
+    def match_ids(self, puuid: str) -> Optional[List[Tuple[str, int]]]:
+        return self._schedules.get(puuid)
+
+    @functools.lru_cache(maxsize=512)
+    def match(self, match_id: str) -> Optional[bytes]:
+        path = self.directory / 'matches' / f"{match_id}.json"
+        return path.read_bytes() if path.exists() else None
+
+    @functools.lru_cache(maxsize=512)
+    def timeline(self, match_id: str) -> Optional[bytes]:
+        path = self.directory / 'timelines' / f"{match_id}.json"
+        return path.read_bytes() if path.exists() else None
+
+
+class FakeRiotState:
+    """Fixtures plus the knobs and counters shared by every request handler"""
+
+    def __init__(self, fixtures, latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0,
+                 retry_after: int = 1, app_limit: str = DEFAULT_APP_LIMIT,
+                 method_limits: Optional[Dict[str, str]] = None, enforce_limits: bool = True, seed: int = 1):
+        self.fixtures = fixtures
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.enforce_limits = enforce_limits
+        self.app_limits = parse_limits(app_limit)
+        self.method_limits = {method: parse_limits(spec)
+                              for method, spec in {**DEFAULT_METHOD_LIMITS, **(method_limits or {})}.items()}
+
+        self._rng = random.Random(seed)
+        self._limiters: Dict[Tuple[str, str], FixedWindowLimiter] = {}  # (routing, 'app' or method) -> limiter
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'by_method': {}, 'by_status': {}, 'injected_429': 0,
+                      'enforced_429': 0, 'bytes_sent': 0}
+
+    def delay(self) -> float:
+        """Seconds to hold this response: latency +/- uniform jitter"""
+        with self._lock:
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+    def inject_429(self) -> bool:
+        if not self.error_rate:
+            return False
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+    def _limiter(self, routing: str, scope: str, limits: List[Tuple[int, int]]) -> FixedWindowLimiter:
+        limiter = self._limiters.get((routing, scope))
+        if limiter is None:
+            limiter = self._limiters[(routing, scope)] = FixedWindowLimiter(limits)
+        return limiter
+
+    def admit(self, routing: str, method: str) -> Tuple[Optional[str], float, Dict[str, str]]:
+        """Count a request against its host's limits; returns (limit type or None, retry_after, headers)"""
+        with self._lock:
+            now = time.monotonic()
+            app = self._limiter(routing, 'app', self.app_limits)
+            method_limiter = self._limiter(routing, method, self.method_limits.get(method, []))
+
+            app_wait, method_wait = app.wait(now), method_limiter.wait(now)
+
+            # The application limit is checked first; a rejected request counts against neither
+            limited_by, retry_after = None, 0.0
+            if self.enforce_limits and app_wait:
+                limited_by, retry_after = 'application', app_wait
+            elif self.enforce_limits and method_wait:
+                limited_by, retry_after = 'method', method_wait
+            else:
+                app.consume()
+                method_limiter.consume()
+
+            headers = {
+                'X-App-Rate-Limit': app.header(),
+                'X-App-Rate-Limit-Count': app.counts(),
+                'X-Method-Rate-Limit': method_limiter.header(),
+                'X-Method-Rate-Limit-Count': method_limiter.counts()
+            }
+            return limited_by, retry_after, headers
+
+    def record(self, method: str, status: int, sent: int) -> None:
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['by_method'][method] = self.stats['by_method'].get(method, 0) + 1
+            self.stats['by_status'][str(status)] = self.stats['by_status'].get(str(status), 0) + 1
+            self.stats['bytes_sent'] += sent
+
+    def count_429(self, injected: bool) -> None:
+        with self._lock:
+            self.stats['injected_429' if injected else 'enforced_429'] += 1
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return json.loads(json.dumps(self.stats))
+
+
+class FakeRiotHandler(BaseHTTPRequestHandler):
+    """Routes /<routing>/<Riot path> to the fixtures"""
+
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the real API; the client pools connections
+    disable_nagle_algorithm = True  # Headers and body are separate writes; don't let them wait on delayed ACKs
+    server_version = 'FakeRiot/1.0'
+    state: FakeRiotState = None
+    verbose = False
+
+    def log_message(self, format, *args):
+        if self.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        segments = [unquote(segment) for segment in parts.path.strip('/').split('/')]
+
+        if segments == ['_stats']:
+            self._send(200, _encode(self.state.get_stats()), method='_stats')
+            return
+
+        if not self.headers.get('X-Riot-Token'):
+            self._send_error(401, 'Unauthorized', method='unknown')
+            return
+
+        routing, path = segments[0].lower(), segments[1:]
+        route = self._route(path)
+        if route is None:
+            self._send_error(404, 'Data not found - unknown route', method='unknown')
+            return
+
+        method, needs_platform, resolve = route
+        if routing not in (PLATFORMS if needs_platform else REGIONS):
+            self._send_error(403, 'Forbidden', method=method)
+            return
+
+        delay = self.state.delay()
+        if delay:
+            time.sleep(delay)
+
+        limited_by, retry_after, headers = self.state.admit(routing, method)
+        injected = limited_by is None and self.state.inject_429()
+        if limited_by or injected:
+            self.state.count_429(injected)
+            headers['Retry-After'] = str(self.state.retry_after if injected else max(1, math.ceil(retry_after)))
+            headers['X-Rate-Limit-Type'] = 'service' if injected else limited_by
+            self._send_error(429, 'Rate limit exceeded', method=method, headers=headers)
+            return
+
+        data = resolve(parse_qs(parts.query))
+        if data is None:
+            self._send_error(404, 'Data not found', method=method, headers=headers)
+            return
+        self._send(200, data if isinstance(data, bytes) else _encode(data), method=method, headers=headers)
+
+    def _route(self, path: List[str]):
+        """(method name, platform-routed?, resolver taking the query) for a Riot path, or None"""
+        fixtures = self.state.fixtures
+        if path[:5] == ['riot', 'account', 'v1', 'accounts', 'by-riot-id'] and len(path) == 7:
+            return 'account', False, lambda query: fixtures.account_by_riot_id(path[5], path[6])
+        if path[:5] == ['riot', 'account', 'v1', 'accounts', 'by-puuid'] and len(path) == 6:
+            return 'account', False, lambda query: fixtures.account_by_puuid(path[5])
+        if path[:5] == ['lol', 'summoner', 'v4', 'summoners', 'by-puuid'] and len(path) == 6:
+            return 'summoner', True, lambda query: fixtures.summoner_by_puuid(path[5])
+        if path[:5] == ['lol', 'league', 'v4', 'entries', 'by-puuid'] and len(path) == 6:
+            return 'league', True, lambda query: fixtures.league_by_puuid(path[5])
+        if path[:4] == ['lol', 'match', 'v5', 'matches']:
+            if len(path) == 7 and path[4] == 'by-puuid' and path[6] == 'ids':
+                return 'match-ids', False, lambda query: self._match_ids(path[5], query)
+            if len(path) == 5:
+                return 'match', False, lambda query: fixtures.match(path[4])
+            if len(path) == 6 and path[5] == 'timeline':
+                return 'timeline', False, lambda query: fixtures.timeline(path[4])
+        return None
+
+    def _match_ids(self, puuid: str, query: Dict[str, List[str]]) -> List[str]:
+        """match-v5 ids: startTime/endTime in epoch seconds, start offset and count (max 100)"""
+        def param(name: str, default: Optional[int]) -> Optional[int]:
+            values = query.get(name)
+            return int(values[0]) if values else default
+
+        schedule = self.state.fixtures.match_ids(puuid) or []
+        start_time, end_time = param('startTime', None), param('endTime', None)
+        start, count = param('start', 0), min(param('count', 20), 100)
+        ids = [match_id for match_id, created in schedule
+               if (start_time is None or created // 1000 >= start_time)
+               and (end_time is None or created // 1000 <= end_time)]
+        return ids[start:start + count]
+
+    def _send_error(self, status: int, message: str, method: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self._send(status, _encode({'status': {'message': message, 'status_code': status}}), method, headers)
+
+    def _send(self, status: int, body: bytes, method: str, headers: Optional[Dict[str, str]] = None) -> None:
+        if len(body) >= GZIP_MIN_BYTES and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = _gzip(body)
+            headers = {**(headers or {}), 'Content-Encoding': 'gzip'}
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json;charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.state.record(method, status, len(body))
+
+
+class FakeRiotServer:
+    """Runs the stand-in on a background thread; usable as a context manager"""
+
+    def __init__(self, state: FakeRiotState, host: str = '127.0.0.1', port: int = 0, verbose: bool = False):
+        handler = type('BoundFakeRiotHandler', (FakeRiotHandler,), {'state': state, 'verbose': verbose})
+        self.state = state
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='fake-riot', daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> 'FakeRiotServer':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description='Local stand-in for the Riot API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=int(os.getenv('FAKE_RIOT_PORT', '8089')))
+    parser.add_argument('--fixtures', help='Directory of recorded fixtures (default: synthetic players)')
+    parser.add_argument('--players', type=int, default=10, help='Synthetic players to generate')
+    parser.add_argument('--matches', type=int, default=100, help='Synthetic matches per player')
+    parser.add_argument('--platform', default='na1', help='Platform prefix for synthetic match IDs')
+    parser.add_argument('--seed', type=int, default=1, help='Seed for fixtures, jitter and injected errors')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Added to every response')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Uniform +/- variation around the latency')
+    parser.add_argument('--error-rate', type=float, default=0, help='Fraction of requests answered with a service 429')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds on injected 429s')
+    parser.add_argument('--app-limit', default=DEFAULT_APP_LIMIT, help='Application limit per host, e.g. 500:10,30000:600')
+    parser.add_argument('--method-limit', action='append', default=[], metavar='METHOD=SPEC',
+                        help=f"Override a method limit (methods: {', '.join(DEFAULT_METHOD_LIMITS)})")
+    parser.add_argument('--no-enforce', action='store_true', help='Report rate-limit headers but never reject')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+    args = parser.parse_args()
+
+    method_limits = {}
+    for override in args.method_limit:
+        method, _, spec = override.partition('=')
+        method_limits[method] = spec
+
+    if args.fixtures:
+        fixtures = RecordedFixtures(args.fixtures)
+        print(f"Serving recorded fixtures from {args.fixtures}")
+    else:
+        fixtures = SyntheticFixtures(args.players, args.matches, args.seed, args.platform)
+        print(f"Serving {args.players} synthetic players x {args.matches} matches "
+              f"(Synthetic0#SYN .. Synthetic{args.players - 1}#SYN)")
+
+    state = FakeRiotState(
+        fixtures,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+        app_limit=args.app_limit,
+        method_limits=method_limits,
+        enforce_limits=not args.no_enforce,
+        seed=args.seed
+    )
+    server = FakeRiotServer(state, args.host, args.port, verbose=args.verbose)
+    print(f"Fake Riot API listening on {server.base_url} (set RIOT_API_BASE_URL to use it)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(json.dumps(state.get_stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
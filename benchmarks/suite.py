@@ -0,0 +1,355 @@
+"""
+Processing benchmarks for Rift Rewind
+Times the CPU-bound stages of an analysis on seeded synthetic match histories and
+compares them against a stored baseline, failing when a stage regresses.
+
+Usage:
+    python -m benchmarks.suite                         # compare with benchmarks/baseline.json
+    python -m benchmarks.suite --update-baseline       # record a new baseline
+    python -m benchmarks.suite --sizes 10,100 --stages extract_player_stats
+
+Each stage is measured per history size for:
+    wall_ms        median wall time of one call (calls are batched until a sample takes
+                   at least MIN_SAMPLE_SECONDS, then divided)
+    alloc_peak_kb  peak memory traced by tracemalloc during one call
+    rss_peak_kb    growth of the process's peak RSS during one call (Linux resets the
+                   high-water mark through /proc/self/clear_refs; elsewhere only growth
+                   past the previous peak is seen)
+
+Wall times depend on the machine, so record the baseline on the machine that runs
+the comparison. Exits with status 1 if any metric exceeds its baseline by more than
+the tolerance.
+"""
+
+import os
+import gc
+import sys
+import json
+import time
+import atexit
+import shutil
+import platform
+import argparse
+import tempfile
+import functools
+import statistics
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from backend import InsightGenerator, MatchDataProcessor
+from benchmarks.synthetic import anchor_for, synthetic_players
+
+DEFAULT_SIZES = (10, 100, 1000, 5000)
+DEFAULT_BASELINE = Path(__file__).with_name('baseline.json')
+BASELINE_YEAR = 2025  # Match dates are anchored here so month buckets never change
+
+MIN_SAMPLE_SECONDS = 0.02
+MAX_CALLS_PER_SAMPLE = 10000
+
+# Relative tolerance per metric, plus an absolute allowance so tiny values don't flap
+TOLERANCES = {'wall_ms': 0.25, 'alloc_peak_kb': 0.10, 'rss_peak_kb': 0.25}
+SLACK = {'wall_ms': 0.05, 'alloc_peak_kb': 16, 'rss_peak_kb': 2048}
+
+CHAT_QUESTION = "What should I focus on to climb out of my current rank?"
+
+
+class BenchmarkData:
+    """Inputs for every stage, built from one synthetic player with `size` matches
+
+    Matches carry pruned timelines on the first 10 of every 100, as the app stores
+    them. The full timelines are kept separately for reconstruct_inventory; they
+    are generated without per-minute participant frames, which it never reads.
+    """
+
+    def __init__(self, size: int, seed: int):
+        player = synthetic_players(seed, players=1, matches_per_player=size,
+                                   anchor_ms=anchor_for(BASELINE_YEAR), participant_frames=False)[0]
+        self.size = size
+        self.puuid = player.puuid
+        self.matches: List[Dict] = []
+        self.timelines: List[Tuple[List[Dict], int, int]] = []  # (frames, participantId, game end ms)
+
+        for match in player.iter_matches(timelines='paged'):
+            timeline = match.pop('timeline', None)
+            if timeline is not None:
+                self.timelines.append((timeline['info']['frames'], player.slot + 1,
+                                       match['info']['gameDuration'] * 1000))
+                match['timeline'] = MatchDataProcessor.prune_timeline(timeline)
+            self.matches.append(match)
+
+        self.stats = MatchDataProcessor.extract_player_stats(self.matches, self.puuid)
+        self.summoner_name = player.riot_id
+        self.rank_info = player.league_entries[0]
+        self.player_data = {
+            'player': {
+                'gameName': player.game_name,
+                'tagLine': player.tag_line,
+                'summonerLevel': player.summoner_level,
+                'rank': {
+                    'tier': self.rank_info['tier'],
+                    'division': self.rank_info['rank'],
+                    'lp': self.rank_info['leaguePoints'],
+                    'wins': self.rank_info['wins'],
+                    'losses': self.rank_info['losses']
+                }
+            },
+            'stats': self.stats,
+            'insights': ('Your laning is steady, but your mid-game map presence drops off. ' * 100).strip()
+        }
+        self.history = [
+            {'role': 'user' if turn % 2 == 0 else 'assistant', 'content': f"Message {turn} about my games. " * 8}
+            for turn in range(12)
+        ]
+
+
+def _chat_prompt_builder() -> Callable:
+    """api._build_chat_prompt, imported with the API's stores pointed at a scratch directory
+
+    Importing api opens its stores at import time, so the store paths are
+    overridden only for the import and the environment is restored afterwards.
+    """
+    if 'api' in sys.modules:
+        return sys.modules['api']._build_chat_prompt
+
+    scratch = tempfile.mkdtemp(prefix='rift-bench-')
+    atexit.register(shutil.rmtree, scratch, ignore_errors=True)
+    overrides = {
+        'MATCH_STORE_PATH': os.path.join(scratch, 'match_store.sqlite3'),
+        'TIMELINE_CACHE_PATH': os.path.join(scratch, 'timeline_cache.sqlite3'),
+        'LLM_CACHE_PATH': None  # No on-disk response cache
+    }
+    saved = {name: os.environ.get(name) for name in overrides}
+    try:
+        _set_env(overrides)
+        from api import _build_chat_prompt
+    finally:
+        _set_env(saved)
+    return _build_chat_prompt
+
+
+def _set_env(values: Dict[str, Optional[str]]) -> None:
+    """Set environment variables, removing those whose value is None"""
+    for name, value in values.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+
+
+def _reconstruct_all(data: BenchmarkData) -> None:
+    """Inventories at 10 and 20 minutes and at game end for every timeline"""
+    for frames, pid, game_end in data.timelines:
+        for cutoff in (600000, 1200000, game_end):
+            MatchDataProcessor.reconstruct_inventory(frames, pid, cutoff)
+
+
+def build_stages() -> Dict[str, Callable[[BenchmarkData], object]]:
+    build_chat_prompt = _chat_prompt_builder()
+    return {
+        'extract_player_stats': lambda data: MatchDataProcessor.extract_player_stats(data.matches, data.puuid),
+        'reconstruct_inventory': _reconstruct_all,
+        'create_year_in_review_prompt': lambda data: InsightGenerator.create_year_in_review_prompt(
+            data.stats, data.summoner_name, data.rank_info),
+        '_build_chat_prompt': lambda data: build_chat_prompt(CHAT_QUESTION, data.player_data, data.history)
+    }
+
+
+def _read_status_kb(*fields: str) -> Optional[Dict[str, int]]:
+    try:
+        with open('/proc/self/status', 'r') as f:
+            values = {line.split(':')[0]: int(line.split()[1]) for line in f if line.startswith(fields)}
+        return values if len(values) == len(fields) else None
+    except OSError:
+        return None
+
+
+def _reset_peak_rss() -> bool:
+    """Reset VmHWM to the current RSS; False where unsupported"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _max_rss_kb() -> int:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak  # bytes on macOS, KiB elsewhere
+
+
+def measure_wall_ms(fn: Callable[[], object], repeat: int) -> float:
+    """Median per-call wall time over `repeat` samples"""
+    fn()  # Warm-up (imports, caches)
+
+    calls = 1
+    while calls < MAX_CALLS_PER_SAMPLE:
+        started = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        if time.perf_counter() - started >= MIN_SAMPLE_SECONDS:
+            break
+        calls *= 2
+
+    samples = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        samples.append((time.perf_counter() - started) / calls * 1000)
+    return statistics.median(samples)
+
+
+def measure_alloc_peak_kb(fn: Callable[[], object]) -> float:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return (peak - baseline) / 1024
+
+
+def measure_rss_peak_kb(fn: Callable[[], object]) -> int:
+    gc.collect()
+    if _reset_peak_rss():
+        before = _read_status_kb('VmRSS')
+        fn()
+        after = _read_status_kb('VmHWM')
+        if before and after:
+            return max(0, after['VmHWM'] - before['VmRSS'])
+
+    before = _max_rss_kb()
+    fn()
+    return max(0, _max_rss_kb() - before)
+
+
+def measure_stage(fn: Callable[[], object], repeat: int) -> Dict[str, float]:
+    return {
+        'wall_ms': round(measure_wall_ms(fn, repeat), 4),
+        'alloc_peak_kb': round(measure_alloc_peak_kb(fn), 1),
+        'rss_peak_kb': measure_rss_peak_kb(fn)
+    }
+
+
+def run_suite(sizes: List[int], stage_names: Optional[List[str]] = None, repeat: int = 5,
+              seed: int = 1) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """{size: {stage: {metric: value}}}"""
+    stages = build_stages()
+    selected = stage_names or list(stages)
+    results = {}
+
+    for size in sizes:
+        started = time.perf_counter()
+        data = BenchmarkData(size, seed)
+        print(f"\n{size} matches ({len(data.timelines)} timelines), generated in {time.perf_counter() - started:.1f}s")
+
+        results[str(size)] = {}
+        for name in selected:
+            metrics = measure_stage(functools.partial(stages[name], data), repeat)
+            results[str(size)][name] = metrics
+            print(f"  {name:<30} {metrics['wall_ms']:>11.3f} ms {metrics['alloc_peak_kb']:>12.1f} KB alloc "
+                  f"{metrics['rss_peak_kb']:>9} KB rss")
+        del data
+    return results
+
+
+def compare(results: Dict, baseline: Dict, tolerances: Dict[str, float]) -> List[str]:
+    """Human-readable regressions of results against baseline results"""
+    regressions = []
+    for size, stages in results.items():
+        for stage, metrics in stages.items():
+            expected = baseline.get(size, {}).get(stage)
+            if expected is None:
+                print(f"  (no baseline for {stage} at {size} matches)")
+                continue
+            for metric, value in metrics.items():
+                if metric not in expected:
+                    continue
+                allowed = expected[metric] * (1 + tolerances[metric]) + SLACK[metric]
+                if value > allowed:
+                    change = (value / expected[metric] - 1) * 100 if expected[metric] else float('inf')
+                    regressions.append(f"{stage} @ {size} matches: {metric} {value} vs baseline "
+                                       f"{expected[metric]} (+{change:.0f}%, allowed {allowed:.2f})")
+    return regressions
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description='Benchmark Rift Rewind processing stages')
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help='Comma-separated match counts (default: 10,100,1000,5000)')
+    parser.add_argument('--stages', help='Comma-separated stage names (default: all)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed samples per stage')
+    parser.add_argument('--seed', type=int, default=1, help='Synthetic data seed')
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help='Baseline JSON file')
+    parser.add_argument('--update-baseline', action='store_true', help='Write results as the new baseline')
+    parser.add_argument('--output', help='Also write results to this JSON file')
+    parser.add_argument('--time-tolerance', type=float, default=TOLERANCES['wall_ms'],
+                        help='Allowed relative wall-time increase (default: 0.25)')
+    parser.add_argument('--memory-tolerance', type=float, default=TOLERANCES['alloc_peak_kb'],
+                        help='Allowed relative allocation increase (default: 0.10)')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    stage_names = [name.strip() for name in args.stages.split(',')] if args.stages else None
+
+    results = run_suite(sizes, stage_names, repeat=args.repeat, seed=args.seed)
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'recordedAt': datetime.now(timezone.utc).isoformat(timespec='seconds')
+        },
+        'results': results
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        if baseline_path.exists():
+            # Keep entries for sizes/stages that weren't re-run
+            with baseline_path.open('r', encoding='utf-8') as f:
+                previous = json.load(f).get('results', {})
+            for size, stages in previous.items():
+                report['results'][size] = {**stages, **report['results'].get(size, {})}
+        with baseline_path.open('w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+        print(f"\nBaseline written to {baseline_path}")
+        return
+
+    if not baseline_path.exists():
+        print(f"\nNo baseline at {baseline_path}; run with --update-baseline to record one")
+        sys.exit(1)
+
+    with baseline_path.open('r', encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    tolerances = dict(TOLERANCES, wall_ms=args.time_tolerance, alloc_peak_kb=args.memory_tolerance)
+    print(f"\nComparing with {baseline_path} (recorded {baseline['meta'].get('recordedAt')} "
+          f"on Python {baseline['meta'].get('python')})")
+    regressions = compare(results, baseline['results'], tolerances)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s):")
+        for regression in regressions:
+            print(f"  - {regression}")
+        sys.exit(1)
+    print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,515 @@
+"""
+Seeded synthetic Riot API payloads
+Generates match-v5 matches and timelines (plus the account, summoner and league
+entries that go with them) that look like real ones: ten participants with
+plausible stat lines, and timelines whose item purchases, component merges,
+undos and sells follow a build that ends in the participant's item0-6.
+
+Everything is derived from (seed, match ID), so the same match can be rebuilt on
+demand and every run sees byte-identical data.
+"""
+
+import random
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+CHAMPIONS = {
+    'TOP': ['Aatrox', 'Darius', 'Garen', 'Camille', 'Fiora', 'Malphite', 'Ornn', 'Sett', 'Jax', 'Renekton'],
+    'JUNGLE': ['Lee Sin', 'Elise', 'Kindred', 'Vi', 'Viego', 'Graves', 'Kayn', 'Sejuani', 'Hecarim', 'Amumu'],
+    'MIDDLE': ['Ahri', 'Zed', 'Syndra', 'Orianna', 'Yasuo', 'Sylas', 'Viktor', 'Lux', 'Akali', 'Vex'],
+    'BOTTOM': ['Jinx', 'Kai\'Sa', 'Ezreal', 'Caitlyn', 'Jhin', 'Ashe', 'Vayne', 'Xayah', 'Zeri', 'Samira'],
+    'UTILITY': ['Thresh', 'Janna', 'Nautilus', 'Lulu', 'Braum', 'Leona', 'Nami', 'Rakan', 'Milio', 'Karma']
+}
+POSITIONS = list(CHAMPIONS)
+
+STARTER_ITEMS = {
+    'TOP': [1055, 1054], 'JUNGLE': [1101, 1102, 1103], 'MIDDLE': [1056, 1055],
+    'BOTTOM': [1055], 'UTILITY': [3850, 3854, 3858, 3862]
+}
+BOOTS = 1001
+UPGRADED_BOOTS = [3006, 3009, 3020, 3047, 3111, 3158]
+POTION = 2003
+CONTROL_WARD = 2055
+TRINKETS = [3340, 3364, 3363]
+
+# Legendary -> components bought on the way (destroyed when the legendary is completed)
+LEGENDARIES = {
+    'TOP': {3071: [3133, 1037], 6630: [3044, 3067], 3053: [3044, 1011], 3075: [3076, 1031], 3748: [1011, 3077]},
+    'JUNGLE': {6692: [3134, 1037], 3142: [3134, 1036], 6630: [3044, 3067], 3742: [1031, 1011], 6662: [3067, 1011]},
+    'MIDDLE': {6655: [3802, 1052], 3157: [3191, 1058], 3089: [1058, 1026], 4645: [3916, 1052], 3135: [3916, 1026]},
+    'BOTTOM': {6672: [1038, 1042], 3031: [1038, 1037], 3094: [3086, 1037], 3046: [3086, 1042], 3036: [3035, 1037]},
+    'UTILITY': {3190: [3067, 1033], 6617: [3067, 3113], 3107: [3114, 1028], 3222: [3114, 1052], 4005: [3067, 1028]}
+}
+
+TIERS = ['IRON', 'BRONZE', 'SILVER', 'GOLD', 'PLATINUM', 'EMERALD', 'DIAMOND']
+DIVISIONS = ['IV', 'III', 'II', 'I']
+
+# Ranked solo, ranked flex and normal draft queue IDs, weighted toward solo queue
+QUEUES = [420, 420, 420, 440, 400]
+
+# Average gap between a player's games, and the spread around it
+MATCH_SPACING_MS = 6 * 3600 * 1000
+FRAME_INTERVAL_MS = 60000
+
+
+def stable_seed(*parts) -> int:
+    """Seed derived from the given values, identical across processes and Python versions"""
+    digest = hashlib.sha256('|'.join(str(part) for part in parts).encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+
+def synthetic_puuid(seed: int, name: str) -> str:
+    """A 78-character PUUID-like string"""
+    digest = hashlib.sha512(f"{seed}|puuid|{name}".encode('utf-8')).hexdigest()
+    return digest[:78]
+
+
+class SyntheticMatchFactory:
+    """Builds matches and timelines for players from a fixed seed
+
+    gameCreation is spaced out backwards from anchor_ms (default: now), so a
+    player's games fall inside the one-year window the app fetches. With
+    participant_frames=False, timeline frames carry events only (the per-minute
+    participant snapshots make up most of a real timeline's size).
+    """
+
+    def __init__(self, seed: int = 1, platform: str = 'na1', anchor_ms: Optional[int] = None,
+                 participant_frames: bool = True):
+        self.seed = seed
+        self.platform = platform.lower()
+        if anchor_ms is None:
+            anchor_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+        self.anchor_ms = anchor_ms
+        self.participant_frames = participant_frames
+
+    def match_id(self, player_index: int, match_index: int) -> str:
+        return f"{self.platform.upper()}_{5000000000 + player_index * 100000 + match_index}"
+
+    def match_schedule(self, player_index: int, count: int) -> List[Tuple[str, int]]:
+        """(match ID, gameCreation ms) for a player's games, newest first"""
+        rng = random.Random(stable_seed(self.seed, 'schedule', player_index))
+        schedule = []
+        created = self.anchor_ms - rng.randint(0, MATCH_SPACING_MS)
+        for match_index in range(count):
+            schedule.append((self.match_id(player_index, match_index), created))
+            created -= int(MATCH_SPACING_MS * rng.uniform(0.2, 1.8))
+        return schedule
+
+    def match_and_timeline(self, match_id: str, puuid: str, game_creation: int,
+                           player_slot: Optional[int] = None, timeline: bool = True) -> Tuple[Dict, Optional[Dict]]:
+        """Build one match (match-v5 shape) and its timeline (None if timeline=False)
+
+        puuid is placed in player_slot (0-9, default: chosen by the seed); the
+        other nine participants get made-up PUUIDs. The match is the same whether
+        or not the timeline is built.
+        """
+        rng = random.Random(stable_seed(self.seed, 'match', match_id))
+        if player_slot is None:
+            player_slot = rng.randrange(10)
+
+        duration = rng.randint(15 * 60, 42 * 60)
+        blue_wins = rng.random() < 0.5
+        queue_id = rng.choice(QUEUES)
+
+        puuids = [puuid if slot == player_slot else synthetic_puuid(self.seed, f"{match_id}:{slot}")
+                  for slot in range(10)]
+        positions = POSITIONS + POSITIONS
+
+        item_events, final_items, control_wards = self._item_builds(rng, positions, duration)
+
+        participants = []
+        for slot in range(10):
+            team_id = 100 if slot < 5 else 200
+            win = blue_wins == (team_id == 100)
+            participants.append(self._participant(rng, slot, puuids[slot], positions[slot], team_id, win,
+                                                  duration, final_items[slot], control_wards[slot]))
+
+        match = {
+            'metadata': {'dataVersion': '2', 'matchId': match_id, 'participants': puuids},
+            'info': {
+                'endOfGameResult': 'GameComplete',
+                'gameCreation': game_creation,
+                'gameDuration': duration,
+                'gameEndTimestamp': game_creation + 60000 + duration * 1000,
+                'gameId': int(match_id.split('_')[1]),
+                'gameMode': 'CLASSIC',
+                'gameName': f"teambuilder-match-{match_id.split('_')[1]}",
+                'gameStartTimestamp': game_creation + 60000,
+                'gameType': 'MATCHED_GAME',
+                'gameVersion': '14.20.628.1234',
+                'mapId': 11,
+                'participants': participants,
+                'platformId': self.platform.upper(),
+                'queueId': queue_id,
+                'teams': [self._team(rng, team_id, blue_wins == (team_id == 100)) for team_id in (100, 200)],
+                'tournamentCode': ''
+            }
+        }
+        if not timeline:
+            return match, None
+
+        # Filler events and participant frames draw from their own stream, so skipping them leaves the match unchanged
+        detail_rng = random.Random(stable_seed(self.seed, 'timeline', match_id))
+        return match, {
+            'metadata': {'dataVersion': '2', 'matchId': match_id, 'participants': puuids},
+            'info': {
+                'endOfGameResult': 'GameComplete',
+                'frameInterval': FRAME_INTERVAL_MS,
+                'frames': self._timeline_frames(detail_rng, item_events, duration, 100 if blue_wins else 200),
+                'gameId': match['info']['gameId'],
+                'participants': [{'participantId': slot + 1, 'puuid': puuids[slot]} for slot in range(10)]
+            }
+        }
+
+    def _participant(self, rng: random.Random, slot: int, puuid: str, position: str, team_id: int,
+                     win: bool, duration: int, items: List[int], control_wards: int) -> Dict:
+        minutes = duration / 60
+        laner = position in ('TOP', 'MIDDLE', 'BOTTOM')
+        kills = rng.randint(0, 14 if position != 'UTILITY' else 5)
+        deaths = rng.randint(0, 11)
+        assists = rng.randint(0, 12 if position != 'UTILITY' else 25)
+        cs = int(minutes * rng.uniform(5.5, 8.5)) if laner else int(minutes * rng.uniform(0.3, 1.5))
+        jungle_cs = int(minutes * rng.uniform(4.5, 6.5)) if position == 'JUNGLE' else rng.randint(0, 12)
+        damage = int(minutes * rng.uniform(300, 1100 if position != 'UTILITY' else 500))
+        turret_kills = rng.randint(0, 3)
+        inhibitor_kills = rng.randint(0, 1)
+
+        item_slots = (items[:6] + [0] * 6)[:6]
+        return {
+            'allInPings': rng.randint(0, 3),
+            'assists': assists,
+            'baronKills': int(position == 'JUNGLE' and rng.random() < 0.2),
+            'champExperience': int(minutes * rng.uniform(500, 750)),
+            'champLevel': min(18, int(minutes / 2) + rng.randint(1, 4)),
+            'championId': rng.randint(1, 950),
+            'championName': rng.choice(CHAMPIONS[position]),
+            'challenges': {
+                'baronTakedowns': int(rng.random() < 0.35),
+                'controlWardsPlaced': control_wards,
+                'damagePerMinute': damage / minutes,
+                'dragonTakedowns': rng.randint(0, 4),
+                'goldPerMinute': rng.uniform(280, 480),
+                'kda': (kills + assists) / max(1, deaths),
+                'killParticipation': rng.uniform(0.3, 0.8),
+                'laneMinionsFirst10Minutes': rng.randint(20, 90) if laner else rng.randint(0, 5),
+                'soloKills': rng.randint(0, 3),
+                'teamDamagePercentage': rng.uniform(0.08, 0.35),
+                'visionScorePerMinute': rng.uniform(0.3, 2.5)
+            },
+            'damageDealtToBuildings': rng.randint(0, 9000),
+            'damageDealtToObjectives': rng.randint(0, 25000),
+            'damageDealtToTurrets': rng.randint(0, 9000),
+            'deaths': deaths,
+            'detectorWardsPlaced': control_wards,
+            'doubleKills': int(kills > 3 and rng.random() < 0.4),
+            'firstBloodKill': rng.random() < 0.08,
+            'firstTowerKill': rng.random() < 0.08,
+            'goldEarned': int(minutes * rng.uniform(280, 480)),
+            'goldSpent': int(minutes * rng.uniform(250, 450)),
+            'individualPosition': position,
+            'inhibitorKills': inhibitor_kills,
+            'inhibitorTakedowns': inhibitor_kills + rng.randint(0, 1),
+            'item0': item_slots[0], 'item1': item_slots[1], 'item2': item_slots[2],
+            'item3': item_slots[3], 'item4': item_slots[4], 'item5': item_slots[5],
+            'item6': items[6] if len(items) > 6 else rng.choice(TRINKETS),
+            'kills': kills,
+            'lane': 'BOTTOM' if position in ('BOTTOM', 'UTILITY') else position,
+            'largestKillingSpree': rng.randint(0, kills),
+            'largestMultiKill': 1 + int(kills > 3 and rng.random() < 0.4),
+            'magicDamageDealtToChampions': damage // 2,
+            'neutralMinionsKilled': jungle_cs,
+            'participantId': slot + 1,
+            'pentaKills': int(kills > 8 and rng.random() < 0.05),
+            'physicalDamageDealtToChampions': damage // 2,
+            'puuid': puuid,
+            'quadraKills': int(kills > 6 and rng.random() < 0.1),
+            'riotIdGameName': f"Player{slot + 1}",
+            'riotIdTagline': 'SYN',
+            'role': 'SUPPORT' if position == 'UTILITY' else 'SOLO',
+            'soloKills': rng.randint(0, 3),
+            'summoner1Id': 4,
+            'summoner2Id': 11 if position == 'JUNGLE' else rng.choice([12, 14, 7, 3]),
+            'teamId': team_id,
+            'teamPosition': position if rng.random() > 0.02 else '',
+            'totalDamageDealt': damage * 6,
+            'totalDamageDealtToChampions': damage,
+            'totalDamageTaken': int(minutes * rng.uniform(500, 1300)),
+            'totalHeal': rng.randint(500, 15000),
+            'totalHealsOnTeammates': rng.randint(0, 12000) if position == 'UTILITY' else rng.randint(0, 800),
+            'totalMinionsKilled': cs,
+            'totalTimeSpentDead': deaths * rng.randint(10, 45),
+            'tripleKills': int(kills > 5 and rng.random() < 0.15),
+            'turretKills': turret_kills,
+            'turretTakedowns': turret_kills + rng.randint(0, 4),
+            'visionScore': int(minutes * rng.uniform(0.3, 2.5)),
+            'wardsKilled': rng.randint(0, 12),
+            'wardsPlaced': rng.randint(3, 40),
+            'win': win
+        }
+
+    @staticmethod
+    def _team(rng: random.Random, team_id: int, win: bool) -> Dict:
+        return {
+            'bans': [{'championId': rng.randint(1, 950), 'pickTurn': turn + (1 if team_id == 100 else 6)}
+                     for turn in range(5)],
+            'objectives': {
+                name: {'first': rng.random() < 0.5, 'kills': rng.randint(0, limit)}
+                for name, limit in (('baron', 2), ('champion', 45), ('dragon', 5), ('horde', 6),
+                                    ('inhibitor', 3), ('riftHerald', 1), ('tower', 11))
+            },
+            'teamId': team_id,
+            'win': win
+        }
+
+    def _item_builds(self, rng: random.Random, positions: List[str],
+                     duration: int) -> Tuple[List[Dict], List[List[int]], List[int]]:
+        """Every participant's item events; returns (events, final items per slot, control wards per slot)"""
+        item_events: List[Dict] = []
+        final_items: List[List[int]] = []
+        control_wards: List[int] = []
+        for slot, position in enumerate(positions):
+            events, items, wards = self._item_events(rng, slot + 1, position, duration)
+            item_events.extend(events)
+            final_items.append(items)
+            control_wards.append(wards)
+        return item_events, final_items, control_wards
+
+    def _timeline_frames(self, rng: random.Random, item_events: List[Dict], duration: int,
+                         winning_team: int) -> List[Dict]:
+        """Per-minute frames holding the item events plus ward, level and kill events"""
+        frame_count = duration * 1000 // FRAME_INTERVAL_MS + 2
+        events_by_frame: List[List[Dict]] = [[] for _ in range(frame_count)]
+        for event in item_events:
+            events_by_frame[min(frame_count - 1, event['timestamp'] // FRAME_INTERVAL_MS + 1)].append(dict(event))
+
+        for frame_index in range(1, frame_count):
+            frame_end = min(frame_index * FRAME_INTERVAL_MS, duration * 1000)
+            for _ in range(rng.randint(2, 9)):
+                timestamp = frame_end - rng.randint(0, FRAME_INTERVAL_MS - 1)
+                events_by_frame[frame_index].append(self._filler_event(rng, max(0, timestamp)))
+
+        frames = []
+        for frame_index, events in enumerate(events_by_frame):
+            timestamp = min(frame_index * FRAME_INTERVAL_MS, duration * 1000 + 500)
+            events.sort(key=lambda event: event['timestamp'])
+            if frame_index == frame_count - 1:
+                events.append({'gameId': 0, 'realTimestamp': 0, 'timestamp': timestamp,
+                               'type': 'GAME_END', 'winningTeam': winning_team})
+            frame = {'events': events, 'timestamp': timestamp}
+            if self.participant_frames:
+                frame['participantFrames'] = {str(pid): self._participant_frame(rng, pid, frame_index)
+                                              for pid in range(1, 11)}
+            frames.append(frame)
+        return frames
+
+    @staticmethod
+    def _item_events(rng: random.Random, pid: int, position: str, duration: int) -> Tuple[List[Dict], List[int], int]:
+        """One participant's shopping: starter, boots, components into legendaries, wards, undos and sells"""
+        events = []
+        inventory: List[int] = []
+        control_wards = 0
+
+        def purchase(timestamp: int, item_id: int) -> None:
+            events.append({'itemId': item_id, 'participantId': pid, 'timestamp': timestamp, 'type': 'ITEM_PURCHASED'})
+            inventory.append(item_id)
+
+        def remove(timestamp: int, item_id: int, event_type: str) -> None:
+            events.append({'itemId': item_id, 'participantId': pid, 'timestamp': timestamp, 'type': event_type})
+            if item_id in inventory:
+                inventory.remove(item_id)
+
+        # Fountain purchases in the first seconds
+        starter = rng.choice(STARTER_ITEMS[position])
+        purchase(rng.randint(1000, 9000), starter)
+        purchase(rng.randint(9000, 12000), POTION)
+        trinket = rng.choice(TRINKETS[:2])
+        purchase(rng.randint(12000, 15000), trinket)
+
+        timestamp = rng.randint(150000, 240000)
+        end = duration * 1000
+
+        if rng.random() < 0.3:
+            # Bought then undone on the first back
+            mistake = rng.choice([BOOTS, 1036, 1052, 1042])
+            purchase(timestamp, mistake)
+            events.append({'afterId': 0, 'beforeId': mistake, 'goldGain': 300, 'participantId': pid,
+                           'timestamp': timestamp + rng.randint(500, 4000), 'type': 'ITEM_UNDO'})
+            inventory.remove(mistake)
+
+        remove(timestamp - rng.randint(30000, 120000), POTION, 'ITEM_DESTROYED')
+        purchase(timestamp, BOOTS)
+
+        legendaries = list(LEGENDARIES[position].items())
+        rng.shuffle(legendaries)
+        boots_upgraded = False
+        for legendary, components in legendaries:
+            timestamp += rng.randint(150000, 330000)
+            if timestamp >= end:
+                break
+            for component in components:
+                purchase(timestamp, component)
+                timestamp += rng.randint(1000, 3000)
+            if rng.random() < 0.5:
+                control_wards += 1
+                purchase(timestamp, CONTROL_WARD)
+                remove(timestamp + rng.randint(20000, 90000), CONTROL_WARD, 'ITEM_DESTROYED')
+
+            timestamp += rng.randint(90000, 200000)
+            if timestamp >= end:
+                break
+            for component in components:
+                remove(timestamp, component, 'ITEM_DESTROYED')
+            purchase(timestamp, legendary)
+
+            if not boots_upgraded and BOOTS in inventory:
+                timestamp += rng.randint(60000, 150000)
+                if timestamp >= end:
+                    break
+                remove(timestamp, BOOTS, 'ITEM_DESTROYED')
+                purchase(timestamp, rng.choice(UPGRADED_BOOTS))
+                boots_upgraded = True
+
+            if starter in inventory and len(inventory) >= 6:
+                remove(timestamp + rng.randint(1000, 3000), starter, 'ITEM_SOLD')
+
+        if trinket == TRINKETS[0] and rng.random() < 0.4 and end > 20 * 60000:
+            timestamp = rng.randint(15 * 60000, end)
+            remove(timestamp, trinket, 'ITEM_DESTROYED')
+            trinket = TRINKETS[2]
+            purchase(timestamp, trinket)
+
+        events = [event for event in events if event['timestamp'] < end]
+        shop = [item for item in inventory if item not in TRINKETS and item != CONTROL_WARD]
+        return events, shop[:6] + [trinket], control_wards
+
+    @staticmethod
+    def _filler_event(rng: random.Random, timestamp: int) -> Dict:
+        """A non-item event, so item events sit among the noise real timelines carry"""
+        pid = rng.randint(1, 10)
+        kind = rng.random()
+        if kind < 0.35:
+            return {'creatorId': pid, 'timestamp': timestamp, 'type': 'WARD_PLACED', 'wardType': 'YELLOW_TRINKET'}
+        if kind < 0.6:
+            return {'levelUpType': 'NORMAL', 'participantId': pid, 'skillSlot': rng.randint(1, 4),
+                    'timestamp': timestamp, 'type': 'SKILL_LEVEL_UP'}
+        if kind < 0.75:
+            return {'level': rng.randint(2, 18), 'participantId': pid, 'timestamp': timestamp, 'type': 'LEVEL_UP'}
+        victim = rng.choice([other for other in range(1, 11) if (other <= 5) != (pid <= 5)])
+        return {
+            'assistingParticipantIds': rng.sample([o for o in range(1, 11) if (o <= 5) == (pid <= 5) and o != pid],
+                                                  rng.randint(0, 3)),
+            'bounty': 300, 'killStreakLength': rng.randint(0, 4), 'killerId': pid,
+            'position': {'x': rng.randint(0, 14800), 'y': rng.randint(0, 14800)},
+            'shutdownBounty': 0, 'timestamp': timestamp, 'type': 'CHAMPION_KILL', 'victimId': victim
+        }
+
+    @staticmethod
+    def _participant_frame(rng: random.Random, pid: int, frame_index: int) -> Dict:
+        """Per-minute participant snapshot (bulk of a real timeline's size)"""
+        minute = frame_index
+        return {
+            'championStats': {
+                'abilityHaste': rng.randint(0, 60), 'abilityPower': rng.randint(0, 400), 'armor': 30 + minute * 3,
+                'armorPen': 0, 'armorPenPercent': 0, 'attackDamage': 60 + minute * 4, 'attackSpeed': 100 + minute * 3,
+                'bonusArmorPenPercent': 0, 'bonusMagicPenPercent': 0, 'ccReduction': 0, 'cooldownReduction': 0,
+                'health': 600 + minute * 90, 'healthMax': 600 + minute * 90, 'healthRegen': 8 + minute,
+                'lifesteal': 0, 'magicPen': 0, 'magicPenPercent': 0, 'magicResist': 30 + minute,
+                'movementSpeed': 345 + rng.randint(0, 60), 'omnivamp': 0, 'physicalVamp': 0,
+                'power': 300 + minute * 20, 'powerMax': 300 + minute * 20, 'powerRegen': 7, 'spellVamp': 0
+            },
+            'currentGold': rng.randint(0, 1500),
+            'damageStats': {
+                'magicDamageDone': minute * rng.randint(200, 900), 'magicDamageDoneToChampions': minute * rng.randint(50, 400),
+                'magicDamageTaken': minute * rng.randint(50, 400), 'physicalDamageDone': minute * rng.randint(200, 900),
+                'physicalDamageDoneToChampions': minute * rng.randint(50, 400),
+                'physicalDamageTaken': minute * rng.randint(50, 400), 'totalDamageDone': minute * rng.randint(400, 1800),
+                'totalDamageDoneToChampions': minute * rng.randint(100, 800), 'totalDamageTaken': minute * rng.randint(100, 800),
+                'trueDamageDone': minute * rng.randint(0, 100), 'trueDamageDoneToChampions': minute * rng.randint(0, 50),
+                'trueDamageTaken': minute * rng.randint(0, 50)
+            },
+            'goldPerSecond': 0 if minute == 0 else 20,
+            'jungleMinionsKilled': minute * rng.randint(0, 5),
+            'level': min(18, 1 + minute // 2),
+            'minionsKilled': minute * rng.randint(0, 8),
+            'participantId': pid,
+            'position': {'x': rng.randint(0, 14800), 'y': rng.randint(0, 14800)},
+            'timeEnemySpentControlled': minute * rng.randint(0, 2000),
+            'totalGold': 500 + minute * rng.randint(250, 450),
+            'xp': minute * rng.randint(300, 700)
+        }
+
+
+class SyntheticPlayer:
+    """One generated player: account, summoner, league entries and match schedule"""
+
+    def __init__(self, factory: SyntheticMatchFactory, index: int, match_count: int,
+                 game_name: Optional[str] = None, tag_line: str = 'SYN'):
+        rng = random.Random(stable_seed(factory.seed, 'player', index))
+        self.factory = factory
+        self.index = index
+        self.game_name = game_name or f"Synthetic{index}"
+        self.tag_line = tag_line
+        self.puuid = synthetic_puuid(factory.seed, f"player:{index}")
+        self.summoner_level = rng.randint(30, 900)
+        self.profile_icon_id = rng.randint(1, 6000)
+        self.slot = rng.randrange(10)  # Same seat every game keeps the player's role consistent
+        self.schedule = factory.match_schedule(index, match_count)
+        self._created = dict(self.schedule)
+        tier = rng.choice(TIERS)
+        wins = rng.randint(20, 300)
+        self.league_entries = [{
+            'freshBlood': False, 'hotStreak': rng.random() < 0.1, 'inactive': False,
+            'leagueId': hashlib.md5(f"{factory.seed}|league|{index}".encode('utf-8')).hexdigest(),
+            'leaguePoints': rng.randint(0, 99), 'losses': wins + rng.randint(-20, 20), 'puuid': self.puuid,
+            'queueType': 'RANKED_SOLO_5x5', 'rank': rng.choice(DIVISIONS), 'tier': tier, 'veteran': False,
+            'wins': wins
+        }]
+
+    @property
+    def riot_id(self) -> str:
+        return f"{self.game_name}#{self.tag_line}"
+
+    def account(self) -> Dict:
+        return {'puuid': self.puuid, 'gameName': self.game_name, 'tagLine': self.tag_line}
+
+    def summoner(self) -> Dict:
+        return {
+            'puuid': self.puuid,
+            'profileIconId': self.profile_icon_id,
+            'revisionDate': self.factory.anchor_ms,
+            'summonerLevel': self.summoner_level
+        }
+
+    def match_ids(self) -> List[str]:
+        return [match_id for match_id, _ in self.schedule]
+
+    def match_and_timeline(self, match_id: str, timeline: bool = True) -> Tuple[Dict, Optional[Dict]]:
+        return self.factory.match_and_timeline(match_id, self.puuid, self._created[match_id], self.slot, timeline)
+
+    def iter_matches(self, timelines: str = 'paged') -> Iterator[Dict]:
+        """Matches newest first, in the order RiotAPIClient.iter_matches yields them
+
+        timelines: 'paged' attaches a timeline to the first 10 matches of every 100
+        (the fetch budget the app uses), 'all' to every match, 'none' to none.
+        Timelines are attached unpruned.
+        """
+        for index, (match_id, game_creation) in enumerate(self.schedule):
+            wanted = timelines == 'all' or (timelines == 'paged' and index % 100 < 10)
+            match, timeline = self.factory.match_and_timeline(match_id, self.puuid, game_creation, self.slot, wanted)
+            if wanted:
+                match['timeline'] = timeline
+            yield match
+
+
+def synthetic_players(seed: int = 1, players: int = 10, matches_per_player: int = 100,
+                      platform: str = 'na1', anchor_ms: Optional[int] = None,
+                      participant_frames: bool = True) -> List[SyntheticPlayer]:
+    """Players Synthetic0#SYN .. Synthetic{n-1}#SYN sharing one factory"""
+    factory = SyntheticMatchFactory(seed, platform, anchor_ms, participant_frames)
+    return [SyntheticPlayer(factory, index, matches_per_player) for index in range(players)]
+
+
+def anchor_for(year: int) -> int:
+    """Fixed anchor (end of the given year, UTC) so benchmark payloads don't drift with the clock"""
+    return int((datetime(year + 1, 1, 1, tzinfo=timezone.utc) - timedelta(hours=1)).timestamp() * 1000)
@@ -0,0 +1,175 @@
+"""
+In-memory caches for computed results
+Bounded, thread-safe and time-limited, for data that is expensive to rebuild but may go stale,
+plus single-flight coalescing so concurrent callers share one computation
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after ttl_seconds
+
+    Once max_entries is reached, the least recently used entry is evicted. A
+    per-entry TTL can be given to set() for values that should expire sooner
+    (e.g. negative lookups).
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value (marking it as recently used), or default if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] > time.monotonic()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+class LeaderAbandoned(Exception):
+    """Raised to followers when the leader stopped without a result (e.g. its client disconnected)
+
+    Followers can recover by running the computation themselves.
+    """
+
+
+class InFlightCall:
+    """One in-progress computation that followers can wait on"""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self._result: Any = None
+        self._error: Optional[BaseException] = None
+        self.followers = 0
+
+    def resolve(self, result: Any) -> None:
+        self._result = result
+        self._done.set()
+
+    def reject(self, error: BaseException) -> None:
+        self._error = error
+        self._done.set()
+
+    def wait(self, timeout: Optional[float] = None) -> Any:
+        """Block until the leader finishes; returns its result or re-raises its exception"""
+        if not self._done.wait(timeout):
+            raise TimeoutError('Timed out waiting for in-flight call')
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one execution
+
+    The first caller for a key (the leader) runs the computation; callers arriving
+    while it is in flight wait and receive the same result or exception. Nothing is
+    kept once the call finishes, so pair it with a cache for reuse over time.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, InFlightCall] = {}
+        self._lock = threading.Lock()
+
+    def begin(self, key: Hashable) -> Tuple[InFlightCall, bool]:
+        """Join the call in flight for key, or start one; returns (call, is_leader)
+
+        A leader must call finish() exactly once, even on failure.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.followers += 1
+                return call, False
+            call = self._calls[key] = InFlightCall()
+            return call, True
+
+    def finish(self, key: Hashable, call: InFlightCall, result: Any = None,
+               error: Optional[BaseException] = None) -> None:
+        """Publish the leader's outcome to its followers and forget the key
+
+        A BaseException that is not an Exception (GeneratorExit, KeyboardInterrupt, ...)
+        belongs to the leader's own thread or generator; followers get LeaderAbandoned instead.
+        """
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        if error is not None and not isinstance(error, Exception):
+            error = LeaderAbandoned(f"In-flight call abandoned by its leader ({type(error).__name__})")
+        if error is not None:
+            call.reject(error)
+        else:
+            call.resolve(result)
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) unless a call for key is already in flight, in which case wait for it"""
+        call, leader = self.begin(key)
+        if not leader:
+            return call.wait()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self.finish(key, call, error=e)
+            raise
+        self.finish(key, call, result)
+        return result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
@@ -7,20 +7,99 @@ import axios from 'axios';
 
 const API_BASE_URL = 'http://localhost:5000';
 
+const JOB_POLL_INTERVAL_MS = 1500;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+/**
+ * Get the status of a background job
+ * @param {string} jobId - Job ID returned by /api/analyze
+ * @returns {Promise} - Job status, stage, progress and (when finished) result or error
+ */
+export const getJobStatus = async (jobId) => {
+  try {
+    const response = await axios.get(`${API_BASE_URL}/api/jobs/${jobId}`);
+    return response.data;
+  } catch (error) {
+    throw error.response?.data || error;
+  }
+};
+
 /**
  * Analyze a player and get full year-in-review
+ * Starts a background job and polls it until the analysis finishes
  * @param {string} riotId - Riot ID in format "GameName#TAG"
+ * @param {function} onProgress - Optional callback receiving the job status on each poll
+ * @param {string} region - Optional platform such as "euw1" or "kr" (server default: na1)
  * @returns {Promise} - Player data, stats, and AI insights
  */
-export const analyzePlayer = async (riotId) => {
+export const analyzePlayer = async (riotId, onProgress, region) => {
+  let jobId;
   try {
     const response = await axios.post(`${API_BASE_URL}/api/analyze`, {
-      riotId: riotId
+      riotId: riotId,
+      region: region
     });
-    return response.data;
+    jobId = response.data.data.jobId;
+  } catch (error) {
+    throw error.response?.data || error;
+  }
+
+  while (true) {
+    const { data: job } = await getJobStatus(jobId);
+    if (onProgress) {
+      onProgress(job);
+    }
+
+    if (job.status === 'succeeded') {
+      return { success: true, data: job.result };
+    }
+    if (job.status === 'failed') {
+      throw { success: false, error: job.error };
+    }
+
+    await sleep(JOB_POLL_INTERVAL_MS);
+  }
+};
+
+/**
+ * Analyze a player, following the job over Server-Sent Events
+ * Stage/progress updates arrive while matches are fetched, then the coaching text streams in as it is written
+ * @param {string} riotId - Riot ID in format "GameName#TAG"
+ * @param {object} handlers - Optional { onStage, onProgress, onInsight } callbacks
+ * @param {string} region - Optional platform such as "euw1" or "kr" (server default: na1)
+ * @returns {Promise} - Player data, stats, and AI insights (same shape as analyzePlayer)
+ */
+export const streamAnalysis = async (riotId, { onStage, onProgress, onInsight } = {}, region) => {
+  let jobId;
+  try {
+    const response = await axios.post(`${API_BASE_URL}/api/analyze`, {
+      riotId: riotId,
+      region: region
+    });
+    jobId = response.data.data.jobId;
   } catch (error) {
     throw error.response?.data || error;
   }
+
+  return new Promise((resolve, reject) => {
+    const source = new EventSource(`${API_BASE_URL}/api/jobs/${jobId}/events`);
+
+    source.addEventListener('stage', (e) => onStage && onStage(JSON.parse(e.data).stage));
+    source.addEventListener('progress', (e) => onProgress && onProgress(JSON.parse(e.data)));
+    source.addEventListener('insight', (e) => onInsight && onInsight(JSON.parse(e.data).text));
+    source.addEventListener('result', (e) => {
+      source.close();
+      resolve({ success: true, data: JSON.parse(e.data) });
+    });
+    source.addEventListener('error', (e) => {
+      // Server-sent 'error' events carry data; connection errors do not (EventSource retries those itself)
+      if (e.data) {
+        source.close();
+        reject({ success: false, error: JSON.parse(e.data).error });
+      }
+    });
+  });
 };
 
 /**
@@ -40,11 +119,26 @@ export const getPlayerInfo = async (riotId) => {
 /**
  * Get player statistics without AI insights
  * @param {string} riotId - Riot ID in format "GameName#TAG"
- * @returns {Promise} - Player stats
+ * @param {object} options - Optional { fields: [keys], limit, cursor } to trim the payload and page per-match arrays,
+ *                           and region (e.g. "euw1"; server default: na1)
+ * @returns {Promise} - Player stats (plus data.page when paging)
  */
-export const getPlayerStats = async (riotId) => {
+export const getPlayerStats = async (riotId, { fields, limit, cursor, region } = {}) => {
   try {
-    const response = await axios.get(`${API_BASE_URL}/api/stats/${riotId}`);
+    const params = {};
+    if (region) {
+      params.region = region;
+    }
+    if (fields) {
+      params.fields = fields.join(',');
+    }
+    if (limit) {
+      params.limit = limit;
+    }
+    if (cursor) {
+      params.cursor = cursor;
+    }
+    const response = await axios.get(`${API_BASE_URL}/api/stats/${riotId}`, { params });
     return response.data;
   } catch (error) {
     throw error.response?.data || error;
@@ -96,3 +190,56 @@ export const sendChatMessage = async (message, playerData, conversationHistory =
     throw error.response?.data || error;
   }
 };
+
+/**
+ * Send a chat message to the AI coach, receiving the reply as it is generated
+ * @param {string} message - User's message
+ * @param {object} playerData - Player data including stats and insights
+ * @param {array} conversationHistory - Previous conversation messages
+ * @param {function} onToken - Callback receiving each chunk of the reply
+ * @returns {Promise} - AI coach response (same shape as sendChatMessage)
+ */
+export const streamChatMessage = async (message, playerData, conversationHistory = [], onToken) => {
+  // EventSource only supports GET, so read the SSE stream from fetch directly
+  const response = await fetch(`${API_BASE_URL}/api/chat/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ message, playerData, conversationHistory })
+  });
+
+  if (!response.ok) {
+    throw await response.json().catch(() => ({ success: false, error: response.statusText }));
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) {
+      break;
+    }
+    buffer += decoder.decode(value, { stream: true });
+
+    // Messages are separated by a blank line
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const raw = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      const event = raw.match(/^event: (.*)$/m)?.[1];
+      const data = raw.match(/^data: (.*)$/m)?.[1];
+      if (!data) {
+        continue;
+      }
+      if (event === 'token' && onToken) {
+        onToken(JSON.parse(data).text);
+      } else if (event === 'done') {
+        return { success: true, data: JSON.parse(data) };
+      }
+    }
+  }
+
+  throw { success: false, error: 'Chat stream ended unexpectedly' };
+};
@@ -0,0 +1,107 @@
+"""
+Item ID -> name catalog served by /api/items
+Loaded once and kept pre-serialized; items.json only changes on deploys, so it is
+re-read only when its modification time changes
+"""
+
+import os
+import gzip
+import json
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # Optional; gzip only
+    brotli = None
+
+
+class ItemCatalog:
+    """Normalized item mapping plus its serialized response body and strong ETag
+
+    Compressed copies of the body are built once per encoding (at the highest
+    level, since they are reused) and carry their own strong ETag.
+    """
+
+    # Content-Encodings current() can serve, most preferred first
+    ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or os.getenv('ITEMS_PATH', 'items.json'))
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self.mapping: Dict[str, str] = {}
+        self.body = b''
+        self.etag = ''
+        self._encoded: Dict[str, Tuple[bytes, str]] = {}  # encoding -> (body, etag)
+        self._reload_if_changed()
+
+    @staticmethod
+    def normalize(raw) -> Dict[str, str]:
+        """Return an id (string) -> name mapping from either items.json schema"""
+        # items.json has stored both name -> id and id -> name over time
+        if not isinstance(raw, dict) or not raw:
+            return {}
+
+        # Detect schema: if keys look numeric, assume it's already id->name
+        sample_key = next(iter(raw.keys()))
+        if isinstance(sample_key, str) and sample_key.isdigit():
+            # Normalize keys to strings just in case
+            return {str(k): v for k, v in raw.items()}
+
+        # Reverse mapping name->id to id->name
+        reversed_map = {}
+        for name, item_id in raw.items():
+            try:
+                key = str(int(item_id))  # normalize numeric ids
+            except Exception:
+                key = str(item_id)
+            # Last write wins if duplicates
+            reversed_map[key] = name
+        return reversed_map
+
+    def _reload_if_changed(self) -> None:
+        try:
+            mtime = self.path.stat().st_mtime
+        except FileNotFoundError:
+            mtime = None
+
+        with self._lock:
+            if self.body and mtime == self._mtime:
+                return
+
+            if mtime is None:
+                mapping = {}
+            else:
+                with self.path.open('r', encoding='utf-8') as f:
+                    mapping = self.normalize(json.load(f))
+
+            body = json.dumps({'success': True, 'data': mapping}, separators=(',', ':')).encode('utf-8')
+            self.mapping = mapping
+            self.body = body
+            self.etag = hashlib.sha256(body).hexdigest()[:32]
+            self._encoded = {}
+            self._mtime = mtime
+
+    @staticmethod
+    def _encode(body: bytes, encoding: str) -> bytes:
+        if encoding == 'br':
+            return brotli.compress(body, quality=11)
+        if encoding == 'gzip':
+            return gzip.compress(body, compresslevel=9, mtime=0)
+        raise ValueError(f"Unsupported encoding: {encoding}")
+
+    def current(self, encoding: Optional[str] = None) -> Tuple[bytes, str]:
+        """Serialized response body and its ETag, reloading first if the file changed
+
+        With an encoding from ENCODINGS, the compressed body and an ETag naming it.
+        """
+        self._reload_if_changed()
+        with self._lock:
+            if encoding is None:
+                return self.body, self.etag
+            if encoding not in self._encoded:
+                self._encoded[encoding] = (self._encode(self.body, encoding), f"{self.etag}-{encoding}")
+            return self._encoded[encoding]
@@ -0,0 +1,164 @@
+"""
+Background jobs for long-running analyses
+Lets the API hand back a job ID immediately while a worker pool runs the pipeline,
+and records each job's events so clients can follow it over Server-Sent Events
+"""
+
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class Job:
+    """State of one background analysis, safe to update from the worker thread
+
+    Every state change is also appended to an event log (stage, progress, insight
+    tokens, result/error) that readers can replay from any position and block on
+    for new entries.
+    """
+
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = 'queued'  # queued -> running -> succeeded | failed
+        self.stage = 'queued'
+        self.progress = {'matches_fetched': 0, 'matches_total': None}
+        self.result: Optional[Any] = None
+        self.error: Optional[str] = None
+        self.error_status = 500  # HTTP status to report for failures (e.g. 404 for unknown players)
+        self.etag: Optional[str] = None  # Set by the job function to validate the finished result
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self._events: List[Tuple[str, Dict]] = []
+        self._changed = threading.Condition(threading.Lock())
+
+    def _record(self, event: str, data: Dict) -> None:
+        """Append to the event log and wake readers (lock held)"""
+        self.updated_at = time.time()
+        self._events.append((event, data))
+        self._changed.notify_all()
+
+    def start(self) -> None:
+        with self._changed:
+            self.status = 'running'
+            self.stage = 'starting'
+            self._record('stage', {'stage': self.stage})
+
+    def set_stage(self, stage: str) -> None:
+        with self._changed:
+            self.stage = stage
+            self._record('stage', {'stage': stage})
+
+    def set_progress(self, fetched: int, total: Optional[int]) -> None:
+        with self._changed:
+            self.progress = {'matches_fetched': fetched, 'matches_total': total}
+            self._record('progress', dict(self.progress))
+
+    def emit(self, event: str, data: Dict) -> None:
+        """Record a custom event, e.g. a chunk of streamed insight text"""
+        with self._changed:
+            self._record(event, data)
+
+    def succeed(self, result: Any) -> None:
+        with self._changed:
+            self.result = result
+            self.status = 'succeeded'
+            self.stage = 'done'
+            self._record('result', result)
+
+    def fail(self, error: str, status: int = 500) -> None:
+        with self._changed:
+            self.error = error
+            self.error_status = status
+            self.status = 'failed'
+            self._record('error', {'error': error, 'errorStatus': status})
+
+    def wait_for_events(self, after: int, timeout: float) -> List[Tuple[int, str, Dict]]:
+        """Events with index >= after as (index, event, data), waiting up to timeout for one to arrive
+
+        An empty list means the timeout passed with nothing new (or the job is finished
+        and every event has been read).
+        """
+        with self._changed:
+            if after >= len(self._events) and not self.finished:
+                self._changed.wait(timeout)
+            return [(index, event, data) for index, (event, data) in enumerate(self._events[after:], start=after)]
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ('succeeded', 'failed')
+
+    def to_dict(self) -> Dict:
+        with self._changed:
+            data = {
+                'jobId': self.id,
+                'kind': self.kind,
+                'status': self.status,
+                'stage': self.stage,
+                'progress': dict(self.progress),
+                'createdAt': self.created_at,
+                'updatedAt': self.updated_at
+            }
+            if self.status == 'succeeded':
+                data['result'] = self.result
+            elif self.status == 'failed':
+                data['error'] = self.error
+                data['errorStatus'] = self.error_status
+            return data
+
+
+class JobFailed(Exception):
+    """Raised inside a job function to fail the job with a specific HTTP status"""
+
+    def __init__(self, message: str, status: int = 500):
+        super().__init__(message)
+        self.status = status
+
+
+class JobManager:
+    """Runs job functions on a thread pool and keeps finished jobs around for polling"""
+
+    def __init__(self, max_workers: Optional[int] = None, ttl_seconds: Optional[int] = None):
+        self.max_workers = max_workers or int(os.getenv('JOB_WORKERS', '4'))
+        self.ttl_seconds = ttl_seconds or int(os.getenv('JOB_TTL_SECONDS', '3600'))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='rift-job')
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, fn: Callable[..., Any], *args, **kwargs) -> Job:
+        """Queue fn(job, *args, **kwargs); its return value becomes the job result"""
+        self._expire()
+        job = Job(kind)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    @staticmethod
+    def _run(job: Job, fn: Callable[..., Any], args, kwargs) -> None:
+        job.start()
+        try:
+            job.succeed(fn(job, *args, **kwargs))
+        except JobFailed as e:
+            job.fail(str(e), e.status)
+        except Exception as e:
+            print(f"Job {job.id} failed: {e}")
+            job.fail(str(e))
+        finally:
+            if not job.finished:
+                # A BaseException (e.g. SystemExit) got past the handlers; never leave the job running
+                job.fail('Job was interrupted')
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _expire(self) -> None:
+        """Forget finished jobs older than the TTL"""
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            for job_id in [job_id for job_id, job in self._jobs.items() if job.finished and job.updated_at < cutoff]:
+                del self._jobs[job_id]
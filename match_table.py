@@ -0,0 +1,111 @@
+"""
+Columnar match table for vectorized stats aggregation
+Flattens a player's per-match rows into NumPy columns so totals and group-bys run in C
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class MatchTable:
+    """NumPy column arrays built from PlayerStatsAggregate rows (one entry per match)
+
+    Numeric fields become int64 (or float64 if any value is fractional) columns;
+    categorical fields such as champion, role and month are dictionary-encoded with
+    labels in first-appearance order, so grouped results keep the order a
+    row-by-row pass would produce.
+    """
+
+    def __init__(self, rows: Sequence[Dict], numeric_fields: Iterable[str], categorical_fields: Iterable[str]):
+        self.size = len(rows)
+        self.columns: Dict[str, np.ndarray] = {}
+        self.codes: Dict[str, np.ndarray] = {}
+        self.labels: Dict[str, List] = {}
+
+        for field in numeric_fields:
+            self.columns[field] = self._numeric_column([row[field] for row in rows])
+        for field in categorical_fields:
+            self.codes[field], self.labels[field] = self._encode([row[field] for row in rows])
+
+    @staticmethod
+    def _numeric_column(values: List) -> np.ndarray:
+        if not values:
+            return np.zeros(0, dtype=np.int64)
+        column = np.asarray(values)
+        if column.dtype == bool:
+            column = column.astype(np.int64)
+        return column
+
+    @staticmethod
+    def _encode(values: List) -> Tuple[np.ndarray, List]:
+        """Dictionary-encode values; None becomes code -1 and is left out of every group"""
+        present = np.array([value is not None for value in values], dtype=bool)
+        codes = np.full(len(values), -1, dtype=np.int64)
+        if not present.any():
+            return codes, []
+
+        kept = np.array([value for value in values if value is not None], dtype=object)
+        uniques, first_index, inverse = np.unique(kept.astype(str), return_index=True, return_inverse=True)
+
+        # Reorder labels by first appearance instead of sort order
+        order = np.argsort(first_index, kind='stable')
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        codes[present] = rank[inverse.reshape(-1)]
+        labels = [kept[first_index[i]] for i in order]
+        return codes, labels
+
+    def column(self, field: str) -> np.ndarray:
+        return self.columns[field]
+
+    def total(self, field: str):
+        """Column sum as a plain Python number"""
+        column = self.columns[field]
+        if column.size == 0:
+            return 0
+        return column.sum().item()
+
+    def totals(self, fields: Iterable[str]) -> Dict[str, float]:
+        return {field: self.total(field) for field in fields}
+
+    def group_count(self, key: str) -> Dict:
+        """Rows per label of a categorical field"""
+        codes = self.codes[key]
+        labels = self.labels[key]
+        counts = np.bincount(codes[codes >= 0], minlength=len(labels))
+        return {label: int(count) for label, count in zip(labels, counts) if count > 0}
+
+    def group_sums(self, key: str, fields: Iterable[str]) -> Dict:
+        """Per-label sums of numeric fields: {label: {field: sum}}"""
+        codes = self.codes[key]
+        labels = self.labels[key]
+        mask = codes >= 0
+        grouped = {label: {} for label in labels}
+
+        for field in fields:
+            column = self.columns[field]
+            sums = np.bincount(codes[mask], weights=column[mask], minlength=len(labels))
+            integral = np.issubdtype(column.dtype, np.integer)
+            for label, value in zip(labels, sums):
+                grouped[label][field] = int(round(value)) if integral else float(value)
+
+        return grouped
+
+    @staticmethod
+    def item_counts(item_lists: Sequence[Sequence[int]]) -> Dict[str, int]:
+        """Occurrences of each item ID across matches, keyed by string ID in first-appearance order"""
+        flat = np.fromiter((item_id for items in item_lists for item_id in items), dtype=np.int64)
+        if flat.size == 0:
+            return {}
+        uniques, first_index, counts = np.unique(flat, return_index=True, return_counts=True)
+        order = np.argsort(first_index, kind='stable')
+        return {str(int(uniques[i])): int(counts[i]) for i in order}
+
+    def ratio(self, numerator: str, denominator: str, scale: float = 1.0,
+              where: Optional[np.ndarray] = None) -> np.ndarray:
+        """numerator / denominator * scale for rows where the mask holds (default: denominator > 0)"""
+        num = self.columns[numerator]
+        den = self.columns[denominator]
+        mask = den > 0 if where is None else where
+        return (num[mask] / den[mask]) * scale
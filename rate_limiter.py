@@ -0,0 +1,224 @@
+"""
+Header-driven rate limiting for the Riot API
+Keeps one bucket per rate-limit window (application-wide and per method) and sizes
+them from the X-App-Rate-Limit / X-Method-Rate-Limit response headers
+"""
+
+import os
+import time
+import asyncio
+import threading
+from collections import deque
+from typing import Dict, List, Mapping, Optional, Tuple
+
+
+def parse_rate_limit_header(value: Optional[str]) -> List[Tuple[int, int]]:
+    """Parse a Riot rate-limit header such as '20:1,100:120' into [(20, 1), (100, 120)]
+
+    The same format is used for limits (limit:window) and counts (count:window).
+    """
+    pairs = []
+    if not value:
+        return pairs
+
+    for part in value.split(','):
+        try:
+            first, window = part.strip().split(':')
+            pairs.append((int(first), int(window)))
+        except ValueError:
+            continue
+    return pairs
+
+
+class WindowBucket:
+    """Request tokens for a single rate-limit window
+
+    A spent token is returned `window` seconds after it was spent, so no interval of
+    that length ever sees more than `limit` requests. This is what keeps us inside
+    Riot's fixed windows, which start at whatever moment the first request lands.
+    """
+
+    def __init__(self, limit: int, window: int, margin: float = 0.05):
+        self.limit = limit
+        self.window = window
+        self.margin = margin  # Slack for clock skew between us and Riot
+        self._spent = deque()
+
+    def _expire(self, now: float) -> None:
+        horizon = now - self.window - self.margin
+        while self._spent and self._spent[0] <= horizon:
+            self._spent.popleft()
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a token is available (0 if one is available now)"""
+        self._expire(now)
+        if len(self._spent) < self.limit:
+            return 0.0
+        return self._spent[0] + self.window + self.margin - now
+
+    def consume(self, now: float) -> None:
+        self._spent.append(now)
+
+    def sync_count(self, count: int, now: float) -> None:
+        """Reconcile with the server's count for this window
+
+        Riot counts every request made with the key (other workers included), so if it
+        reports more than we tracked, the difference is recorded as spent now.
+        """
+        self._expire(now)
+        for _ in range(count - len(self._spent)):
+            self._spent.append(now)
+
+    @property
+    def in_use(self) -> int:
+        return len(self._spent)
+
+
+class RateLimiter:
+    """Schedules Riot API calls right up to the key's application and method limits
+
+    Method limits are learned from response headers the first time each method is
+    called; application limits start from RIOT_APP_RATE_LIMIT (development key
+    defaults) and are corrected from headers as well.
+    """
+
+    DEFAULT_APP_LIMITS = '20:1,100:120'
+    DEFAULT_RETRY_AFTER = 1
+
+    def __init__(self, app_limits: Optional[str] = None):
+        self._lock = threading.Lock()
+        limits = parse_rate_limit_header(app_limits or os.getenv('RIOT_APP_RATE_LIMIT', self.DEFAULT_APP_LIMITS))
+        self._app_buckets: Dict[int, WindowBucket] = {window: WindowBucket(limit, window) for limit, window in limits}
+        self._method_buckets: Dict[str, Dict[int, WindowBucket]] = {}
+
+        # Hard back-off after a 429, per scope ('app' or a method name)
+        self._blocked_until: Dict[str, float] = {}
+
+        # Scheduling stats
+        self.requests = 0
+        self.rate_limited = 0
+        self.total_wait = 0.0
+
+    def _buckets_for(self, method: str) -> List[WindowBucket]:
+        return list(self._app_buckets.values()) + list(self._method_buckets.get(method, {}).values())
+
+    def _try_acquire(self, method: str, waited: float) -> float:
+        """Claim a request slot for `method` if every window has room
+
+        Returns 0 on success, otherwise the number of seconds to wait before retrying.
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait = max(
+                self._blocked_until.get('app', 0.0) - now,
+                self._blocked_until.get(method, 0.0) - now,
+                0.0
+            )
+            for bucket in self._buckets_for(method):
+                wait = max(wait, bucket.wait_time(now))
+
+            if wait <= 0:
+                for bucket in self._buckets_for(method):
+                    bucket.consume(now)
+                self.requests += 1
+                self.total_wait += waited
+                return 0.0
+            return wait
+
+    def acquire(self, method: str) -> float:
+        """Block until a request for `method` fits in every window, then claim it
+
+        Returns the number of seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            wait = self._try_acquire(method, waited)
+            if wait <= 0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    async def acquire_async(self, method: str) -> float:
+        """Asyncio version of acquire() that yields to the event loop while waiting"""
+        waited = 0.0
+        while True:
+            wait = self._try_acquire(method, waited)
+            if wait <= 0:
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+
+    @staticmethod
+    def _resize(buckets: Dict[int, WindowBucket], limits: List[Tuple[int, int]]) -> Dict[int, WindowBucket]:
+        """Apply limits from a header, keeping already-spent tokens for known windows"""
+        resized = {}
+        for limit, window in limits:
+            bucket = buckets.get(window) or WindowBucket(limit, window)
+            bucket.limit = limit
+            resized[window] = bucket
+        return resized
+
+    def update_from_headers(self, method: str, headers: Mapping[str, str]) -> None:
+        """Learn limits and current counts from a Riot response"""
+        app_limits = parse_rate_limit_header(headers.get('X-App-Rate-Limit'))
+        method_limits = parse_rate_limit_header(headers.get('X-Method-Rate-Limit'))
+        app_counts = parse_rate_limit_header(headers.get('X-App-Rate-Limit-Count'))
+        method_counts = parse_rate_limit_header(headers.get('X-Method-Rate-Limit-Count'))
+
+        with self._lock:
+            now = time.monotonic()
+            if app_limits:
+                self._app_buckets = self._resize(self._app_buckets, app_limits)
+            if method_limits:
+                self._method_buckets[method] = self._resize(self._method_buckets.get(method, {}), method_limits)
+
+            for count, window in app_counts:
+                if window in self._app_buckets:
+                    self._app_buckets[window].sync_count(count, now)
+            for count, window in method_counts:
+                bucket = self._method_buckets.get(method, {}).get(window)
+                if bucket:
+                    bucket.sync_count(count, now)
+
+    def handle_429(self, method: str, headers: Mapping[str, str]) -> int:
+        """Record a 429 and block the offending scope for Retry-After seconds
+
+        Returns the back-off in seconds.
+        """
+        try:
+            retry_after = int(headers.get('Retry-After', self.DEFAULT_RETRY_AFTER))
+        except (TypeError, ValueError):
+            retry_after = self.DEFAULT_RETRY_AFTER
+
+        # X-Rate-Limit-Type is 'application', 'method' or 'service' (Riot-side load)
+        scope = 'app' if headers.get('X-Rate-Limit-Type') == 'application' else method
+
+        with self._lock:
+            self._blocked_until[scope] = max(self._blocked_until.get(scope, 0.0), time.monotonic() + retry_after)
+            self.rate_limited += 1
+
+        self.update_from_headers(method, headers)
+        return retry_after
+
+    def get_stats(self) -> Dict:
+        """Snapshot of limits, current usage and scheduling totals"""
+        with self._lock:
+            now = time.monotonic()
+            app = {}
+            for window, bucket in self._app_buckets.items():
+                bucket._expire(now)
+                app[f'{window}s'] = {'limit': bucket.limit, 'used': bucket.in_use}
+            methods = {}
+            for method, buckets in self._method_buckets.items():
+                methods[method] = {}
+                for window, bucket in buckets.items():
+                    bucket._expire(now)
+                    methods[method][f'{window}s'] = {'limit': bucket.limit, 'used': bucket.in_use}
+
+            return {
+                'requests': self.requests,
+                'rate_limited': self.rate_limited,
+                'total_wait_seconds': round(self.total_wait, 3),
+                'app': app,
+                'methods': methods
+            }
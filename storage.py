@@ -0,0 +1,320 @@
+"""
+Persistent storage for Riot API data
+Match details and timelines never change once a game has ended, so they are kept on disk keyed by matchId;
+generated LLM responses are kept too, keyed by a hash of the request
+"""
+
+import os
+import gzip
+import json
+import time
+import zlib
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+class MatchStore:
+    """SQLite-backed store for match-v5 match details, keyed by matchId
+
+    Also keeps a per-PUUID index of known match IDs and the newest match seen, so a
+    returning player's history can be refreshed incrementally.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv('MATCH_STORE_PATH', 'match_store.sqlite3')
+        self._lock = threading.Lock()
+
+        # One shared connection guarded by a lock (Flask serves requests from several threads)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS matches ('
+            'match_id TEXT PRIMARY KEY, '
+            'game_creation INTEGER, '
+            'data BLOB NOT NULL)'
+        )
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS player_matches ('
+            'puuid TEXT NOT NULL, '
+            'match_id TEXT NOT NULL, '
+            'game_creation INTEGER NOT NULL, '
+            'PRIMARY KEY (puuid, match_id))'
+        )
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS player_sync ('
+            'puuid TEXT PRIMARY KEY, '
+            'newest_match_id TEXT, '
+            'newest_game_creation INTEGER, '
+            'synced_at REAL)'
+        )
+        self._conn.commit()
+
+    def get(self, match_id: str) -> Optional[Dict]:
+        """Return stored match details, or None if the match is unknown"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT data FROM matches WHERE match_id = ?', (match_id,)
+            ).fetchone()
+
+        if row is None:
+            return None
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, match_id: str, match_data: Dict) -> None:
+        """Store match details (compressed JSON). Existing entries are kept as-is."""
+        game_creation = match_data.get('info', {}).get('gameCreation')
+        blob = zlib.compress(json.dumps(match_data, separators=(',', ':')).encode('utf-8'))
+
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR IGNORE INTO matches (match_id, game_creation, data) VALUES (?, ?, ?)',
+                (match_id, game_creation, blob)
+            )
+            self._conn.commit()
+
+    def get_sync_point(self, puuid: str) -> Optional[Dict]:
+        """Newest match ID and gameCreation (ms) seen for a player, or None if never synced"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT newest_match_id, newest_game_creation, synced_at FROM player_sync WHERE puuid = ?',
+                (puuid,)
+            ).fetchone()
+
+        if row is None:
+            return None
+        return {'match_id': row[0], 'game_creation': row[1], 'synced_at': row[2]}
+
+    def set_sync_point(self, puuid: str, match_id: Optional[str], game_creation: Optional[int]) -> None:
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO player_sync (puuid, newest_match_id, newest_game_creation, synced_at) '
+                'VALUES (?, ?, ?, ?)',
+                (puuid, match_id, game_creation, time.time())
+            )
+            self._conn.commit()
+
+    def add_player_matches(self, puuid: str, entries: List[Tuple[str, int]]) -> None:
+        """Record (match_id, game_creation) pairs in a player's history"""
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO player_matches (puuid, match_id, game_creation) VALUES (?, ?, ?)',
+                [(puuid, match_id, game_creation) for match_id, game_creation in entries]
+            )
+            self._conn.commit()
+
+    def get_player_match_ids(self, puuid: str, since_ms: int = 0) -> List[str]:
+        """Known match IDs for a player created at or after since_ms, newest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT match_id FROM player_matches WHERE puuid = ? AND game_creation >= ? '
+                'ORDER BY game_creation DESC',
+                (puuid, since_ms)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def prune_player_matches(self, puuid: str, before_ms: int) -> int:
+        """Drop a player's history entries older than before_ms; returns how many were removed"""
+        with self._lock:
+            cursor = self._conn.execute(
+                'DELETE FROM player_matches WHERE puuid = ? AND game_creation < ?', (puuid, before_ms)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def __contains__(self, match_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT 1 FROM matches WHERE match_id = ?', (match_id,)
+            ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM matches').fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class TimelineCache:
+    """Size-capped, gzip-compressed on-disk cache for match-v5 timelines with LRU eviction
+
+    Timelines are the largest payloads we fetch, so unlike MatchStore this cache is
+    bounded: once the compressed total exceeds max_bytes, least recently used
+    timelines are evicted.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.path = path or os.getenv('TIMELINE_CACHE_PATH', 'timeline_cache.sqlite3')
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv('TIMELINE_CACHE_MAX_MB', '512')) * 1024 * 1024)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS timelines ('
+            'match_id TEXT PRIMARY KEY, '
+            'size INTEGER NOT NULL, '
+            'last_access REAL NOT NULL, '
+            'data BLOB NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_timelines_last_access ON timelines (last_access)')
+        self._conn.commit()
+
+        self._total_bytes = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM timelines').fetchone()[0]
+
+    def get(self, match_id: str, touch: bool = True) -> Optional[Dict]:
+        """Return a cached timeline (marking it as recently used unless touch is False), or None
+
+        Readers in other processes should pass touch=False so they never take the write lock.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT data FROM timelines WHERE match_id = ?', (match_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            if touch:
+                self._conn.execute(
+                    'UPDATE timelines SET last_access = ? WHERE match_id = ?', (time.time(), match_id)
+                )
+                self._conn.commit()
+
+        return json.loads(gzip.decompress(row[0]))
+
+    def put(self, match_id: str, timeline: Dict) -> None:
+        """Compress and store a timeline, evicting least recently used entries if over the cap"""
+        blob = gzip.compress(json.dumps(timeline, separators=(',', ':')).encode('utf-8'))
+        size = len(blob)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._conn.execute(
+                'SELECT size FROM timelines WHERE match_id = ?', (match_id,)
+            ).fetchone()
+            if old is not None:
+                self._total_bytes -= old[0]
+
+            self._conn.execute(
+                'INSERT OR REPLACE INTO timelines (match_id, size, last_access, data) VALUES (?, ?, ?, ?)',
+                (match_id, size, time.time(), blob)
+            )
+            self._total_bytes += size
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Drop least recently used timelines until the cache fits in max_bytes (lock held)"""
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                'SELECT match_id, size FROM timelines ORDER BY last_access ASC LIMIT 64'
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                break
+            for match_id, size in rows:
+                self._conn.execute('DELETE FROM timelines WHERE match_id = ?', (match_id,))
+                self._total_bytes -= size
+                if self._total_bytes <= self.max_bytes:
+                    break
+
+    @property
+    def total_bytes(self) -> int:
+        """Compressed size of everything currently cached"""
+        return self._total_bytes
+
+    def __contains__(self, match_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT 1 FROM timelines WHERE match_id = ?', (match_id,)
+            ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM timelines').fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class ResponseStore:
+    """SQLite-backed store for generated LLM responses, keyed by request hash
+
+    Entries expire ttl_seconds after they were generated, and the least recently
+    used are dropped once the store holds more than max_entries.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl_seconds: Optional[float] = None,
+                 max_entries: Optional[int] = None):
+        self.path = path or os.getenv('LLM_CACHE_PATH', 'llm_cache.sqlite3')
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv('LLM_CACHE_TTL_SECONDS', '86400'))
+        if max_entries is None:
+            max_entries = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '1024'))
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries  # 0, like a ttl of 0, keeps nothing
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'key TEXT PRIMARY KEY, '
+            'created_at REAL NOT NULL, '
+            'last_access REAL NOT NULL, '
+            'data BLOB NOT NULL)'
+        )
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(responses)')}
+        if 'last_access' not in columns:
+            # Stores written before LRU eviction: start from creation order
+            self._conn.execute('ALTER TABLE responses ADD COLUMN last_access REAL NOT NULL DEFAULT 0')
+            self._conn.execute('UPDATE responses SET last_access = created_at')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_created_at ON responses (created_at)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)')
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a stored response (marking it as recently used), or None if missing or expired"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT data FROM responses WHERE key = ? AND created_at > ?',
+                (key, time.time() - self.ttl_seconds)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE responses SET last_access = ? WHERE key = ?', (time.time(), key))
+            self._conn.commit()
+
+        return zlib.decompress(row[0]).decode('utf-8')
+
+    def put(self, key: str, response: str) -> None:
+        blob = zlib.compress(response.encode('utf-8'))
+
+        with self._lock:
+            now = time.time()
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (key, created_at, last_access, data) VALUES (?, ?, ?, ?)',
+                (key, now, now, blob)
+            )
+            self._conn.execute('DELETE FROM responses WHERE created_at <= ?', (now - self.ttl_seconds,))
+            self._conn.execute(
+                'DELETE FROM responses WHERE key NOT IN '
+                '(SELECT key FROM responses ORDER BY last_access DESC LIMIT ?)',
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,111 @@
+"""
+Shared test fixtures: scratch stores and a local Riot API stand-in
+HTTP-level tests run against benchmarks.fake_riot_server, never the live API.
+"""
+
+import os
+import atexit
+import shutil
+import tempfile
+
+import pytest
+
+# api.py opens its stores at import time; keep them out of the working tree
+_SCRATCH = tempfile.mkdtemp(prefix='rift-rewind-tests-')
+atexit.register(shutil.rmtree, _SCRATCH, ignore_errors=True)
+os.environ['MATCH_STORE_PATH'] = os.path.join(_SCRATCH, 'match_store.sqlite3')
+os.environ['TIMELINE_CACHE_PATH'] = os.path.join(_SCRATCH, 'timeline_cache.sqlite3')
+os.environ['RIOT_API_KEY'] = 'test-key'
+os.environ.pop('LLM_CACHE_PATH', None)
+os.environ.pop('RIOT_API_BASE_URL', None)
+
+from backend import RiotAPIClient, RiotClientPool
+from benchmarks.fake_riot_server import FakeRiotServer, FakeRiotState, SyntheticFixtures
+from cache import TTLCache
+from storage import MatchStore, TimelineCache
+
+# Limits high enough that only tests that ask for throttling see any
+FAKE_APP_LIMIT = '10000:1,100000:120'
+
+
+@pytest.fixture(scope='session')
+def riot_fixtures():
+    """Synthetic players Synthetic0#SYN .. Synthetic3#SYN with 130 matches each (more than a page)"""
+    return SyntheticFixtures(players=4, matches_per_player=130, seed=7)
+
+
+@pytest.fixture(scope='session')
+def riot_server(riot_fixtures):
+    with FakeRiotServer(FakeRiotState(riot_fixtures, app_limit=FAKE_APP_LIMIT)) as server:
+        yield server
+
+
+@pytest.fixture
+def player(riot_fixtures):
+    """A synthetic player whose match schedule tests may shorten; restored afterwards"""
+    player = riot_fixtures.players[0]
+    schedule = list(player.schedule)
+    yield player
+    player.schedule = schedule
+
+
+@pytest.fixture
+def match_store(tmp_path):
+    store = MatchStore(str(tmp_path / 'match_store.sqlite3'))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def timeline_cache(tmp_path):
+    cache = TimelineCache(str(tmp_path / 'timeline_cache.sqlite3'))
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def riot_client(riot_server, match_store, timeline_cache):
+    client = RiotAPIClient('test-key', 'na1', match_store=match_store, timeline_cache=timeline_cache,
+                           base_url_override=riot_server.base_url)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def api(monkeypatch, riot_server, match_store, timeline_cache):
+    """The api module with a fresh client pool (pointed at the fake server) and empty caches"""
+    import api as api_module
+    pool = RiotClientPool('test-key', match_store, timeline_cache, base_url_override=riot_server.base_url)
+    monkeypatch.setattr(api_module, 'riot_pool', pool)
+    monkeypatch.setattr(api_module, 'stats_cache', TTLCache(max_entries=64, ttl_seconds=600))
+    yield api_module
+    pool.close()
+
+
+class StubBedrock:
+    """Stands in for AWSBedrockClient: fixed insight text, no AWS calls"""
+
+    CHUNKS = ['## Your year\n', 'Solid ', 'season.']
+
+    def __init__(self):
+        self.prompts = []
+
+    def stream_insights(self, prompt, max_tokens=4096, temperature=0.7):
+        self.prompts.append(prompt)
+        yield from self.CHUNKS
+
+    def generate_insights(self, prompt, max_tokens=4096, temperature=0.7):
+        return ''.join(self.stream_insights(prompt, max_tokens, temperature))
+
+
+@pytest.fixture
+def bedrock(api, monkeypatch):
+    stub = StubBedrock()
+    monkeypatch.setattr(api, 'bedrock_client', stub)
+    return stub
+
+
+@pytest.fixture
+def client(api):
+    """Flask test client"""
+    return api.app.test_client()
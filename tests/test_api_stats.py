@@ -0,0 +1,109 @@
+"""/api/stats against the fake Riot API"""
+
+import gzip
+import json
+from urllib.parse import quote
+
+import pytest
+
+
+def _url(player, **params):
+    query = '&'.join(f"{key}={value}" for key, value in params.items())
+    return f"/api/stats/{quote(player.riot_id)}" + (f"?{query}" if query else '')
+
+
+def test_etag_revalidates_with_304(client, player):
+    first = client.get(_url(player))
+    assert first.status_code == 200
+    assert first.get_json()['success']
+    etag = first.headers['ETag']
+
+    second = client.get(_url(player), headers={'If-None-Match': etag})
+    assert second.status_code == 304
+    assert second.data == b''
+    assert second.headers['ETag'] == etag
+
+
+def test_incremental_and_cold_bodies_share_etag(api, client, player):
+    full_schedule = list(player.schedule)
+    player.schedule = full_schedule[3:]
+    stale = client.get(_url(player))
+
+    player.schedule = full_schedule
+    incremental = client.get(_url(player), headers={'If-None-Match': stale.headers['ETag']})
+    assert incremental.status_code == 200
+
+    api.stats_cache.clear()
+    cold = client.get(_url(player))
+    assert cold.headers['ETag'] == incremental.headers['ETag']
+    assert cold.get_json() == incremental.get_json()
+
+
+def test_etag_tracks_timeline_coverage(api, client, player):
+    response = client.get(_url(player))
+    entry = api.stats_cache.get(player.puuid)
+    aggregate = entry['aggregate']
+
+    # Same match set, but one row built without its timeline (e.g. a failed timeline fetch)
+    fingerprint = aggregate.fingerprint()
+    aggregate.drop_timeline(player.match_ids()[0])
+    assert aggregate.fingerprint() != fingerprint
+    api.stats_cache.set(player.puuid, {**entry, 'fingerprint': aggregate.fingerprint()})
+
+    changed = client.get(_url(player), headers={'If-None-Match': response.headers['ETag']})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != response.headers['ETag']
+
+
+def test_large_bodies_are_gzipped_with_a_weak_etag(api, client, player, monkeypatch):
+    monkeypatch.setattr(api, 'brotli', None)
+    plain = client.get(_url(player))
+    compressed = client.get(_url(player), headers={'Accept-Encoding': 'gzip'})
+
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in compressed.headers['Vary']
+    assert len(compressed.data) < len(plain.data)
+    assert json.loads(gzip.decompress(compressed.data)) == plain.get_json()
+    assert compressed.headers['ETag'] == 'W/' + plain.headers['ETag']
+
+    # Either validator revalidates either representation
+    for etag in (plain.headers['ETag'], compressed.headers['ETag']):
+        assert client.get(_url(player), headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag}).status_code == 304
+
+
+def test_small_bodies_are_sent_uncompressed(client):
+    response = client.get('/api/health', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_json()['status'] == 'healthy'
+
+
+def test_fields_projection(client, player):
+    response = client.get(_url(player, fields='total_matches,wins'))
+    assert set(response.get_json()['data']['stats']) == {'total_matches', 'wins'}
+
+
+def test_cursor_pagination_walks_every_match(client, player):
+    seen, cursor = [], None
+    while True:
+        params = {'fields': 'items_per_match', 'limit': 50}
+        if cursor:
+            params['cursor'] = cursor
+        data = client.get(_url(player, **params)).get_json()['data']
+        seen += [entry['matchId'] for entry in data['stats']['items_per_match']]
+        cursor = data['page']['nextCursor']
+        if cursor is None:
+            break
+    assert seen == player.match_ids()
+
+
+@pytest.mark.parametrize('query', ['limit=0', 'limit=100000', 'limit=abc', 'cursor=NA1_unknown',
+                                   'fields=wins,bogus'])
+def test_bad_page_parameters(client, player, query):
+    response = client.get(_url(player) + '?' + query)
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_unknown_region(client, player):
+    response = client.get(_url(player, region='xx9'))
+    assert response.status_code == 400
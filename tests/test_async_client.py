@@ -0,0 +1,90 @@
+"""AsyncRiotAPIClient against the fake Riot API"""
+
+import asyncio
+import threading
+
+from async_client import AsyncRiotAPIClient
+from backend import MatchDataProcessor
+from storage import MatchStore, TimelineCache
+
+
+def _client(riot_server, tmp_path):
+    return AsyncRiotAPIClient('test-key', 'na1', match_store=MatchStore(str(tmp_path / 'async_matches.sqlite3')),
+                              timeline_cache=TimelineCache(str(tmp_path / 'async_timelines.sqlite3')),
+                              base_url_override=riot_server.base_url)
+
+
+def _close_stores(client):
+    client.match_store.close()
+    client.timeline_cache.close()
+
+
+def test_full_year_matches_match_sync_client(riot_server, riot_client, player, tmp_path):
+    async def crawl():
+        async with _client(riot_server, tmp_path) as client:
+            try:
+                return await client.get_full_year_matches(player.puuid, include_timeline=True)
+            finally:
+                _close_stores(client)
+
+    matches = asyncio.run(crawl())
+    expected = list(riot_client.iter_full_year_matches(player.puuid, include_timeline=True))
+
+    assert [m['metadata']['matchId'] for m in matches] == [m['metadata']['matchId'] for m in expected]
+    assert [bool(m.get('timeline')) for m in matches] == [bool(m.get('timeline')) for m in expected]
+    assert MatchDataProcessor.extract_player_stats(matches, player.puuid) == \
+        MatchDataProcessor.extract_player_stats(expected, player.puuid)
+
+
+def test_refresh_is_incremental(riot_server, riot_fixtures, player, tmp_path):
+    full_schedule = list(player.schedule)
+
+    async def refresh_twice():
+        async with _client(riot_server, tmp_path) as client:
+            try:
+                player.schedule = full_schedule[5:]
+                first = await client.refresh_match_history(player.puuid)
+                requests_before = riot_server.state.get_stats()['by_method'].get('match', 0)
+
+                player.schedule = full_schedule
+                second = await client.refresh_match_history(player.puuid)
+                fetched = riot_server.state.get_stats()['by_method'].get('match', 0) - requests_before
+                sync_point = client.match_store.get_sync_point(player.puuid)
+                return first, second, fetched, sync_point
+            finally:
+                _close_stores(client)
+
+    first, second, fetched, sync_point = asyncio.run(refresh_twice())
+    assert first == player.match_ids()[5:]
+    assert second == player.match_ids()
+    assert fetched == 5
+    assert sync_point['match_id'] == player.match_ids()[0]
+
+
+def test_store_io_runs_off_the_event_loop(riot_server, player, tmp_path):
+    threads = set()
+
+    async def crawl():
+        async with _client(riot_server, tmp_path) as client:
+            store_get = client.match_store.get
+
+            def recording_get(match_id):
+                threads.add(threading.get_ident())
+                return store_get(match_id)
+
+            client.match_store.get = recording_get
+            try:
+                await client.get_match_details(player.match_ids()[0])
+                await client.get_match_details(player.match_ids()[0])
+                return threading.get_ident()
+            finally:
+                _close_stores(client)
+
+    loop_thread = asyncio.run(crawl())
+    assert threads and loop_thread not in threads
+
+
+def test_has_no_sync_request_methods():
+    client = AsyncRiotAPIClient('test-key', 'na1')
+    assert not hasattr(client, 'session')
+    assert asyncio.iscoroutinefunction(client.refresh_match_history)
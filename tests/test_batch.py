@@ -0,0 +1,91 @@
+"""batch.py against the fake Riot API"""
+
+import os
+import json
+import threading
+
+import batch
+from backend import MatchDataProcessor, RiotClientPool
+
+
+def _die(*args, **kwargs):
+    os._exit(1)
+
+
+def _run(riot_server, match_store, timeline_cache, tmp_path, players, **options):
+    pool = RiotClientPool('test-key', match_store, timeline_cache, base_url_override=riot_server.base_url)
+    output = tmp_path / 'results.jsonl'
+    try:
+        summary = batch.run_batch(players, str(output), pool, match_store.path, timeline_cache.path,
+                                  workers=1, fetch_threads=2, report_every=100, **options)
+    finally:
+        pool.close()
+    records = {record['riotId']: record for record in map(json.loads, output.read_text().splitlines())}
+    return summary, records
+
+
+def test_parse_player_line():
+    assert batch.parse_player_line('Faker#KR1 kr', 'na1') == ('Faker#KR1', 'kr')
+    assert batch.parse_player_line('Faker#KR1,kr', 'na1') == ('Faker#KR1', 'kr')
+    assert batch.parse_player_line('Some Name#EUW', 'euw1') == ('Some Name#EUW', 'euw1')
+    assert batch.parse_player_line('  # comment', 'na1') is None
+    assert batch.parse_player_line('', 'na1') is None
+
+
+def test_batch_stats_match_api(riot_server, riot_fixtures, riot_client, match_store, timeline_cache, tmp_path):
+    players = riot_fixtures.players[:2]
+    summary, records = _run(riot_server, match_store, timeline_cache, tmp_path,
+                            [(player.riot_id, 'na1') for player in players] + [('Nobody#SYN', 'na1')])
+
+    assert summary['by_status'] == {'ok': 2, 'not_found': 1}
+    for player in players:
+        match_ids = riot_client.refresh_match_history(player.puuid)
+        aggregate = MatchDataProcessor.aggregate_matches(
+            riot_client.iter_matches(match_ids, include_timeline=True), player.puuid)
+        record = records[player.riot_id]
+        assert record['fingerprint'] == aggregate.fingerprint()
+        assert record['stats'] == json.loads(json.dumps(aggregate.to_stats()))
+
+
+def test_dead_worker_is_recorded_per_player(monkeypatch, riot_server, riot_fixtures, match_store,
+                                            timeline_cache, tmp_path):
+    monkeypatch.setattr(batch, 'aggregate_player', _die)
+    players = [(player.riot_id, 'na1') for player in riot_fixtures.players[:2]]
+    summary, records = _run(riot_server, match_store, timeline_cache, tmp_path, players)
+
+    assert summary['by_status'] == {'error': 2}
+    assert all(record['status'] == 'error' for record in records.values())
+
+
+def test_players_in_flight_are_capped(monkeypatch, riot_server, riot_fixtures, match_store,
+                                      timeline_cache, tmp_path):
+    fetch_player, record = batch.fetch_player, batch.BatchProgress.record
+    lock = threading.Lock()
+    started, written, peak = [], [], []
+
+    def counting_fetch(*args):
+        with lock:
+            started.append(args[1])
+            peak.append(len(started) - len(written))
+        return fetch_player(*args)
+
+    monkeypatch.setattr(batch, 'fetch_player', counting_fetch)
+    monkeypatch.setattr(batch.BatchProgress, 'record', lambda self, status: (written.append(status), record(self, status)))
+
+    players = [(player.riot_id, 'na1') for player in riot_fixtures.players] + [('Nobody#SYN', 'na1')]
+    summary, records = _run(riot_server, match_store, timeline_cache, tmp_path, players, max_in_flight=2)
+
+    assert summary['by_status'] == {'ok': len(riot_fixtures.players), 'not_found': 1}
+    assert len(records) == len(players)
+    assert max(peak) <= 2
+
+
+def test_resume_skips_finished_players(tmp_path):
+    output = tmp_path / 'results.jsonl'
+    output.write_text('\n'.join([
+        json.dumps({'riotId': 'A#1', 'region': 'na1', 'status': 'ok'}),
+        json.dumps({'riotId': 'B#1', 'region': 'na1', 'status': 'error'}),
+        '{"riotId": "C#1", "reg'  # Interrupted write
+    ]))
+    assert batch.load_finished(str(output), retry_failed=False) == {'na1:a#1', 'na1:b#1'}
+    assert batch.load_finished(str(output), retry_failed=True) == {'na1:a#1'}
@@ -0,0 +1,163 @@
+"""AWSBedrockClient caching and stream coalescing, with a stand-in for the bedrock-runtime client"""
+
+import io
+import json
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from backend import AWSBedrockClient
+from storage import ResponseStore
+
+
+def _event(text):
+    return {'chunk': {'bytes': json.dumps({'type': 'content_block_delta',
+                                           'delta': {'type': 'text_delta', 'text': text}}).encode('utf-8')}}
+
+
+class FakeRuntime:
+    """bedrock-runtime stand-in; streams hold after their first chunk until `release` is set"""
+
+    def __init__(self, chunks=('Hello ', 'there.'), hold=False):
+        self.chunks = chunks
+        self.calls = 0
+        self.release = threading.Event()
+        if not hold:
+            self.release.set()
+
+    def invoke_model_with_response_stream(self, modelId, body):
+        self.calls += 1
+
+        def events():
+            for index, text in enumerate(self.chunks):
+                if index == 1:
+                    self.release.wait(5)
+                yield _event(text)
+
+        return {'body': events()}
+
+    def invoke_model(self, modelId, body):
+        self.calls += 1
+        return {'body': io.BytesIO(json.dumps({'content': [{'text': ''.join(self.chunks)}]}).encode('utf-8'))}
+
+
+@pytest.fixture
+def bedrock():
+    client = AWSBedrockClient(region='us-east-1', model_id='test-model')
+    client.client = FakeRuntime()
+    return client
+
+
+def _wait_for_follower(bedrock, key):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        call = bedrock._in_flight._calls.get(key)
+        if call is not None and call.followers:
+            return
+        time.sleep(0.01)
+    raise AssertionError('follower never joined')
+
+
+def test_stream_is_cached(bedrock):
+    assert list(bedrock.stream_insights('prompt')) == ['Hello ', 'there.']
+    assert list(bedrock.stream_insights('prompt')) == ['Hello there.']
+    assert bedrock.generate_insights('prompt') == 'Hello there.'
+    assert bedrock.client.calls == 1
+
+
+def test_follower_shares_leader_stream(bedrock):
+    bedrock.client = FakeRuntime(hold=True)
+    key = bedrock.cache_key('prompt', 4096, 0.7)
+    leader = bedrock.stream_insights('prompt')
+    assert next(leader) == 'Hello '
+
+    result = {}
+    follower = threading.Thread(target=lambda: result.update(chunks=list(bedrock.stream_insights('prompt'))))
+    follower.start()
+    _wait_for_follower(bedrock, key)
+
+    bedrock.client.release.set()
+    assert list(leader) == ['there.']
+    follower.join(5)
+    assert result['chunks'] == ['Hello there.']
+    assert bedrock.client.calls == 1
+
+
+def test_follower_generates_itself_when_leader_disconnects(bedrock):
+    runtime = bedrock.client = FakeRuntime(hold=True)
+    key = bedrock.cache_key('prompt', 4096, 0.7)
+    leader = bedrock.stream_insights('prompt')
+    assert next(leader) == 'Hello '
+
+    result = {}
+
+    def follow():
+        try:
+            result['chunks'] = list(bedrock.stream_insights('prompt'))
+        except BaseException as e:
+            result['error'] = e
+
+    follower = threading.Thread(target=follow)
+    follower.start()
+    _wait_for_follower(bedrock, key)
+
+    leader.close()  # Client disconnected: GeneratorExit inside the leader's stream
+    runtime.release.set()
+    follower.join(5)
+
+    assert 'error' not in result
+    assert result['chunks'] == ['Hello ', 'there.']
+    assert runtime.calls == 2
+    assert bedrock._in_flight.in_flight() == 0
+
+
+def test_responses_survive_a_restart_through_the_store(tmp_path):
+    store = ResponseStore(str(tmp_path / 'responses.sqlite3'), ttl_seconds=60, max_entries=10)
+    first = AWSBedrockClient(region='us-east-1', model_id='test-model', response_store=store)
+    first.client = FakeRuntime()
+    assert first.generate_insights('prompt') == 'Hello there.'
+
+    # A new process: empty in-memory cache, same store
+    second = AWSBedrockClient(region='us-east-1', model_id='test-model', response_store=store)
+    second.client = FakeRuntime()
+    assert list(second.stream_insights('prompt')) == ['Hello there.']
+    assert second.client.calls == 0
+    assert second.generate_insights('prompt', temperature=0.2) == 'Hello there.'
+    assert second.client.calls == 1  # Different request, different key
+    store.close()
+
+
+def test_errors_are_not_cached(bedrock):
+    class Failing:
+        def invoke_model(self, modelId, body):
+            raise RuntimeError('throttled')
+
+    bedrock.client = Failing()
+    assert bedrock.generate_insights('prompt').startswith('Error generating insights')
+    bedrock.client = FakeRuntime()
+    assert bedrock.generate_insights('prompt') == 'Hello there.'
+
+
+def test_failed_cache_write_still_releases_the_key(bedrock):
+    class BrokenStore:
+        def get(self, key):
+            return None
+
+        def put(self, key, response):
+            raise sqlite3.OperationalError('disk I/O error')
+
+    bedrock.response_store = BrokenStore()
+    with pytest.raises(sqlite3.OperationalError):
+        list(bedrock.stream_insights('prompt'))
+    assert bedrock._in_flight.in_flight() == 0
+
+    # A later identical request starts its own call instead of waiting on the dead one
+    bedrock.response_cache.clear()
+    bedrock.response_store = None
+    result = {}
+    later = threading.Thread(target=lambda: result.update(chunks=list(bedrock.stream_insights('prompt'))))
+    later.start()
+    later.join(5)
+    assert result['chunks'] == ['Hello ', 'there.']
@@ -0,0 +1,49 @@
+"""benchmarks.suite smoke test on a tiny history"""
+
+import os
+import sys
+import subprocess
+
+from benchmarks import suite
+
+
+def test_benchmark_data_is_deterministic():
+    first, second = suite.BenchmarkData(20, seed=3), suite.BenchmarkData(20, seed=3)
+    assert first.stats == second.stats
+    assert len(first.timelines) == 10
+    assert all(match['timeline']['format'] == 'item-events-v1' for match in first.matches if 'timeline' in match)
+
+
+def test_run_suite_measures_every_stage(capsys):
+    results = suite.run_suite([10], repeat=1)
+    assert set(results['10']) == set(suite.build_stages())
+    for metrics in results['10'].values():
+        assert set(metrics) == {'wall_ms', 'alloc_peak_kb', 'rss_peak_kb'}
+        assert metrics['wall_ms'] > 0
+
+    assert suite.compare(results, {'10': results['10']}, suite.TOLERANCES) == []
+    slower = {'10': {stage: {**metrics, 'wall_ms': metrics['wall_ms'] * 2 + 1}
+                     for stage, metrics in results['10'].items()}}
+    regressions = suite.compare(slower, results, suite.TOLERANCES)
+    assert len(regressions) == len(results['10'])
+    assert all('wall_ms' in line for line in regressions)
+
+
+def test_chat_prompt_import_leaves_the_environment_alone(tmp_path):
+    """Run in a fresh interpreter, where importing api for the prompt builder has its full effect"""
+    script = (
+        "import os\n"
+        "from benchmarks import suite\n"
+        "names = ('MATCH_STORE_PATH', 'TIMELINE_CACHE_PATH', 'LLM_CACHE_PATH')\n"
+        "before = [os.environ.get(name) for name in names]\n"
+        "build = suite._chat_prompt_builder()\n"
+        "assert 'Player' in build('Question?', {}, [])\n"
+        "assert [os.environ.get(name) for name in names] == before, 'environment changed'\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(suite.__file__)))
+    env = {**os.environ, 'PYTHONPATH': root, 'MATCH_STORE_PATH': str(tmp_path / 'match_store.sqlite3'),
+           'TIMELINE_CACHE_PATH': str(tmp_path / 'timeline_cache.sqlite3')}
+    result = subprocess.run([sys.executable, '-c', script], cwd=tmp_path, env=env, capture_output=True, text=True,
+                            timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert not (tmp_path / 'match_store.sqlite3').exists()  # The API's stores went to the scratch directory
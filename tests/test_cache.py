@@ -0,0 +1,107 @@
+"""In-memory caches: TTLCache and SingleFlight coalescing"""
+
+import threading
+import time
+
+import pytest
+
+from cache import LeaderAbandoned, SingleFlight, TTLCache
+
+
+def _run_with_follower(flight, leader_fn):
+    """Start a leader running leader_fn(started, release), then a follower on the same key"""
+    started, release = threading.Event(), threading.Event()
+    outcome = {}
+
+    def lead():
+        try:
+            outcome['leader'] = flight.do('key', leader_fn, started, release)
+        except BaseException as e:
+            outcome['leader_error'] = e
+
+    def follow():
+        try:
+            outcome['follower'] = flight.do('key', lambda *args: 'follower ran')
+        except BaseException as e:
+            outcome['follower_error'] = e
+
+    leader = threading.Thread(target=lead)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=follow)
+    follower.start()
+    while flight._calls['key'].followers == 0:
+        time.sleep(0.005)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+    return outcome
+
+
+def test_followers_share_the_leaders_result():
+    flight = SingleFlight()
+    calls = []
+
+    def compute(started, release):
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'result'
+
+    assert _run_with_follower(flight, compute) == {'leader': 'result', 'follower': 'result'}
+    assert len(calls) == 1
+    assert flight.in_flight() == 0
+
+
+def test_followers_see_the_leaders_exception():
+    def compute(started, release):
+        started.set()
+        release.wait(5)
+        raise ValueError('upstream failed')
+
+    outcome = _run_with_follower(SingleFlight(), compute)
+    assert isinstance(outcome['leader_error'], ValueError)
+    assert outcome['follower_error'] is outcome['leader_error']
+
+
+def test_leader_base_exception_reaches_followers_as_leader_abandoned():
+    def compute(started, release):
+        started.set()
+        release.wait(5)
+        raise KeyboardInterrupt()
+
+    outcome = _run_with_follower(SingleFlight(), compute)
+    assert isinstance(outcome['leader_error'], KeyboardInterrupt)
+    assert isinstance(outcome['follower_error'], LeaderAbandoned)
+
+
+def test_key_is_released_after_each_call():
+    flight = SingleFlight()
+    assert flight.do('key', lambda: 1) == 1
+    with pytest.raises(RuntimeError):
+        flight.do('key', lambda: (_ for _ in ()).throw(RuntimeError('x')))
+    assert flight.do('key', lambda: 2) == 2
+    assert flight.in_flight() == 0
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_entries=2, ttl_seconds=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1  # 'b' is now the least recently used
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(max_entries=4, ttl_seconds=60)
+    cache.set('negative', None, ttl_seconds=0)
+    cache.set('short', 'value', ttl_seconds=0.05)
+    cache.set('long', 'value')
+    assert cache.get('negative', 'missing') == 'missing'
+    time.sleep(0.06)
+    assert cache.get('short') is None
+    assert cache.get('long') == 'value'
+    assert cache.pop('long') == 'value' and cache.get('long') is None
@@ -0,0 +1,59 @@
+"""/api/chat and its streaming variant, against the stub Bedrock client"""
+
+import json
+
+
+def _events(response):
+    """Parse an SSE body into (event, data) pairs"""
+    parsed = []
+    for message in response.get_data(as_text=True).split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in message.splitlines() if not line.startswith(':'))
+        if fields:
+            parsed.append((fields['event'], json.loads(fields['data'])))
+    return parsed
+
+
+BODY = {
+    'message': 'How do I farm better?',
+    'playerData': {'player': {'gameName': 'Synthetic0', 'tagLine': 'SYN'}, 'stats': {'total_matches': 12}},
+    'conversationHistory': [{'role': 'user', 'content': 'Hi'}, {'role': 'assistant', 'content': 'Hello'}]
+}
+
+
+def test_chat_stream_sends_tokens_then_the_full_reply(client, bedrock):
+    response = client.post('/api/chat/stream', json=BODY)
+    assert response.mimetype == 'text/event-stream'
+    assert response.headers['X-Accel-Buffering'] == 'no'
+
+    events = _events(response)
+    assert events[:-1] == [('token', {'text': chunk}) for chunk in bedrock.CHUNKS]
+    assert events[-1] == ('done', {'response': ''.join(bedrock.CHUNKS)})
+
+
+def test_chat_stream_uses_the_same_prompt_as_chat(client, bedrock):
+    reply = client.post('/api/chat', json=BODY).get_json()['data']['response']
+    _events(client.post('/api/chat/stream', json=BODY))
+
+    assert reply == ''.join(bedrock.CHUNKS)
+    assert bedrock.prompts[0] == bedrock.prompts[1]
+    assert 'How do I farm better?' in bedrock.prompts[0]
+
+
+def test_chat_stream_requires_a_message(client, bedrock):
+    response = client.post('/api/chat/stream', json={'playerData': {}})
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+    assert bedrock.prompts == []
+
+
+def test_chat_stream_bad_requests_get_json_errors(client, bedrock):
+    """Same JSON errors as /api/chat: a non-JSON body and a history entry without a role"""
+    bad_requests = [
+        {'data': 'hello', 'content_type': 'text/plain'},
+        {'json': {**BODY, 'conversationHistory': [{'content': 'no role'}]}}
+    ]
+    for kwargs in bad_requests:
+        streamed = client.post('/api/chat/stream', **kwargs)
+        assert streamed.status_code == client.post('/api/chat', **kwargs).status_code == 500
+        assert streamed.get_json()['success'] is False
+    assert bedrock.prompts == []
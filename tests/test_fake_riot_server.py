@@ -0,0 +1,81 @@
+"""benchmarks.fake_riot_server: routing, Riot-style limit headers and 429s"""
+
+from urllib.parse import quote
+
+import pytest
+import requests
+
+from backend import RiotAPIClient
+from benchmarks.fake_riot_server import FakeRiotServer, FakeRiotState
+
+TOKEN = {'X-Riot-Token': 'test-key'}
+
+
+@pytest.fixture
+def make_server(riot_fixtures):
+    """Start a private server (own limits and counters) with the given FakeRiotState options"""
+    servers = []
+
+    def make(**options):
+        server = FakeRiotServer(FakeRiotState(riot_fixtures, **options))
+        server.start()
+        servers.append(server)
+        return server
+
+    yield make
+    for server in servers:
+        server.stop()
+
+
+def _account_url(server, player, routing='americas'):
+    game_name, tag_line = player.riot_id.split('#')
+    return f"{server.base_url}/{routing}/riot/account/v1/accounts/by-riot-id/{quote(game_name)}/{tag_line}"
+
+
+def test_routes_and_counts(make_server, player):
+    server = make_server()
+    response = requests.get(_account_url(server, player), headers=TOKEN)
+    assert response.json()['puuid'] == player.puuid
+    assert response.headers['X-App-Rate-Limit'] == '20:1,100:120'
+    assert response.headers['X-App-Rate-Limit-Count'] == '1:1,1:120'
+    assert response.headers['X-Method-Rate-Limit'] == '1000:60'
+
+    assert requests.get(_account_url(server, player)).status_code == 401
+    assert requests.get(_account_url(server, player, routing='na1'), headers=TOKEN).status_code == 403
+    assert requests.get(f"{server.base_url}/americas/lol/nothing", headers=TOKEN).status_code == 404
+
+    stats = requests.get(f"{server.base_url}/_stats").json()
+    assert stats['by_method']['account'] == 2
+    assert stats['by_status'] == {'200': 1, '401': 1, '403': 1, '404': 1}
+
+
+def test_application_limit_is_enforced_per_host(make_server, player):
+    server = make_server(app_limit='2:60')
+    statuses = [requests.get(_account_url(server, player), headers=TOKEN).status_code for _ in range(3)]
+    assert statuses == [200, 200, 429]
+
+    limited = requests.get(_account_url(server, player), headers=TOKEN)
+    assert limited.headers['X-Rate-Limit-Type'] == 'application'
+    assert 1 <= int(limited.headers['Retry-After']) <= 60
+
+    # Another routing host has its own budget
+    assert requests.get(_account_url(server, player, routing='europe'), headers=TOKEN).status_code == 200
+    assert server.state.get_stats()['enforced_429'] == 2
+
+
+def test_injected_service_429s(make_server, player):
+    server = make_server(error_rate=1, retry_after=7)
+    limited = requests.get(_account_url(server, player), headers=TOKEN)
+    assert limited.status_code == 429
+    assert (limited.headers['X-Rate-Limit-Type'], limited.headers['Retry-After']) == ('service', '7')
+    assert server.state.get_stats()['injected_429'] == 1
+
+
+def test_override_routes_the_client_by_host(riot_server, riot_fixtures):
+    client = RiotAPIClient('test-key', 'euw1', base_url_override=riot_server.base_url)
+    assert (client.base_url, client.regional_url) == (f"{riot_server.base_url}/euw1", f"{riot_server.base_url}/europe")
+
+    player = riot_fixtures.players[1]
+    summoner = client.get_summoner_by_riot_id(player.riot_id)
+    assert summoner['puuid'] == player.puuid
+    client.close()
@@ -0,0 +1,77 @@
+"""Inventory reconstruction from timelines, full and pruned"""
+
+import copy
+import json
+
+import pytest
+
+from backend import InventoryTracker, MatchDataProcessor
+from benchmarks.synthetic import synthetic_players
+
+CUTOFFS = {**MatchDataProcessor.INVENTORY_CUTOFFS_MS, 'mid': 700000, 'end': float('inf')}
+
+
+@pytest.fixture(scope='module')
+def matches():
+    player = synthetic_players(seed=5, players=1, matches_per_player=8)[0]
+    return player.puuid, list(player.iter_matches(timelines='all'))
+
+
+def _replay(timeline, pid, cutoff_ms):
+    """Reference: replay every frame at or before the cutoff from the start"""
+    tracker = InventoryTracker()
+    for frame in timeline['info']['frames']:
+        if frame['timestamp'] > cutoff_ms:
+            break
+        for ev in frame.get('events') or []:
+            if ev.get('participantId') == pid:
+                tracker.apply(ev.get('type'), ev.get('itemId'), ev.get('beforeId'), ev.get('afterId'))
+    return tracker.snapshot()
+
+
+def test_single_pass_snapshots_match_replaying_each_cutoff(matches):
+    _, games = matches
+    for match in games:
+        for pid in range(1, 11):
+            snapshots = MatchDataProcessor.inventory_snapshots(match['timeline'], pid, CUTOFFS)
+            assert snapshots == {name: _replay(match['timeline'], pid, cutoff) for name, cutoff in CUTOFFS.items()}
+            frames = match['timeline']['info']['frames']
+            assert MatchDataProcessor.reconstruct_inventory(frames, pid, 900000) == snapshots['min15']
+
+
+def test_tracker_undo_restores_the_previous_item():
+    tracker = InventoryTracker()
+    tracker.apply('ITEM_PURCHASED', 1055)
+    tracker.apply('ITEM_PURCHASED', 2003)
+    tracker.apply('ITEM_PURCHASED', 2003)
+    tracker.apply('ITEM_SOLD', 1055)
+    tracker.apply('ITEM_PURCHASED', 3006)
+    tracker.apply('ITEM_UNDO', before_id=1001, after_id=3006)
+    assert tracker.snapshot() == [2003, 1001]
+    tracker.apply('ITEM_DESTROYED', 2003)
+    assert tracker.snapshot() == [2003, 1001]
+    tracker.apply('ITEM_DESTROYED', 2003)
+    assert tracker.snapshot() == [1001]
+
+
+def test_pruned_timeline_gives_the_same_snapshots(matches):
+    _, games = matches
+    for match in games:
+        pruned = json.loads(json.dumps(MatchDataProcessor.prune_timeline(match['timeline'])))
+        assert pruned['format'] == MatchDataProcessor.PRUNED_TIMELINE_FORMAT
+        assert MatchDataProcessor.has_item_events(pruned)
+        assert MatchDataProcessor.prune_timeline(pruned) is pruned
+        for pid in range(1, 11):
+            assert (MatchDataProcessor.inventory_snapshots(pruned, pid, CUTOFFS)
+                    == MatchDataProcessor.inventory_snapshots(match['timeline'], pid, CUTOFFS))
+
+
+def test_pruned_timelines_give_the_same_stats(matches):
+    puuid, games = matches
+    pruned = copy.deepcopy(games)
+    for match in pruned:
+        match['timeline'] = MatchDataProcessor.prune_timeline(match['timeline'])
+        assert len(json.dumps(match['timeline'])) < len(json.dumps(games[0]['timeline']))
+
+    assert (MatchDataProcessor.aggregate_matches(pruned, puuid).to_stats()
+            == MatchDataProcessor.aggregate_matches(games, puuid).to_stats())
@@ -0,0 +1,89 @@
+"""ItemCatalog and /api/items"""
+
+import gzip
+import json
+import os
+
+import pytest
+
+from item_catalog import ItemCatalog
+
+
+def _write(path, mapping, mtime):
+    path.write_text(json.dumps(mapping), encoding='utf-8')
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def items_path(tmp_path):
+    path = tmp_path / 'items.json'
+    _write(path, {'1001': 'Boots', '3006': "Berserker's Greaves"}, 1_000_000)
+    return path
+
+
+def test_catalog_reads_either_schema(tmp_path, items_path):
+    assert ItemCatalog(str(items_path)).mapping == {'1001': 'Boots', '3006': "Berserker's Greaves"}
+
+    legacy = tmp_path / 'legacy.json'
+    _write(legacy, {'Boots': 1001, "Berserker's Greaves": '3006'}, 1_000_000)
+    assert ItemCatalog(str(legacy)).mapping == {'1001': 'Boots', '3006': "Berserker's Greaves"}
+
+    assert ItemCatalog(str(tmp_path / 'missing.json')).current()[0] == b'{"success":true,"data":{}}'
+
+
+def test_catalog_reloads_only_when_the_file_changes(items_path):
+    catalog = ItemCatalog(str(items_path))
+    body, etag = catalog.current()
+    assert catalog.current() == (body, etag)
+
+    _write(items_path, {'1001': 'Boots of Speed'}, 2_000_000)
+    new_body, new_etag = catalog.current()
+    assert new_etag != etag
+    assert json.loads(new_body)['data'] == {'1001': 'Boots of Speed'}
+
+
+def test_items_endpoint_revalidates_with_304(api, client, items_path, monkeypatch):
+    monkeypatch.setattr(api, 'item_catalog', ItemCatalog(str(items_path)))
+    first = client.get('/api/items')
+    assert first.status_code == 200
+    assert first.get_json()['data']['1001'] == 'Boots'
+    assert 'no-cache' in first.headers['Cache-Control']
+
+    again = client.get('/api/items', headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+    assert again.data == b''
+
+    _write(items_path, {'1001': 'Boots of Speed'}, 2_000_000)
+    changed = client.get('/api/items', headers={'If-None-Match': first.headers['ETag']})
+    assert changed.status_code == 200
+    assert changed.get_json()['data'] == {'1001': 'Boots of Speed'}
+
+
+def test_compressed_copies_are_built_once_per_version(items_path):
+    catalog = ItemCatalog(str(items_path))
+    body, etag = catalog.current()
+    gzipped, gzip_etag = catalog.current('gzip')
+    assert gzip.decompress(gzipped) == body
+    assert gzip_etag == f"{etag}-gzip"
+    assert catalog.current('gzip')[0] is gzipped
+
+    _write(items_path, {'1001': 'Boots of Speed'}, 2_000_000)
+    assert json.loads(gzip.decompress(catalog.current('gzip')[0]))['data'] == {'1001': 'Boots of Speed'}
+
+
+def test_items_endpoint_serves_the_precompressed_body(api, client, items_path, monkeypatch):
+    catalog = ItemCatalog(str(items_path))
+    monkeypatch.setattr(api, 'item_catalog', catalog)
+    monkeypatch.setattr(catalog, 'ENCODINGS', ('gzip',))
+    plain = client.get('/api/items')
+    compressed = client.get('/api/items', headers={'Accept-Encoding': 'gzip, deflate, br'})
+
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in compressed.headers['Vary']
+    assert compressed.data == catalog.current('gzip')[0]
+    assert gzip.decompress(compressed.data) == plain.data
+    etag, weak = compressed.get_etag()
+    assert not weak and etag == plain.get_etag()[0] + '-gzip'
+
+    again = client.get('/api/items', headers={'Accept-Encoding': 'gzip', 'If-None-Match': compressed.headers['ETag']})
+    assert again.status_code == 304
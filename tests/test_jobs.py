@@ -0,0 +1,137 @@
+"""Background analysis jobs: JobManager and the /api/analyze + /api/jobs endpoints"""
+
+import json
+import time
+
+import pytest
+
+from jobs import Job, JobFailed, JobManager
+
+
+def _events(response):
+    """Parse an SSE body into (id, event, data) tuples, skipping keep-alive comments"""
+    parsed = []
+    for message in response.get_data(as_text=True).split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in message.splitlines() if not line.startswith(':'))
+        if fields:
+            parsed.append((int(fields['id']), fields['event'], json.loads(fields['data'])))
+    return parsed
+
+
+def _wait(job, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not job.finished and time.monotonic() < deadline:
+        job.wait_for_events(len(job._events), timeout=0.5)
+    assert job.finished
+    return job
+
+
+@pytest.fixture
+def manager():
+    manager = JobManager(max_workers=2, ttl_seconds=60)
+    yield manager
+    manager._executor.shutdown(wait=True)
+
+
+def test_job_succeeds_with_result(manager):
+    job = _wait(manager.submit('test', lambda job, x: x * 2, 21))
+    assert job.to_dict()['status'] == 'succeeded'
+    assert job.result == 42
+    assert [event for _, event, _ in job.wait_for_events(0, 0)] == ['stage', 'result']
+
+
+def test_job_failed_carries_status(manager):
+    def missing(job):
+        raise JobFailed('Player not found', 404)
+
+    data = _wait(manager.submit('test', missing)).to_dict()
+    assert (data['status'], data['error'], data['errorStatus']) == ('failed', 'Player not found', 404)
+
+
+def test_unexpected_error_fails_with_500(manager):
+    def broken(job):
+        raise KeyError('boom')
+
+    assert _wait(manager.submit('test', broken)).error_status == 500
+
+
+@pytest.mark.parametrize('exc', [SystemExit, KeyboardInterrupt, GeneratorExit])
+def test_base_exception_still_ends_the_job(exc):
+    def interrupted(job):
+        raise exc()
+
+    job = Job('test')
+    with pytest.raises(exc):
+        JobManager._run(job, interrupted, (), {})
+    assert job.status == 'failed'
+    assert job.finished
+
+
+def test_wait_for_events_resumes_from_position():
+    job = Job('test')
+    job.start()
+    job.set_progress(1, 10)
+    job.emit('insight', {'text': 'hi'})
+    assert [index for index, _, _ in job.wait_for_events(1, 0)] == [1, 2]
+    assert job.wait_for_events(3, 0.01) == []
+
+
+def test_refresh_reports_download_progress(riot_client, riot_server, player):
+    before = riot_server.state.get_stats()['by_method'].get('match', 0)
+    reports = []
+    match_ids = riot_client.refresh_match_history(player.puuid, progress=lambda done, total: reports.append((done, total)))
+
+    downloads = riot_server.state.get_stats()['by_method'].get('match', 0) - before
+    assert reports[0] == (0, len(match_ids))
+    assert reports[-1] == (len(match_ids), len(match_ids))
+    assert len(reports) == downloads + 1
+
+
+def test_analyze_job_api(api, client, bedrock, player):
+    started = client.post('/api/analyze', json={'riotId': player.riot_id})
+    assert started.status_code == 202
+    job_id = started.get_json()['data']['jobId']
+
+    job = _wait(api.job_manager.get(job_id))
+    events = job.wait_for_events(0, 0)
+    stages = [data['stage'] for _, event, data in events if event == 'stage']
+    assert stages == ['starting', 'lookup', 'ranked', 'matches', 'aggregate', 'insights']
+
+    # Match progress during 'matches' follows the downloads, before any aggregation
+    aggregate_at = next(i for i, event, data in events if event == 'stage' and data['stage'] == 'aggregate')
+    downloads = [data for i, event, data in events if event == 'progress' and i < aggregate_at]
+    assert downloads[-1] == {'matches_fetched': len(player.match_ids()), 'matches_total': len(player.match_ids())}
+
+    status = client.get(f"/api/jobs/{job_id}")
+    data = status.get_json()['data']
+    assert data['status'] == 'succeeded'
+    assert data['result']['insights'] == ''.join(bedrock.CHUNKS)
+    assert data['result']['stats']['total_matches'] == len(player.match_ids())
+    assert client.get(f"/api/jobs/{job_id}", headers={'If-None-Match': status.headers['ETag']}).status_code == 304
+
+
+def test_analyze_unknown_player(api, client, bedrock):
+    job_id = client.post('/api/analyze', json={'riotId': 'Nobody#SYN'}).get_json()['data']['jobId']
+    data = _wait(api.job_manager.get(job_id)).to_dict()
+    assert (data['status'], data['errorStatus']) == ('failed', 404)
+
+
+def test_analyze_requires_riot_id(client):
+    assert client.post('/api/analyze', json={}).status_code == 400
+    assert client.get('/api/jobs/unknown').status_code == 404
+
+
+def test_job_events_stream_and_resume(api, client, bedrock, player):
+    job_id = client.post('/api/analyze', json={'riotId': player.riot_id}).get_json()['data']['jobId']
+
+    response = client.get(f"/api/jobs/{job_id}/events")
+    assert response.mimetype == 'text/event-stream'
+    events = _events(response)
+    assert [index for index, _, _ in events] == list(range(len(events)))
+    assert ''.join(data['text'] for _, event, data in events if event == 'insight') == ''.join(bedrock.CHUNKS)
+    assert events[-1][1] == 'result'
+    assert events[-1][2]['stats']['total_matches'] == len(player.match_ids())
+
+    resumed = _events(client.get(f"/api/jobs/{job_id}/events", headers={'Last-Event-ID': str(events[-3][0])}))
+    assert resumed == events[-2:]
+    assert client.get('/api/jobs/unknown/events').status_code == 404
@@ -0,0 +1,82 @@
+"""Header-driven RateLimiter, and the client's 429 handling against the fake Riot API"""
+
+import time
+
+import pytest
+
+from backend import RiotAPIClient
+from benchmarks.fake_riot_server import FakeRiotServer, FakeRiotState
+from rate_limiter import RateLimiter, parse_rate_limit_header
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('20:1,100:120', [(20, 1), (100, 120)]),
+    (' 20:1 , 100:120 ', [(20, 1), (100, 120)]),
+    ('20:1,garbage,5', [(20, 1)]),
+    ('', []),
+    (None, []),
+])
+def test_parse_rate_limit_header(value, expected):
+    assert parse_rate_limit_header(value) == expected
+
+
+def test_limits_and_counts_are_learned_from_headers():
+    limiter = RateLimiter('20:1,100:120')
+    limiter.update_from_headers('match', {
+        'X-App-Rate-Limit': '500:10,30000:600',
+        'X-App-Rate-Limit-Count': '7:10,40:600',
+        'X-Method-Rate-Limit': '2000:10',
+        'X-Method-Rate-Limit-Count': '3:10'
+    })
+    stats = limiter.get_stats()
+    assert stats['app'] == {'10s': {'limit': 500, 'used': 7}, '600s': {'limit': 30000, 'used': 40}}
+    assert stats['methods'] == {'match': {'10s': {'limit': 2000, 'used': 3}}}
+
+
+def test_full_window_makes_callers_wait():
+    limiter = RateLimiter('2:1')
+    assert limiter._try_acquire('match', 0) == 0
+    assert limiter._try_acquire('match', 0) == 0
+    wait = limiter._try_acquire('match', 0)
+    assert 0.9 < wait <= 1.1
+
+    # Method buckets are separate from the application buckets, but both must have room
+    limiter.update_from_headers('timeline', {'X-Method-Rate-Limit': '1:10'})
+    assert limiter._try_acquire('timeline', 0) > 0
+
+
+def test_429_blocks_the_scope_named_by_the_headers():
+    limiter = RateLimiter('100:1')
+    assert limiter.handle_429('match', {'Retry-After': '5', 'X-Rate-Limit-Type': 'method'}) == 5
+    assert limiter._try_acquire('match', 0) > 4
+    assert limiter._try_acquire('timeline', 0) == 0
+
+    limiter.handle_429('timeline', {'Retry-After': 'soon', 'X-Rate-Limit-Type': 'application'})
+    assert 0 < limiter._try_acquire('league', 0) <= RateLimiter.DEFAULT_RETRY_AFTER
+    assert limiter.get_stats()['rate_limited'] == 2
+
+
+def test_client_stays_under_enforced_limits(riot_fixtures, player):
+    state = FakeRiotState(riot_fixtures, app_limit='6:1')
+    with FakeRiotServer(state) as server:
+        client = RiotAPIClient('test-key', 'na1', rate_limiter=RateLimiter('6:1'),
+                               regional_rate_limiter=RateLimiter('6:1'), base_url_override=server.base_url)
+        started = time.monotonic()
+        for match_id in player.match_ids()[:13]:
+            assert client.get_match_details(match_id)
+        elapsed = time.monotonic() - started
+        client.close()
+
+    assert state.get_stats()['enforced_429'] == 0
+    assert elapsed >= 2.0
+
+
+def test_client_retries_after_429(riot_fixtures, player):
+    state = FakeRiotState(riot_fixtures, error_rate=0.5, retry_after=0, seed=3)
+    with FakeRiotServer(state) as server:
+        client = RiotAPIClient('test-key', 'na1', base_url_override=server.base_url)
+        results = [client.get_match_details(match_id) for match_id in player.match_ids()[:6]]
+        client.close()
+
+    assert state.get_stats()['injected_429'] > 0
+    assert sum(1 for result in results if result) >= 5
@@ -0,0 +1,142 @@
+"""RiotAPIClient and RiotClientPool against the fake Riot API"""
+
+import time
+
+import pytest
+
+from backend import RiotAPIClient, RiotClientPool
+
+ASIA = RiotAPIClient.REGIONAL_ENDPOINTS['asia']
+SEA = RiotAPIClient.REGIONAL_ENDPOINTS['sea']
+
+
+@pytest.fixture
+def pool(riot_server, match_store, timeline_cache):
+    pool = RiotClientPool('test-key', match_store, timeline_cache, base_url_override=riot_server.base_url)
+    yield pool
+    pool.close()
+
+
+def test_limiter_is_picked_by_routing_host():
+    client = RiotAPIClient('test-key', 'sg2')
+    assert client._limiter_for(f"{client.base_url}/lol/summoner/v4/x") is client.rate_limiter
+    assert client._limiter_for(f"{client.regional_url}/lol/match/v5/x") is client.regional_rate_limiter
+    assert client._limiter_for(f"{client.account_url}/riot/account/v1/x") is client.account_rate_limiter
+    assert client.account_rate_limiter is not client.regional_rate_limiter
+    with pytest.raises(ValueError):
+        client._limiter_for('https://europe.api.riotgames.com/lol/match/v5/x')
+    client.close()
+
+
+def test_account_limiter_shared_with_regional_host_outside_sea():
+    client = RiotAPIClient('test-key', 'euw1')
+    assert client.account_rate_limiter is client.regional_rate_limiter
+    client.close()
+
+
+def test_sea_account_lookups_are_charged_to_asia(pool, riot_fixtures):
+    player = riot_fixtures.players[0]
+    client = pool.get('sg2')
+    assert client.account_rate_limiter is pool._limiter(ASIA)
+    assert client.account_rate_limiter is pool.get('kr').regional_rate_limiter
+
+    game_name, tag_line = player.riot_id.split('#')
+    assert client.get_account_by_riot_id(game_name, tag_line)['puuid'] == player.puuid
+    assert pool._limiter(ASIA).requests == 1
+    assert pool._limiter(SEA).requests == 0
+
+
+def test_pool_shares_limiters_per_host(pool):
+    na, br = pool.get('na1'), pool.get('br1')
+    assert na.regional_rate_limiter is br.regional_rate_limiter
+    assert na.rate_limiter is not br.rate_limiter
+    assert pool.get('na1') is na
+    with pytest.raises(ValueError):
+        pool.get('xx9')
+
+
+def test_session_reuses_connections(riot_client, player):
+    for match_id in player.match_ids()[:10]:
+        riot_client.get_match_details(match_id)
+
+    stats = riot_client.get_connection_stats()
+    assert len(stats) == 1  # Every routing host shares the fake server's address
+    host = next(iter(stats.values()))
+    assert host['requests'] == 10
+    assert host['connections_opened'] == 1
+    assert riot_client.session.headers['Accept-Encoding'] == 'gzip, deflate'
+
+
+def test_responses_arrive_gzipped(riot_client, riot_server, player):
+    match_id = player.match_ids()[1]
+    response = riot_client.session.get(f"{riot_client.regional_url}/lol/match/v5/matches/{match_id}")
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.json()['metadata']['matchId'] == match_id
+
+
+def test_pool_clients_share_one_session(pool):
+    assert pool.get('na1').session is pool.get('kr').session
+    pool.get('na1').close()  # Not the owner: the shared session stays open
+    assert pool.get('kr').get_summoner_by_puuid('unknown-puuid') is None
+
+
+def _requests(riot_server, method):
+    return riot_server.state.get_stats()['by_method'].get(method, 0)
+
+
+def test_refresh_fetches_only_new_matches(riot_client, riot_server, player):
+    full_schedule = list(player.schedule)
+    player.schedule = full_schedule[4:]
+    assert riot_client.refresh_match_history(player.puuid) == player.match_ids()
+
+    player.schedule = full_schedule
+    matches_before, ids_before = _requests(riot_server, 'match'), _requests(riot_server, 'match-ids')
+    assert riot_client.refresh_match_history(player.puuid) == player.match_ids()
+    assert _requests(riot_server, 'match') - matches_before == 4
+    assert _requests(riot_server, 'match-ids') - ids_before == 1  # Only IDs since the sync point
+    assert riot_client.match_store.get_sync_point(player.puuid)['match_id'] == full_schedule[0][0]
+
+
+def test_failed_match_keeps_the_sync_point(riot_client, player):
+    riot_client.refresh_match_history(player.puuid)
+    sync_point = riot_client.match_store.get_sync_point(player.puuid)
+
+    # A new match whose details 404 must be retried next time, so the sync point stays put
+    newest_creation = player.schedule[0][1]
+    player.schedule = [('NA1_0000000001', newest_creation + 60000)] + player.schedule
+    match_ids = riot_client.refresh_match_history(player.puuid)
+
+    assert 'NA1_0000000001' not in match_ids
+    assert riot_client.match_store.get_sync_point(player.puuid)['match_id'] == sync_point['match_id']
+
+
+def test_refresh_window_drops_old_matches(riot_client, player):
+    riot_client.refresh_match_history(player.puuid)
+    recent = riot_client.refresh_match_history(player.puuid, days=30)
+
+    cutoff_ms = (time.time() - 30 * 86400) * 1000
+    assert recent == [match_id for match_id, created in player.schedule if created >= cutoff_ms]
+    assert 0 < len(recent) < len(player.schedule)
+
+
+def test_riot_id_lookups_are_cached_case_insensitively(riot_client, riot_server, player):
+    accounts, summoners = _requests(riot_server, 'account'), _requests(riot_server, 'summoner')
+    first = riot_client.get_summoner_by_riot_id(player.riot_id)
+    first['annotated'] = True  # Callers may modify what they get back
+    again = riot_client.get_summoner_by_riot_id(player.riot_id.upper())
+
+    assert again['puuid'] == player.puuid and 'annotated' not in again
+    assert _requests(riot_server, 'account') - accounts == 1
+    assert _requests(riot_server, 'summoner') - summoners == 1
+
+
+def test_unknown_riot_ids_are_cached_briefly(riot_client, riot_server, monkeypatch):
+    before = _requests(riot_server, 'account')
+    assert riot_client.get_account_by_riot_id('Nobody', 'SYN') is None
+    assert riot_client.get_account_by_riot_id('nobody', 'syn') is None
+    assert _requests(riot_server, 'account') - before == 1
+
+    monkeypatch.setattr(riot_client, 'NEGATIVE_LOOKUP_TTL', 0)
+    assert riot_client.get_account_by_riot_id('Other', 'SYN') is None
+    assert riot_client.get_account_by_riot_id('Other', 'SYN') is None
+    assert _requests(riot_server, 'account') - before == 3
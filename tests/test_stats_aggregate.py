@@ -0,0 +1,131 @@
+"""PlayerStatsAggregate and MatchDataProcessor on synthetic matches (no HTTP)"""
+
+import json
+
+import pytest
+
+from backend import MatchDataProcessor, PlayerStatsAggregate
+from benchmarks.synthetic import synthetic_players
+
+
+@pytest.fixture(scope='module')
+def synthetic():
+    """(puuid, matches newest first with timelines on the first 10, one match the player is not in)"""
+    player, other = synthetic_players(seed=11, players=2, matches_per_player=40, participant_frames=False)
+    matches = list(player.iter_matches(timelines='paged'))
+    foreign = next(other.iter_matches(timelines='none'))
+    return player.puuid, matches + [foreign]
+
+
+def _aggregate(puuid, matches):
+    return MatchDataProcessor.aggregate_matches(matches, puuid)
+
+
+def test_merged_halves_equal_one_pass(synthetic):
+    puuid, matches = synthetic
+    whole = _aggregate(puuid, matches)
+
+    merged = _aggregate(puuid, matches[20:]).merge(_aggregate(puuid, matches[:25]))
+    merged.order_by(whole.match_ids)
+    assert merged.total_matches == len(matches)
+    assert merged.to_stats() == whole.to_stats()
+
+
+def test_removing_a_match_equals_never_adding_it(synthetic):
+    puuid, matches = synthetic
+    aggregate = _aggregate(puuid, matches)
+    removed = matches[3]['metadata']['matchId']
+
+    assert aggregate.remove_match(removed)
+    assert not aggregate.remove_match(removed)
+    assert removed not in aggregate
+    assert aggregate.to_stats() == _aggregate(puuid, matches[:3] + matches[4:]).to_stats()
+
+
+def test_matches_without_the_player_count_but_add_no_row(synthetic):
+    puuid, matches = synthetic
+    aggregate = _aggregate(puuid, matches)
+    foreign = matches[-1]['metadata']['matchId']
+
+    assert foreign in aggregate and foreign not in aggregate.rows
+    assert aggregate.to_stats()['total_matches'] == len(matches)
+    assert not aggregate.add_match(matches[0])  # Already counted
+
+
+def test_expire_before_drops_old_matches(synthetic):
+    puuid, matches = synthetic
+    cutoff = matches[10]['info']['gameCreation']
+    aggregate = _aggregate(puuid, matches)
+
+    recent = [match for match in matches if match['info']['gameCreation'] >= cutoff]
+    assert aggregate.expire_before(cutoff) == len(matches) - len(recent)
+    assert aggregate.to_stats() == _aggregate(puuid, recent).to_stats()
+
+
+def test_serialized_aggregate_round_trips(synthetic):
+    puuid, matches = synthetic
+    aggregate = _aggregate(puuid, matches)
+    restored = PlayerStatsAggregate.from_dict(json.loads(json.dumps(aggregate.to_dict())))
+    assert restored.to_stats() == aggregate.to_stats()
+    assert restored.fingerprint() == aggregate.fingerprint()
+
+
+def test_merge_rejects_other_players(synthetic):
+    puuid, matches = synthetic
+    with pytest.raises(ValueError):
+        _aggregate(puuid, matches).merge(PlayerStatsAggregate('someone-else'))
+
+
+def test_drop_timeline_leaves_the_merged_source_untouched(synthetic):
+    puuid, matches = synthetic
+    source = _aggregate(puuid, matches)
+    copy = PlayerStatsAggregate(puuid).merge(source)
+    match_id = matches[0]['metadata']['matchId']
+
+    assert copy.drop_timeline(match_id)
+    assert not copy.has_timeline(match_id) and source.has_timeline(match_id)
+    assert copy.fingerprint() != source.fingerprint()
+
+
+def test_aggregate_matches_folds_each_match_before_pulling_the_next(synthetic):
+    puuid, matches = synthetic
+    aggregate = PlayerStatsAggregate(puuid)
+
+    def stream():
+        for index, match in enumerate(matches):
+            if index:
+                assert matches[index - 1]['metadata']['matchId'] in aggregate
+            yield match
+
+    assert MatchDataProcessor.aggregate_matches(stream(), puuid, aggregate) is aggregate
+    assert aggregate.total_matches == len(matches)
+
+
+def test_vectorized_totals_match_a_plain_loop(synthetic):
+    puuid, matches = synthetic
+    stats = _aggregate(puuid, matches).to_stats()
+
+    mine = [p for match in matches for p in match['info']['participants'] if p['puuid'] == puuid]
+    assert stats['wins'] == sum(1 for p in mine if p['win'])
+    assert stats['losses'] == len(mine) - stats['wins']
+    assert stats['total_kills'] == sum(p['kills'] for p in mine)
+    assert stats['total_gold'] == sum(p['goldEarned'] for p in mine)
+    assert stats['total_game_duration'] == sum(match['info']['gameDuration'] for match in matches[:-1])
+    for champion in {p['championName'] for p in mine}:
+        games = [p for p in mine if p['championName'] == champion]
+        assert stats['champions_played'][champion]['games'] == len(games)
+        assert stats['champions_played'][champion]['wins'] == sum(1 for p in games if p['win'])
+    assert sum(stats['roles_played'].values()) == len(mine)
+
+
+def test_to_stats_builds_only_the_requested_item_sections(synthetic):
+    puuid, matches = synthetic
+    aggregate = _aggregate(puuid, matches)
+    full = aggregate.to_stats()
+
+    partial = aggregate.to_stats(sections=['item_counts'])
+    assert partial['item_counts'] == full['item_counts']
+    for section in set(PlayerStatsAggregate.ITEM_SECTIONS) - {'item_counts'}:
+        assert section not in partial
+    assert {key: value for key, value in full.items() if key not in PlayerStatsAggregate.ITEM_SECTIONS} == {
+        key: value for key, value in aggregate.to_stats(sections=()).items()}
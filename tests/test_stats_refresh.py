@@ -0,0 +1,57 @@
+"""Incremental stats refresh against the fake Riot API"""
+
+from backend import MatchDataProcessor
+
+
+def _cold_stats(riot_client, puuid):
+    match_ids = riot_client.refresh_match_history(puuid)
+    return MatchDataProcessor.extract_player_stats(riot_client.iter_matches(match_ids, include_timeline=True), puuid)
+
+
+def test_timeline_budget_is_positional():
+    match_ids = [f"NA1_{i}" for i in range(230)]
+    budget = MatchDataProcessor.timeline_match_ids(match_ids)
+    assert budget == {f"NA1_{i}" for i in list(range(10)) + list(range(100, 110)) + list(range(200, 210))}
+
+
+def test_incremental_refresh_matches_cold_rebuild(api, player):
+    riot_client = api.riot_pool.get('na1')
+    full_schedule = list(player.schedule)
+
+    # First crawl sees all but the three newest games, which arrive before the second
+    player.schedule = full_schedule[3:]
+    first = api._refresh_player_aggregate(riot_client, player.puuid)
+    assert first['aggregate'].has_timeline(full_schedule[12][0])
+
+    player.schedule = full_schedule
+    fetched = []
+    second = api._refresh_player_aggregate(riot_client, player.puuid,
+                                           progress=lambda done, total: fetched.append(total))
+    aggregate = second['aggregate']
+
+    # The three new games plus the cached rows that moved into the budget of the second page
+    assert fetched[-1] == 3 + 3
+    match_ids = [match_id for match_id, _ in full_schedule]
+    budget = MatchDataProcessor.timeline_match_ids(match_ids)
+    assert {m for m in aggregate.rows if aggregate.has_timeline(m)} == budget & set(aggregate.rows)
+    assert not aggregate.has_timeline(full_schedule[12][0])
+
+    assert aggregate.to_stats() == _cold_stats(riot_client, player.puuid)
+
+
+def test_unchanged_match_set_is_served_from_cache(api, player):
+    riot_client = api.riot_pool.get('na1')
+    first = api._refresh_player_aggregate(riot_client, player.puuid)
+    assert api._refresh_player_aggregate(riot_client, player.puuid) is first
+
+
+def test_cache_keeps_only_the_aggregate(api, player):
+    riot_client = api.riot_pool.get('na1')
+    stats, fingerprint = api._player_stats(riot_client, player.puuid)
+    entry = api.stats_cache.get(player.puuid)
+
+    assert set(entry) == {'match_set', 'fingerprint', 'aggregate'}
+    again, same_fingerprint = api._player_stats(riot_client, player.puuid)
+    assert again == stats and again is not stats
+    assert same_fingerprint == fingerprint
+    assert 'items_per_match' not in api._player_stats(riot_client, player.puuid, sections=['item_counts'])[0]
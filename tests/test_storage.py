@@ -0,0 +1,191 @@
+"""SQLite stores: MatchStore, TimelineCache and ResponseStore"""
+
+import time
+import zlib
+import random
+import sqlite3
+
+import pytest
+
+from storage import MatchStore, ResponseStore, TimelineCache
+
+
+def _match(match_id, game_creation):
+    return {'metadata': {'matchId': match_id}, 'info': {'gameCreation': game_creation, 'gameDuration': 1800}}
+
+
+def test_match_store_round_trip_and_persistence(match_store, tmp_path):
+    match_store.put('NA1_1', _match('NA1_1', 1000))
+    match_store.put('NA1_1', _match('NA1_1', 2000))  # Finished matches never change; the first copy is kept
+
+    assert match_store.get('NA1_1') == _match('NA1_1', 1000)
+    assert match_store.get('NA1_2') is None
+    assert 'NA1_1' in match_store and len(match_store) == 1
+
+    reopened = MatchStore(match_store.path)
+    assert reopened.get('NA1_1') == _match('NA1_1', 1000)
+    reopened.close()
+
+
+def test_match_store_player_index(match_store):
+    match_store.add_player_matches('p1', [('NA1_1', 1000), ('NA1_3', 3000), ('NA1_2', 2000)])
+    match_store.add_player_matches('p1', [('NA1_3', 3000)])
+    match_store.add_player_matches('p2', [('NA1_9', 9000)])
+
+    assert match_store.get_player_match_ids('p1') == ['NA1_3', 'NA1_2', 'NA1_1']
+    assert match_store.get_player_match_ids('p1', since_ms=2000) == ['NA1_3', 'NA1_2']
+    assert match_store.prune_player_matches('p1', before_ms=2000) == 1
+    assert match_store.get_player_match_ids('p1') == ['NA1_3', 'NA1_2']
+    assert match_store.get_player_match_ids('p2') == ['NA1_9']
+
+
+def test_match_store_sync_point(match_store):
+    assert match_store.get_sync_point('p1') is None
+    match_store.set_sync_point('p1', 'NA1_3', 3000)
+    sync_point = match_store.get_sync_point('p1')
+    assert (sync_point['match_id'], sync_point['game_creation']) == ('NA1_3', 3000)
+
+
+def test_match_details_are_served_from_the_store(riot_client, riot_server, player):
+    match_id = player.match_ids()[0]
+    before = riot_server.state.get_stats()['by_method'].get('match', 0)
+
+    first = riot_client.get_match_details(match_id)
+    second = riot_client.get_match_details(match_id)
+
+    assert first == second and first['metadata']['matchId'] == match_id
+    assert riot_server.state.get_stats()['by_method'].get('match', 0) - before == 1
+    assert match_id in riot_client.match_store
+
+
+def _timeline(seed, size=2000):
+    """Incompressible enough that the gzip size tracks `size`"""
+    rng = random.Random(seed)
+    return {'metadata': {'matchId': f"NA1_{seed}"}, 'noise': ''.join(rng.choice('abcdefghij') for _ in range(size))}
+
+
+def test_timeline_cache_round_trip(timeline_cache):
+    timeline_cache.put('NA1_1', _timeline(1))
+    assert timeline_cache.get('NA1_1') == _timeline(1)
+    assert timeline_cache.get('NA1_2') is None
+    assert 'NA1_1' in timeline_cache and len(timeline_cache) == 1
+
+
+def test_timeline_cache_evicts_least_recently_used(tmp_path):
+    probe = TimelineCache(str(tmp_path / 'probe.sqlite3'))
+    probe.put('x', _timeline(0))
+    one = probe.total_bytes
+    probe.close()
+
+    cache = TimelineCache(str(tmp_path / 'timelines.sqlite3'), max_bytes=int(one * 3.5))
+    for seed in (1, 2, 3):
+        cache.put(f"NA1_{seed}", _timeline(seed))
+        time.sleep(0.01)
+    cache.get('NA1_1')  # Now the most recently used
+    time.sleep(0.01)
+    cache.put('NA1_4', _timeline(4))
+
+    assert 'NA1_2' not in cache
+    assert all(f"NA1_{seed}" in cache for seed in (1, 3, 4))
+    assert cache.total_bytes <= cache.max_bytes
+
+    cache.get('NA1_3', touch=False)  # Read-only access leaves LRU order alone
+    cache.put('NA1_5', _timeline(5))
+    assert 'NA1_3' not in cache
+    assert all(f"NA1_{seed}" in cache for seed in (1, 4, 5))
+    cache.close()
+
+
+def test_timeline_cache_skips_entries_larger_than_the_cap(tmp_path):
+    cache = TimelineCache(str(tmp_path / 'timelines.sqlite3'), max_bytes=100)
+    cache.put('NA1_1', _timeline(1))
+    assert len(cache) == 0 and cache.total_bytes == 0
+    cache.close()
+
+
+def test_timeline_cache_size_survives_reopen(timeline_cache):
+    timeline_cache.put('NA1_1', _timeline(1))
+    reopened = TimelineCache(timeline_cache.path)
+    assert reopened.total_bytes == timeline_cache.total_bytes > 0
+    reopened.close()
+
+
+def test_timelines_are_cached_pruned(riot_client, riot_server, player):
+    match_id = player.match_ids()[0]
+    before = riot_server.state.get_stats()['by_method'].get('timeline', 0)
+
+    first = riot_client.get_match_timeline(match_id)
+    second = riot_client.get_match_timeline(match_id)
+
+    assert first == second
+    assert first['format'] == 'item-events-v1'
+    assert riot_server.state.get_stats()['by_method'].get('timeline', 0) - before == 1
+    assert riot_client.timeline_cache.get(match_id) == first
+
+
+@pytest.fixture
+def response_store_factory(tmp_path):
+    stores = []
+
+    def make(**kwargs):
+        store = ResponseStore(str(tmp_path / f"responses{len(stores)}.sqlite3"), **kwargs)
+        stores.append(store)
+        return store
+
+    yield make
+    for store in stores:
+        store.close()
+
+
+def test_response_store_round_trip(response_store_factory):
+    store = response_store_factory(ttl_seconds=60, max_entries=10)
+    store.put('key', 'Insight text ✓')
+    assert store.get('key') == 'Insight text ✓'
+    assert store.get('missing') is None
+
+
+def test_response_store_evicts_least_recently_used(response_store_factory):
+    store = response_store_factory(ttl_seconds=60, max_entries=2)
+    store.put('a', 'a')
+    time.sleep(0.01)
+    store.put('b', 'b')
+    time.sleep(0.01)
+    assert store.get('a') == 'a'  # Now more recently used than 'b'
+    time.sleep(0.01)
+    store.put('c', 'c')
+    assert len(store) == 2
+    assert store.get('b') is None
+    assert (store.get('a'), store.get('c')) == ('a', 'c')
+
+
+def test_response_store_upgrades_stores_without_access_times(tmp_path):
+    path = str(tmp_path / 'responses.sqlite3')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE responses (key TEXT PRIMARY KEY, created_at REAL NOT NULL, data BLOB NOT NULL)')
+    conn.execute('INSERT INTO responses VALUES (?, ?, ?)', ('old', time.time(), zlib.compress(b'kept')))
+    conn.commit()
+    conn.close()
+
+    store = ResponseStore(path, ttl_seconds=60, max_entries=10)
+    assert store.get('old') == 'kept'
+    store.put('new', 'value')
+    assert len(store) == 2
+    store.close()
+
+
+def test_response_store_honours_explicit_zero(response_store_factory, monkeypatch):
+    monkeypatch.setenv('LLM_CACHE_TTL_SECONDS', '3600')
+    monkeypatch.setenv('LLM_CACHE_MAX_ENTRIES', '50')
+
+    store = response_store_factory(ttl_seconds=0, max_entries=0)
+    assert (store.ttl_seconds, store.max_entries) == (0, 0)
+    store.put('key', 'value')
+    assert store.get('key') is None
+    assert len(store) == 0
+
+
+def test_response_store_defaults_from_environment(response_store_factory, monkeypatch):
+    monkeypatch.setenv('LLM_CACHE_TTL_SECONDS', '120')
+    monkeypatch.setenv('LLM_CACHE_MAX_ENTRIES', '7')
+    store = response_store_factory()
+    assert (store.ttl_seconds, store.max_entries) == (120.0, 7)